@@ -1,19 +1,42 @@
 from flask import Flask, redirect, url_for
 from flask_login import LoginManager, current_user
 from config import Config
-from core import db, init_app_extensions
-import markdown  # New import
+from core import init_app_extensions
+from core.boot import BootTimer, log_boot
 
-def create_app():
-    """Application factory pattern"""
+def create_app(config_overrides=None):
+    """Application factory pattern.
+
+    Boot does no database round trips: the schema is managed with
+    `flask --app app db upgrade`, not created here.
+    """
+    timer = BootTimer()
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config_overrides:
+        app.config.update(config_overrides)
     
-    # Add Markdown filter to Jinja (new)
-    app.jinja_env.filters['markdown'] = lambda text: markdown.markdown(text, extensions=['fenced_code']) if text else ''
+    with timer.phase('extensions'):
+        # Persistent template bytecode and {% cache %} fragments (before jinja_env is used)
+        from core.templating import configure_jinja
+        configure_jinja(app)
+        
+        # Add Markdown filter to Jinja (cached; the markdown package loads on first render)
+        from core.markdown_renderer import markdown_renderer
+        app.jinja_env.filters['markdown'] = markdown_renderer.render
 
-    # Initialize extensions
-    init_app_extensions(app)
+        # Initialize extensions
+        init_app_extensions(app)
+        
+        # Per-request SQL counters, Server-Timing header and N+1 warnings
+        from core.instrumentation import init_instrumentation
+        init_instrumentation(app)
+        
+        # Negotiated response compression; precompressed, fingerprinted static files
+        from core.compression import init_compression
+        from core.assets import init_assets
+        init_compression(app)
+        init_assets(app)
     
     # Initialize Flask-Login
     login_manager = LoginManager()
@@ -23,23 +46,30 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        from models.user import User
-        return User.get_by_id(int(user_id))
-    
-    # Register blueprints
-    from routes.auth_routes import auth_bp
-    from routes.project_routes import project_bp
-    from routes.prompt_routes import prompt_bp
-    from routes.user_routes import user_bp
-    from routes.prompt_response_routes import resp_bp
-    from routes.attachment_routes import attachment_bp
+        from core.user_cache import user_cache
+        return user_cache.load(int(user_id))
     
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(project_bp)
-    app.register_blueprint(prompt_bp)
-    app.register_blueprint(user_bp)
-    app.register_blueprint(resp_bp)
-    app.register_blueprint(attachment_bp)
+    with timer.phase('blueprints'):
+        # Register blueprints
+        from routes.auth_routes import auth_bp
+        from routes.project_routes import project_bp
+        from routes.prompt_routes import prompt_bp
+        from routes.user_routes import user_bp
+        from routes.prompt_response_routes import resp_bp
+        from routes.attachment_routes import attachment_bp
+        from routes.admin_routes import admin_bp
+        
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(project_bp)
+        app.register_blueprint(prompt_bp)
+        app.register_blueprint(user_bp)
+        app.register_blueprint(resp_bp)
+        app.register_blueprint(attachment_bp)
+        app.register_blueprint(admin_bp)
+        
+        # Register maintenance CLI commands
+        from core.commands import register_commands
+        register_commands(app)
     
     # Add route for root URL
     @app.route('/')
@@ -48,12 +78,15 @@ def create_app():
             return redirect(url_for('project.dashboard'))
         return redirect(url_for('auth.login'))
 
-    # Create tables if they don't exist
-    with app.app_context():
-        db.create_all()
+    # Optionally pay first-request costs (template compiles, pool connects) up front
+    if app.config.get('WARMUP_ON_BOOT'):
+        from core.boot import warm_up
+        with timer.phase('warmup'):
+            warm_up(app)
     
+    log_boot(app, timer)
     return app
 
 if __name__ == '__main__':
     app = create_app()
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1 @@
+"""Load-testing benchmarks that drive the real Flask app through its blueprints."""
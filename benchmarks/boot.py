@@ -0,0 +1,77 @@
+"""Measure cold worker boot: a fresh interpreter importing `app` and calling create_app().
+
+    python -m benchmarks.boot --runs 10 --target-ms 800
+    python -m benchmarks.boot --warmup      # include template compiles and pool connects
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.run import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+report = application.extensions['boot_report']
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': report['total_ms'],
+    'total_ms': (time.perf_counter() - started) * 1000,
+    'phases': report['phases'],
+}))
+"""
+
+
+def boot_once(env):
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, help='fail if the median total boot exceeds this')
+    parser.add_argument('--warmup', action='store_true', help='boot with WARMUP_ON_BOOT=true')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    env = dict(os.environ, WARMUP_ON_BOOT='true' if args.warmup else 'false')
+
+    samples = [boot_once(env) for _ in range(args.runs)]
+    report = {}
+    for key in ('import_ms', 'create_app_ms', 'total_ms'):
+        values = sorted(sample[key] for sample in samples)
+        report[key] = {'p50': round(percentile(values, 50), 1), 'max': round(values[-1], 1)}
+    phases = sorted({name for sample in samples for name in sample['phases']})
+    report['phases_p50'] = {
+        name: round(percentile(sorted(sample['phases'].get(name, 0) for sample in samples), 50), 1)
+        for name in phases
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key in ('import_ms', 'create_app_ms', 'total_ms'):
+            print(f'{key:<15} p50 {report[key]["p50"]:>8.1f} ms   max {report[key]["max"]:>8.1f} ms')
+        for name, ms in report['phases_p50'].items():
+            print(f'  {name:<13} p50 {ms:>8.1f} ms')
+
+    if args.target_ms and report['total_ms']['p50'] > args.target_ms:
+        print(f'Boot p50 {report["total_ms"]["p50"]} ms exceeds target {args.target_ms} ms')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Measure password verification throughput (logins per second, and per core) on the hashing pool.
+
+    python -m benchmarks.passwords --logins 64 --clients 16 --workers 1 2 4
+    python -m benchmarks.passwords --method pbkdf2:sha256:600000 --executor process
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from core.passwords import HasherBusy, PasswordHasher  # noqa: E402
+from benchmarks.run import percentile  # noqa: E402
+
+PASSWORD = 'benchpass'
+
+
+def run_logins(hasher, stored_hash, logins, clients):
+    """`clients` threads verify `logins` passwords in total; returns latencies (ms), rejections and elapsed seconds"""
+    latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+    remaining = iter(range(logins))
+
+    def client():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                hasher.verify(stored_hash, PASSWORD)
+            except HasherBusy:
+                with lock:
+                    rejected[0] += 1
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), rejected[0], time.perf_counter() - started
+
+
+def bench(method, executor, workers, logins, clients, queue, timeout):
+    hasher = PasswordHasher(method=method, executor=executor, workers=workers, queue=queue, timeout=timeout)
+    try:
+        stored_hash = hasher.hash(PASSWORD)
+        latencies, rejected, elapsed = run_logins(hasher, stored_hash, logins, clients)
+    finally:
+        hasher.shutdown()
+    cores = min(workers, os.cpu_count() or 1)
+    rate = len(latencies) / elapsed if elapsed else 0.0
+    return {
+        'method': hasher.method,
+        'executor': executor,
+        'workers': workers,
+        'logins': len(latencies),
+        'rejected': rejected,
+        'logins_per_s': round(rate, 2),
+        'logins_per_s_per_core': round(rate / cores, 2),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--method', default=Config.PASSWORD_HASH_METHOD)
+    parser.add_argument('--executor', default='thread', choices=['thread', 'process', 'inline'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--logins', type=int, default=32)
+    parser.add_argument('--clients', type=int, default=8, help='concurrent login requests')
+    parser.add_argument('--queue', type=int, default=Config.PASSWORD_HASH_QUEUE)
+    parser.add_argument('--timeout', type=float, default=Config.PASSWORD_HASH_TIMEOUT)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = [bench(args.method, args.executor, workers, args.logins, args.clients, args.queue, args.timeout)
+               for workers in sorted(set(args.workers))]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f'{results[0]["method"]} on a {args.executor} pool, {args.clients} concurrent clients')
+    for r in results:
+        print(f'workers {r["workers"]:>3}  {r["logins_per_s"]:>8.2f} logins/s  '
+              f'{r["logins_per_s_per_core"]:>8.2f} /s/core  p50 {r["p50_ms"]:>8.1f} ms  '
+              f'p95 {r["p95_ms"]:>8.1f} ms  rejected {r["rejected"]}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Replay a traffic mix against the real app and report latency, throughput and queries.
+
+    python -m benchmarks.run --users 4 --prompts 50 --requests 2000
+    python -m benchmarks.run --save-baseline benchmarks/baselines/default.json
+    python -m benchmarks.run --compare benchmarks/baselines/default.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from core import db  # noqa: E402
+from benchmarks.scenarios import SCENARIOS, MIXES  # noqa: E402
+from benchmarks.seed import seed  # noqa: E402
+
+QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Latency percentiles (ms), throughput and queries per request for a list of samples"""
+    latencies = sorted(sample['ms'] for sample in samples)
+    queries = [sample['queries'] for sample in samples if sample['queries'] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample['status'] >= 400),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def run_worker(app, user, plan, worker_seed, samples, lock):
+    rng = random.Random(worker_seed)
+    client = app.test_client()
+    response = client.post('/auth/login', data={'username': user['username'], 'password': user['password']})
+    if response.status_code != 302:
+        raise RuntimeError(f'Could not log in as {user["username"]}')
+
+    local = []
+    for name in plan:
+        handler = SCENARIOS[name][0]
+        started = time.perf_counter()
+        response = handler(client, user, rng)
+        response.get_data()  # include body generation and streaming in the timing
+        ms = (time.perf_counter() - started) * 1000
+        match = QUERIES_RE.search(response.headers.get('Server-Timing', ''))
+        local.append({
+            'scenario': name,
+            'ms': ms,
+            'status': response.status_code,
+            'queries': int(match.group(1)) if match else None,
+        })
+    with lock:
+        samples.extend(local)
+
+
+def run(app, fixture, mix, total_requests, concurrency, run_seed):
+    """Split `total_requests` drawn from `mix` across `concurrency` logged-in clients"""
+    rng = random.Random(run_seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plans = [[] for _ in range(concurrency)]
+    for index in range(total_requests):
+        plans[index % concurrency].append(rng.choices(names, weights)[0])
+
+    samples, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(target=run_worker, args=(
+            app, fixture[index % len(fixture)], plans[index], run_seed + index, samples, lock))
+        for index in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = {'overall': summarize(samples, elapsed), 'scenarios': {}}
+    for name in names:
+        matching = [sample for sample in samples if sample['scenario'] == name]
+        if matching:
+            report['scenarios'][name] = summarize(matching, elapsed)
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Regressions of `report` against `baseline`: slower p95, lower RPS or more queries"""
+    regressions = []
+    pairs = [('overall', report['overall'], baseline.get('overall'))]
+    pairs += [(name, stats, baseline.get('scenarios', {}).get(name))
+              for name, stats in report['scenarios'].items()]
+    for name, current, previous in pairs:
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {previous["p95_ms"]}ms -> {current["p95_ms"]}ms')
+        if name == 'overall' and current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f'{name}: rps {previous["rps"]} -> {current["rps"]}')
+        if (current['queries_per_request'] is not None and previous.get('queries_per_request') is not None
+                and current['queries_per_request'] > previous['queries_per_request'] + 0.5):
+            regressions.append(f'{name}: queries/request {previous["queries_per_request"]} '
+                               f'-> {current["queries_per_request"]}')
+    return regressions
+
+
+def print_report(report):
+    header = f'{"scenario":<22}{"reqs":>7}{"errs":>6}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"rps":>10}{"q/req":>8}'
+    print(header)
+    print('-' * len(header))
+    rows = list(report['scenarios'].items()) + [('overall', report['overall'])]
+    for name, stats in rows:
+        queries = stats['queries_per_request']
+        print(f'{name:<22}{stats["requests"]:>7}{stats["errors"]:>6}{stats["p50_ms"]:>10.2f}'
+              f'{stats["p95_ms"]:>10.2f}{stats["p99_ms"]:>10.2f}{stats["rps"]:>10.1f}'
+              f'{queries if queries is not None else "-":>8}')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=os.environ.get(
+        'BENCH_DATABASE_URL', 'sqlite:///' + os.path.join(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))), 'instance', 'bench.db')))
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    parser.add_argument('--users', type=int, default=2)
+    parser.add_argument('--projects', type=int, default=5, help='projects per user')
+    parser.add_argument('--prompts', type=int, default=20, help='prompts per project')
+    parser.add_argument('--responses', type=int, default=10, help='responses per prompt')
+    parser.add_argument('--attachments', type=int, default=1, help='attachments per prompt')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50, help='untimed requests before measuring')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--mix', choices=sorted(MIXES), default='default')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--compare', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger('app.sql').setLevel(logging.ERROR)
+
+    if args.database_url.startswith('sqlite:///'):
+        os.makedirs(os.path.dirname(os.path.abspath(args.database_url[len('sqlite:///'):])), exist_ok=True)
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': args.database_url,
+        'SQL_INSTRUMENTATION': True,
+    })
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()  # scratch database: the app does not create tables at boot
+        fixture = seed(args.users, args.projects, args.prompts, args.responses,
+                       args.attachments, seed=args.seed)
+
+    mix = MIXES[args.mix]
+    if args.warmup:
+        run(app, fixture, mix, args.warmup, args.concurrency, args.seed + 1000)
+    report = run(app, fixture, mix, args.requests, args.concurrency, args.seed)
+    report['parameters'] = {key: value for key, value in vars(args).items()
+                            if key not in ('save_baseline', 'compare', 'json', 'database_url')}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline saved to {args.save_baseline}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print('Regressions against baseline:')
+            for line in regressions:
+                print(f'  {line}')
+            return 1
+        print('No regressions against baseline.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Traffic mix: each scenario turns a user's fixture into one HTTP request."""
+
+
+def dashboard(client, user, rng):
+    return client.get('/projects/')
+
+
+def project_detail(client, user, rng):
+    return client.get(f'/projects/{rng.choice(user["projects"])}')
+
+
+def prompt_detail(client, user, rng):
+    project_id, prompt_id = rng.choice(user['prompts'])
+    return client.get(f'/prompts/project/{project_id}/{prompt_id}')
+
+
+def search(client, user, rng):
+    term = rng.choice(user['terms'])
+    return client.get(f'/prompts/api/search?q={term}')
+
+
+def autosave(client, user, rng):
+    project_id, prompt_id = rng.choice(user['prompts'])
+    return client.put(f'/prompts/api/project/{project_id}/{prompt_id}/update', json={
+        'title': f'Autosaved {prompt_id}',
+        'content': ' '.join(rng.choice(user['terms']) for _ in range(60)),
+    })
+
+
+def add_response(client, user, rng):
+    project_id, prompt_id = rng.choice(user['prompts'])
+    return client.post(f'/responses/project/{project_id}/prompt/{prompt_id}', json={
+        'role': rng.choice(['user', 'assistant']),
+        'content': ' '.join(rng.choice(user['terms']) for _ in range(40)),
+    })
+
+
+def download_attachment(client, user, rng):
+    if not user['attachments']:
+        return prompt_detail(client, user, rng)
+    project_id, prompt_id, attachment_id = rng.choice(user['attachments'])
+    return client.get(f'/attachments/project/{project_id}/prompt/{prompt_id}/{attachment_id}/download')
+
+
+# name -> (handler, weight)
+SCENARIOS = {
+    'dashboard': (dashboard, 10),
+    'project_detail': (project_detail, 15),
+    'prompt_detail': (prompt_detail, 25),
+    'search': (search, 15),
+    'autosave': (autosave, 15),
+    'add_response': (add_response, 10),
+    'download_attachment': (download_attachment, 10),
+}
+
+MIXES = {
+    'default': {name: weight for name, (handler, weight) in SCENARIOS.items()},
+    'read': {'dashboard': 20, 'project_detail': 25, 'prompt_detail': 35, 'search': 15, 'download_attachment': 5},
+    'write': {'autosave': 60, 'add_response': 40},
+}
@@ -0,0 +1,26 @@
+from core.datagen import DataGenerator
+
+BENCH_PASSWORD = 'benchpass'
+SEARCH_TERMS = ['prompt', 'model', 'answer', 'summary', 'code', 'example', 'format', 'data']
+
+
+def seed(users=2, projects=5, prompts=20, responses=10, attachments=1, seed=0):
+    """Bulk-load users × projects × prompts × responses × attachments benchmark data.
+
+    Returns the fixture the traffic mix draws from: one entry per user with its
+    credentials and the ids it owns.
+    """
+    data = DataGenerator(
+        users=users, projects=projects, prompts=prompts, responses=responses,
+        attachments=attachments, seed=seed, password=BENCH_PASSWORD,
+        username_prefix=f'bench{seed}_'
+    ).run()
+
+    return [{
+        'username': data.username(u),
+        'password': BENCH_PASSWORD,
+        'projects': data.project_ids(u),
+        'prompts': data.prompt_ids(u),
+        'attachments': data.attachment_ids(u),
+        'terms': SEARCH_TERMS,
+    } for u in range(users)]
@@ -3,6 +3,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
 class Config:
     """Application configuration class"""
     
@@ -20,9 +22,105 @@ class Config:
         f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool settings (ignored for SQLite)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))  # connections kept open per worker
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))  # extra connections under burst load
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))  # milliseconds; 0 disables
+    # Behind PgBouncer in transaction mode: no client-side pool, per-transaction settings only
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Startup: tables come from `flask db upgrade`, never from create_app()
+    WARMUP_ON_BOOT = os.environ.get('WARMUP_ON_BOOT', 'false').lower() in ('1', 'true', 'yes')
+    BOOT_TIME_TARGET_MS = int(os.environ.get('BOOT_TIME_TARGET_MS', 1000))  # slower boots are logged as warnings
     
     # Session settings
     PERMANENT_SESSION_LIFETIME = 3600  # 1 hour
 
     MAX_ATTACHMENT_SIZE = int(os.environ.get('MAX_ATTACHMENT_SIZE', 512 * 1024))  # 512 KB
-    MAX_ATTACHMENTS_PER_PROMPT = int(os.environ.get('MAX_ATTACHMENTS_PER_PROMPT', 20))
\ No newline at end of file
+    MAX_ATTACHMENTS_PER_PROMPT = int(os.environ.get('MAX_ATTACHMENTS_PER_PROMPT', 20))
+    # 'blob' stores attachment content in the blob store, 'database' keeps it in attachments.content
+    ATTACHMENT_STORAGE = os.environ.get('ATTACHMENT_STORAGE', 'blob')
+    ATTACHMENT_BLOB_BACKEND = os.environ.get('ATTACHMENT_BLOB_BACKEND', 'filesystem')
+    ATTACHMENT_STORAGE_PATH = os.environ.get('ATTACHMENT_STORAGE_PATH',
+                                             os.path.join(BASE_DIR, 'instance', 'attachments'))
+
+    # SQL instrumentation: per-request query counts in Server-Timing and the app.sql log
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() in ('1', 'true', 'yes')
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))  # repeats of one SELECT shape
+
+    # Response compression (brotli/zstd are used when the optional packages are installed)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESSION_ALGORITHMS = os.environ.get('COMPRESSION_ALGORITHMS', 'br,zstd,gzip')  # server preference order
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes; smaller bodies go out as is
+    COMPRESSION_MAX_SIZE = int(os.environ.get('COMPRESSION_MAX_SIZE', 1024 * 1024))  # largest file download encoded
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+    COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+
+    # Pagination settings
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 20))
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+    CONVERSATION_PAGE_SIZE = int(os.environ.get('CONVERSATION_PAGE_SIZE', 50))  # messages shown before "older"
+
+    MAX_RESPONSE_BATCH = int(os.environ.get('MAX_RESPONSE_BATCH', 1000))  # messages per batch request
+
+    # Rendering settings
+    MARKDOWN_CACHE_SIZE = int(os.environ.get('MARKDOWN_CACHE_SIZE', 2048))  # rendered documents kept in memory
+    # Compiled templates persist across restarts; '' disables
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR',
+                                              os.path.join(BASE_DIR, 'instance', 'jinja_cache'))
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 5000))  # rendered {% cache %} blocks; 0 disables
+    # Stored token counts come from tiktoken; without it they stay NULL and pages show a 4-characters-per-token estimate
+    TOKENIZER_ENCODING = os.environ.get('TOKENIZER_ENCODING', 'cl100k_base')
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 4096))  # token counts kept in memory by content hash
+    # tiktoken encoding files; fill once with `flask stats tokenizer` (or copy them in) so counting stays offline
+    TIKTOKEN_CACHE_DIR = os.environ.get('TIKTOKEN_CACHE_DIR', os.path.join(BASE_DIR, 'instance', 'tiktoken'))
+
+    # User identity cache for the login user_loader ('memory' per process, or 'redis' shared)
+    USER_CACHE_BACKEND = os.environ.get('USER_CACHE_BACKEND', 'memory')
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))  # seconds; 0 disables the cache
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+    # Password hashing: any Werkzeug method with its cost parameters (e.g. 'pbkdf2:sha256:600000').
+    # Logins rehash stored passwords made with other parameters.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread')  # 'thread', 'process' or 'inline'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))  # concurrent hashes; 0 = CPU count
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))  # hashes allowed to wait for a worker
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))  # seconds to wait before "busy"
+
+    # Search-box typeahead: per-user prefix indexes over prompt and project titles
+    TYPEAHEAD_LIMIT = int(os.environ.get('TYPEAHEAD_LIMIT', 8))  # suggestions returned by default
+    TYPEAHEAD_MAX_LIMIT = int(os.environ.get('TYPEAHEAD_MAX_LIMIT', 20))  # hard cap on ?limit=
+    TYPEAHEAD_TTL = int(os.environ.get('TYPEAHEAD_TTL', 300))  # seconds before an index is rebuilt anyway
+    TYPEAHEAD_CACHE_SIZE = int(os.environ.get('TYPEAHEAD_CACHE_SIZE', 1000))  # users' indexes kept per process
+    TYPEAHEAD_BACKEND = os.environ.get('TYPEAHEAD_BACKEND', 'memory')  # 'redis' shares invalidations across workers
+
+    # Search settings
+    # PostgreSQL text search config; migrations 001/008 index 'english', run `flask search language` after changing it
+    SEARCH_LANGUAGE = os.environ.get('SEARCH_LANGUAGE', 'english')
+    SEARCH_RESULT_LIMIT = int(os.environ.get('SEARCH_RESULT_LIMIT', 50))
+    # Unified search (search_documents): prompts, responses and attachments
+    SEARCH_CANDIDATE_LIMIT = int(os.environ.get('SEARCH_CANDIDATE_LIMIT', 1000))  # matches scored per query
+    SEARCH_HITS_PER_PROMPT = int(os.environ.get('SEARCH_HITS_PER_PROMPT', 3))  # hits shown under each prompt
+    SEARCH_SNIPPET_LENGTH = int(os.environ.get('SEARCH_SNIPPET_LENGTH', 160))  # characters of context per hit
+
+    # Near-duplicate prompts: MinHash signatures with LSH banding (changing these needs `flask similar backfill --all`)
+    MINHASH_PERMUTATIONS = int(os.environ.get('MINHASH_PERMUTATIONS', 128))  # signature length (4 bytes each)
+    MINHASH_BANDS = int(os.environ.get('MINHASH_BANDS', 16))  # 16 bands x 8 rows: pairs above ~0.7 become candidates
+    MINHASH_SHINGLE_SIZE = int(os.environ.get('MINHASH_SHINGLE_SIZE', 3))  # words per shingle
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.8))  # estimated Jaccard similarity
+    NEAR_DUPLICATE_LIMIT = int(os.environ.get('NEAR_DUPLICATE_LIMIT', 20))  # similar prompts returned by default
+    NEAR_DUPLICATE_CANDIDATES = int(os.environ.get('NEAR_DUPLICATE_CANDIDATES', 500))  # candidates verified per lookup
+
+    # Related prompts: hashed TF-IDF rows in memory-mapped files shared by all workers ('' disables)
+    RELATED_INDEX_DIR = os.environ.get('RELATED_INDEX_DIR', os.path.join(BASE_DIR, 'instance', 'related'))
+    RELATED_FEATURES = int(os.environ.get('RELATED_FEATURES', 2 ** 18))  # hash buckets for words (changing needs `flask related rebuild`)
+    RELATED_TERMS_PER_ROW = int(os.environ.get('RELATED_TERMS_PER_ROW', 64))  # most frequent words kept per prompt
+    RELATED_LIMIT = int(os.environ.get('RELATED_LIMIT', 5))  # related prompts shown on a prompt page
+    RELATED_MIN_SCORE = float(os.environ.get('RELATED_MIN_SCORE', 0.05))  # minimum cosine similarity
\ No newline at end of file
@@ -1,7 +1,8 @@
-from flask import flash
+from io import BytesIO
+from flask import flash, send_file
 from flask_login import current_user
 from core.base_controller import BaseController
-from models.prompt import Prompt
+from core.ownership import ownership
 from models.attachment import Attachment
 from config import Config
 
@@ -11,10 +12,14 @@ class AttachmentController(BaseController):
     model_class = Attachment
 
     def _get_user_prompt(self, project_id, prompt_id):
-        prompt = Prompt.get_project_prompt(project_id, prompt_id)
-        if not prompt or prompt.project.user_id != current_user.id:
+        if not current_user.is_authenticated:
             return None
-        return prompt
+        return ownership.prompt(current_user.id, project_id, prompt_id)
+
+    def get_user_attachment(self, project_id, prompt_id, attachment_id):
+        if not current_user.is_authenticated:
+            return None
+        return ownership.attachment(current_user.id, project_id, prompt_id, attachment_id)
 
     def list_for_prompt(self, project_id, prompt_id):
         prompt = self._get_user_prompt(project_id, prompt_id)
@@ -59,22 +64,44 @@ class AttachmentController(BaseController):
         return att
 
     def update_attachment(self, project_id, prompt_id, attachment_id, filename, content, mime_type='text/plain'):
-        prompt = self._get_user_prompt(project_id, prompt_id)
-        att = Attachment.get_by_id(attachment_id)
-        if not prompt or not att or att.prompt_id != prompt.id:
+        att = self.get_user_attachment(project_id, prompt_id, attachment_id)
+        if not att:
             flash('Attachment not found or permission denied', 'error')
             return None
-        return self.create_attachment(project_id, prompt_id, filename, content, mime_type) \
-            if False else self.update(attachment_id, {
-                'filename': filename.strip()[:255],
-                'mime_type': (mime_type or 'text/plain').strip(),
-                'content': content
-            })
+        if not content or len(content) == 0:
+            flash('Attachment content is required', 'error'); return None
+
+        if hasattr(Config, 'MAX_ATTACHMENT_SIZE') and len(content.encode('utf-8')) > Config.MAX_ATTACHMENT_SIZE:
+            flash('Attachment too large', 'error'); return None
+
+        try:
+            att.filename = filename.strip()[:255]
+            att.mime_type = (mime_type or 'text/plain').strip()
+            att.set_content(content)
+            return att.save()
+        except Exception as e:
+            flash(f'Error updating record: {str(e)}', 'error')
+            return None
+
+    def download_response(self, att):
+        """Conditional download: streams blobs from disk with Range, ETag and If-None-Match support"""
+        path = att.blob_path()
+        source = path if path else BytesIO(att.read_bytes())
+        resp = send_file(
+            source,
+            mimetype=att.mime_type,  # Werkzeug adds charset=utf-8 to text/* types
+            as_attachment=True,
+            download_name=att.filename,
+            conditional=True,
+            etag=att.etag,
+            last_modified=att.updated_at
+        )
+        resp.cache_control.private = True
+        return resp
 
     def delete_attachment(self, project_id, prompt_id, attachment_id):
-        prompt = self._get_user_prompt(project_id, prompt_id)
-        att = Attachment.get_by_id(attachment_id)
-        if not prompt or not att or att.prompt_id != prompt.id:
+        att = self.get_user_attachment(project_id, prompt_id, attachment_id)
+        if not att:
             flash('Attachment not found or permission denied', 'error')
             return False
         return self.delete(attachment_id)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from flask import flash, redirect, url_for, request
 from flask_login import login_user, logout_user, current_user
 from core.base_controller import BaseController
+from core.passwords import HasherBusy
 from models.user import User
 
 class AuthController(BaseController):
@@ -15,7 +16,15 @@ class AuthController(BaseController):
         
         user = User.get_by_username(username)
         
-        if user and user.check_password(password):
+        try:
+            authenticated = user is not None and user.check_password(password)
+            if authenticated:
+                user.rehash_password(password)
+        except HasherBusy:
+            flash('The server is busy signing other users in. Please try again in a moment.', 'error')
+            return None
+        
+        if authenticated:
             login_user(user, remember=remember)
             flash(f'Welcome back, {user.username}!', 'success')
             
@@ -48,7 +57,11 @@ class AuthController(BaseController):
             return None
         
         # Create new user with email
-        user = User.create_user(username, email, password)
+        try:
+            user = User.create_user(username, email, password)
+        except HasherBusy:
+            flash('The server is busy right now. Please try again in a moment.', 'error')
+            return None
         if user:
             login_user(user)
             flash(f'Account created successfully! Welcome, {user.username}!', 'success')
@@ -3,6 +3,17 @@ from flask_login import current_user
 from core.base_controller import BaseController
 from models.project import Project
 from models.prompt import Prompt
+from models.prompt_response import PromptResponse
+from models.attachment import Attachment
+from core import db
+from core.pagination import KeysetPage
+from core.stats import LibraryStats
+from core.ownership import ownership
+from core.http_cache import ResourceVersions
+from core.typeahead import typeahead
+from core.search_index import search_index
+from core.near_duplicates import near_duplicates
+from core.related import related_index
 
 class ProjectController(BaseController):
     """Controller for project management"""
@@ -16,12 +27,26 @@ class ProjectController(BaseController):
         
         return Project.get_by_user(current_user.id)
     
+    def get_user_projects_page(self, cursor=None, per_page=None):
+        """Get one page of current user's projects, newest first"""
+        if not current_user.is_authenticated:
+            return KeysetPage([])
+        
+        return Project.get_page_by_user(current_user.id, cursor, per_page)
+    
     def get_user_project(self, project_id):
         """Get specific project belonging to current user"""
         if not current_user.is_authenticated:
             return None
         
-        return Project.get_user_project(current_user.id, project_id)
+        return ownership.project(current_user.id, project_id)
+    
+    def get_project_validator(self, project_id, *extra):
+        """HTTP cache validator for a project of the user's and its contents, or None"""
+        if not current_user.is_authenticated:
+            return None
+        
+        return ResourceVersions.project(current_user.id, project_id, *extra)
     
     def create_project(self, name, description=None):
         """Create new project for current user"""
@@ -47,6 +72,7 @@ class ProjectController(BaseController):
         
         project = self.create(data)
         if project:
+            typeahead.invalidate(current_user.id)
             flash(f'Project "{project.name}" created successfully!', 'success')
         
         return project
@@ -76,6 +102,7 @@ class ProjectController(BaseController):
         
         updated_project = self.update(project_id, data)
         if updated_project:
+            typeahead.invalidate(current_user.id)
             flash(f'Project "{updated_project.name}" updated successfully!', 'success')
         
         return updated_project
@@ -89,30 +116,82 @@ class ProjectController(BaseController):
             return False
         
         project_name = project.name
+        prompt_ids = db.session.execute(db.select(Prompt.id).where(Prompt.project_id == project_id)).scalars().all()
         
         if self.delete(project_id):
+            typeahead.invalidate(current_user.id)
+            related_index.remove(current_user.id, prompt_ids)
             flash(f'Project "{project_name}" deleted successfully!', 'success')
             return True
         
         return False
     
+    def fork_project(self, project_id):
+        """Copy a project with all its prompts, responses and attachments.
+
+        Everything is copied server-side with INSERT ... SELECT in one transaction;
+        no prompt or response rows are loaded into Python.
+        """
+        project = self.get_user_project(project_id)
+        
+        if not project:
+            flash('Project not found', 'error')
+            return None
+        
+        try:
+            fork = Project(
+                user_id=current_user.id,
+                name=f'{project.name} (Fork)'[:100],
+                description=project.description
+            )
+            fork.forked_from_id = project.id
+            db.session.add(fork)
+            db.session.flush()
+            
+            Prompt.copy_to_project(project.id, fork.id)
+            cloned = Prompt.project_id == fork.id
+            PromptResponse.copy_to_clones(cloned)
+            Attachment.copy_to_clones(cloned)
+            search_index.add_prompts(cloned)
+            near_duplicates.add_prompts(cloned)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error forking project: {str(e)}', 'error')
+            return None
+        
+        typeahead.invalidate(current_user.id)
+        related_index.add_prompts(Prompt.project_id == fork.id)
+        flash(f'Project "{fork.name}" created successfully!', 'success')
+        return fork
+    
     def get_dashboard_data(self):
         """Get dashboard data for current user"""
         if not current_user.is_authenticated:
             return None
         
-        projects = self.get_user_projects()
-        
-        # Calculate statistics
-        total_projects = len(projects)
-        total_prompts = sum(project.get_prompts_count() for project in projects)
+        # Aggregate statistics in one query, whatever the library size
+        stats = LibraryStats.for_user(current_user.id)
         
         # Get recent projects (last 5)
-        recent_projects = projects[:5]
+        recent_projects = Project.get_page_by_user(current_user.id, per_page=5).items
         
         return {
-            'total_projects': total_projects,
-            'total_prompts': total_prompts,
+            'total_projects': stats['projects'],
+            'total_prompts': stats['prompts'],
+            'stats': stats,
             'recent_projects': recent_projects,
-            'all_projects': projects
-        }
\ No newline at end of file
+            'prompt_counts': self.get_prompt_counts(recent_projects)
+        }
+    
+    def get_prompt_counts(self, projects):
+        """Map project id -> prompt count for a list of projects"""
+        return LibraryStats.prompt_counts(project.id for project in projects)
+    
+    def get_project_stats(self, project_id):
+        """Get aggregate statistics for a project belonging to current user"""
+        project = self.get_user_project(project_id)
+        if not project:
+            return None
+        
+        return LibraryStats.for_project(project.id)
\ No newline at end of file
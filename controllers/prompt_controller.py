@@ -1,8 +1,21 @@
 from flask import flash, request
 from flask_login import current_user
 from core.base_controller import BaseController
+from core import db
 from models.prompt import Prompt
 from models.project import Project
+from models.prompt_response import PromptResponse
+from models.attachment import Attachment
+from core.pagination import KeysetPage
+from core.ownership import ownership
+from core.http_cache import ResourceVersions
+from core.typeahead import typeahead
+from core.search import document_search
+from core.search_index import search_index
+from core.near_duplicates import near_duplicates
+from core.related import related_index
+from models.search_document import ENTITY_TYPES
+from config import Config
 
 class PromptController(BaseController):
     """Controller for prompt management"""
@@ -17,13 +30,28 @@ class PromptController(BaseController):
         
         return Prompt.get_by_project(project_id)
     
-    def get_user_prompt(self, project_id, prompt_id):
-        """Get specific prompt belonging to user's project"""
+    def get_project_prompts_page(self, project_id, cursor=None, per_page=None):
+        """Get one page of a project's prompts, newest first"""
         project = self._get_user_project(project_id)
         if not project:
+            return KeysetPage([])
+        
+        return Prompt.get_page_by_project(project_id, cursor, per_page)
+    
+    def get_user_prompt(self, project_id, prompt_id):
+        """Get specific prompt belonging to user's project (one joined query)"""
+        if not current_user.is_authenticated:
             return None
         
-        return Prompt.get_project_prompt(project_id, prompt_id)
+        return ownership.prompt(current_user.id, project_id, prompt_id)
+    
+    def get_prompt_validator(self, project_id, prompt_id, *extra, responses=True, attachments=True):
+        """HTTP cache validator for a prompt of the user's, or None (no content loaded)"""
+        if not current_user.is_authenticated:
+            return None
+        
+        return ResourceVersions.prompt(current_user.id, project_id, prompt_id, *extra,
+                                       responses=responses, attachments=attachments)
     
     def create_prompt(self, project_id, title, content):
         """Create new prompt in project"""
@@ -45,6 +73,8 @@ class PromptController(BaseController):
         
         prompt = self.create(data)
         if prompt:
+            typeahead.invalidate(current_user.id)
+            related_index.update(prompt.id, current_user.id, prompt.title, prompt.content)
             flash(f'Prompt "{prompt.title}" created successfully!', 'success')
         
         return prompt
@@ -68,6 +98,8 @@ class PromptController(BaseController):
         
         updated_prompt = self.update(prompt_id, data)
         if updated_prompt:
+            typeahead.invalidate(current_user.id)
+            related_index.update(updated_prompt.id, current_user.id, updated_prompt.title, updated_prompt.content)
             flash(f'Prompt "{updated_prompt.title}" updated successfully!', 'success')
         
         return updated_prompt
@@ -82,13 +114,15 @@ class PromptController(BaseController):
         prompt_title = prompt.title
         
         if self.delete(prompt_id):
+            typeahead.invalidate(current_user.id)
+            related_index.remove(current_user.id, [prompt_id])
             flash(f'Prompt "{prompt_title}" deleted successfully!', 'success')
             return True
         
         return False
     
-    def search_prompts(self, search_term):
-        """Search user's prompts by title or content"""
+    def search_prompts(self, search_term, limit=None, prefix_last=False):
+        """Search user's prompts by title or content, ranked by relevance"""
         if not current_user.is_authenticated:
             return []
         
@@ -96,22 +130,96 @@ class PromptController(BaseController):
             flash('Search term must be at least 2 characters', 'error')
             return []
         
-        return Prompt.search_by_user(current_user.id, search_term.strip())
+        return Prompt.search_by_user(current_user.id, search_term.strip(),
+                                     limit=limit, prefix_last=prefix_last)
+    
+    def search_prompts_page(self, search_term, cursor=None, per_page=None, prefix_last=False):
+        """Search user's prompts one page at a time, newest first"""
+        if not current_user.is_authenticated:
+            return KeysetPage([])
+        
+        if not search_term or len(search_term.strip()) < 2:
+            flash('Search term must be at least 2 characters', 'error')
+            return KeysetPage([])
+        
+        return Prompt.search_page_by_user(current_user.id, search_term.strip(), cursor=cursor,
+                                          per_page=per_page, prefix_last=prefix_last)
+    
+    def search_documents(self, search_term, types=None, limit=None, prefix_last=False):
+        """Search the user's prompts, responses and attachments; hits grouped by prompt with type facets"""
+        if not current_user.is_authenticated:
+            return None
+        
+        if not search_term or len(search_term.strip()) < 2:
+            flash('Search term must be at least 2 characters', 'error')
+            return None
+        
+        types = [t for t in (types or []) if t in ENTITY_TYPES]
+        return document_search.search(current_user.id, search_term.strip(), types=types,
+                                      limit=limit, prefix_last=prefix_last)
+    
+    def find_similar(self, project_id, prompt_id, threshold=None, limit=None):
+        """Near-duplicates of one of the user's prompts across all their projects"""
+        prompt = self.get_user_prompt(project_id, prompt_id)
+        if not prompt:
+            return None
+        
+        if threshold is not None and not 0 < threshold <= 1:
+            threshold = None
+        return prompt.get_similar(threshold=threshold, limit=limit)
+    
+    def find_related(self, project_id, prompt_id, limit=None):
+        """The user's prompts closest in wording to this one (TF-IDF cosine), capped at RELATED_LIMIT"""
+        prompt = self.get_user_prompt(project_id, prompt_id)
+        if not prompt:
+            return None
+        
+        if not limit or limit < 1:
+            limit = Config.RELATED_LIMIT
+        return related_index.related(prompt, min(limit, Config.RELATED_LIMIT))
+    
+    def suggest(self, query, limit=None):
+        """Typeahead matches on the user's prompt and project titles, capped at TYPEAHEAD_MAX_LIMIT"""
+        if not current_user.is_authenticated or not query or not query.strip():
+            return []
+        
+        limit = min(limit or Config.TYPEAHEAD_LIMIT, Config.TYPEAHEAD_MAX_LIMIT)
+        return typeahead.suggest(current_user.id, query, limit)
     
     def duplicate_prompt(self, project_id, prompt_id, copy_responses=False):
-        """Duplicate a prompt (optionally with responses)"""
+        """Duplicate a prompt with its attachments (optionally with responses).
+
+        Child rows are copied server-side with INSERT ... SELECT in one transaction.
+        """
         original_prompt = self.get_user_prompt(project_id, prompt_id)
         if not original_prompt:
+            flash('Prompt not found', 'error')
             return None
         
-        duplicate_title = f"{original_prompt.title} (Copy)"
-        new_prompt = self.create_prompt(project_id, duplicate_title, original_prompt.content)
-        
-        if new_prompt and copy_responses:
-            from controllers.prompt_response_controller import PromptResponseController
-            prc = PromptResponseController()
-            prc.duplicate_responses(original_prompt.id, new_prompt.id)
+        try:
+            new_prompt = Prompt(
+                project_id=original_prompt.project_id,
+                title=f"{original_prompt.title} (Copy)"[:100],
+                content=original_prompt.content
+            )
+            new_prompt.cloned_from_id = original_prompt.id
+            db.session.add(new_prompt)
+            db.session.flush()
+            
+            Attachment.copy_to_prompt(original_prompt.id, new_prompt.id)
+            if copy_responses:
+                PromptResponse.copy_to_prompt(original_prompt.id, new_prompt.id)
+            search_index.add_prompts(Prompt.id == new_prompt.id)
+            near_duplicates.add_prompts(Prompt.id == new_prompt.id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error duplicating prompt: {str(e)}', 'error')
+            return None
         
+        typeahead.invalidate(current_user.id)
+        related_index.update(new_prompt.id, current_user.id, new_prompt.title, new_prompt.content)
+        flash(f'Prompt "{new_prompt.title}" created successfully!', 'success')
         return new_prompt
     
     def _get_user_project(self, project_id):
@@ -119,7 +227,7 @@ class PromptController(BaseController):
         if not current_user.is_authenticated:
             return None
         
-        return Project.get_user_project(current_user.id, project_id)
+        return ownership.project(current_user.id, project_id)
     
     def _validate_prompt_data(self, title, content):
         """Validate prompt form data"""
@@ -1,23 +1,48 @@
+from datetime import datetime, timedelta
 from flask import flash
 from flask_login import current_user
+from config import Config
+from core import db
 from core.base_controller import BaseController
 from models.prompt_response import PromptResponse
-from models.prompt import Prompt
-from models.project import Project
+from core.pagination import KeysetPage
+from core.ownership import ownership
+from core.http_cache import ResourceVersions
+from core.content_stats import measure
+from core.search_index import search_index
+
+ALLOWED_ROLES = {'user', 'assistant', 'system'}
 
 class PromptResponseController(BaseController):
     model_class = PromptResponse
 
-    def get_prompt_responses(self, project_id, prompt_id):
-        # check ownership using prompt->project
-        prompt = Prompt.get_project_prompt(project_id, prompt_id)
-        if not prompt or prompt.project.user_id != current_user.id:
-            return []
-        return PromptResponse.query.filter_by(prompt_id=prompt_id).order_by(PromptResponse.created_at).all()
+    def _get_user_prompt(self, project_id, prompt_id):
+        if not current_user.is_authenticated:
+            return None
+        return ownership.prompt(current_user.id, project_id, prompt_id)
+
+    def get_conversation_validator(self, project_id, prompt_id, *extra):
+        """HTTP cache validator for a prompt's conversation, or None (no content loaded)"""
+        if not current_user.is_authenticated:
+            return None
+        return ResourceVersions.prompt(current_user.id, project_id, prompt_id, *extra, attachments=False)
+
+    def get_prompt_responses(self, project_id, prompt_id, cursor=None, per_page=None, before=None, latest=False):
+        """One page of a conversation, always in chronological order.
+
+        `cursor` pages forward from the start. With `latest` or a `before` cursor the
+        page is the newest messages (older than `before`), for loading history backwards.
+        """
+        prompt = self._get_user_prompt(project_id, prompt_id)
+        if not prompt:
+            return KeysetPage([])
+        if latest or before:
+            return PromptResponse.get_history_by_prompt(prompt_id, before, per_page)
+        return PromptResponse.get_page_by_prompt(prompt_id, cursor, per_page)
 
     def add_response(self, project_id, prompt_id, role, content, metadata=None):
-        prompt = Prompt.get_project_prompt(project_id, prompt_id)
-        if not prompt or prompt.project.user_id != current_user.id:
+        prompt = self._get_user_prompt(project_id, prompt_id)
+        if not prompt:
             flash('Prompt not found or permission denied', 'error')
             return None
 
@@ -37,16 +62,69 @@ class PromptResponseController(BaseController):
             flash('Response saved', 'success')
         return resp
 
-    def duplicate_responses(self, src_prompt_id, dst_prompt_id):
-        src = self.model_class.query.filter_by(prompt_id=src_prompt_id).order_by(self.model_class.created_at).all()
-        copied = []
-        for r in src:
-            new = PromptResponse(
-                prompt_id=dst_prompt_id,
-                role=r.role,
-                content=r.content,
-                extra_metadata=r.extra_metadata
+    def add_responses(self, project_id, prompt_id, messages):
+        """Insert a batch of messages for one prompt in a single transaction.
+
+        Returns (rows, error, status): rows are dicts with the assigned id and created_at;
+        status is the HTTP status for the error (404 for a missing or foreign prompt).
+        """
+        prompt = self._get_user_prompt(project_id, prompt_id)
+        if not prompt:
+            return None, 'Prompt not found or permission denied', 404
+
+        if not isinstance(messages, list) or not messages:
+            return None, 'Expected a non-empty list of messages', 400
+
+        if len(messages) > Config.MAX_RESPONSE_BATCH:
+            return None, f'At most {Config.MAX_RESPONSE_BATCH} messages per batch', 400
+
+        # timestamps a microsecond apart keep the batch in submitted order
+        now = datetime.utcnow()
+        rows = []
+        for index, message in enumerate(messages):
+            if not isinstance(message, dict):
+                return None, f'Message {index}: expected an object', 400
+            role = message.get('role', 'assistant')
+            content = message.get('content')
+            if role not in ALLOWED_ROLES:
+                return None, f'Message {index}: invalid role {role!r}', 400
+            if not isinstance(content, str) or len(content.strip()) == 0:
+                return None, f'Message {index}: content is required', 400
+            content = content.strip()
+            rows.append({
+                'prompt_id': prompt.id,
+                'role': role,
+                'content': content,
+                'extra_metadata': message.get('metadata', message.get('extra_metadata')),
+                'content_html': PromptResponse.render_html(role, content),
+                **measure(content, estimate=False)._asdict(),
+                'created_at': now + timedelta(microseconds=index)
+            })
+
+        try:
+            # one multi-row INSERT ... RETURNING (batched by SQLAlchemy's insertmanyvalues)
+            result = db.session.execute(
+                db.insert(PromptResponse).returning(
+                    PromptResponse.id, PromptResponse.created_at, sort_by_parameter_order=True
+                ),
+                rows
             )
-            new.save()
-            copied.append(new)
-        return copied
\ No newline at end of file
+            inserted = [{'id': id, 'created_at': created_at} for id, created_at in result]
+            search_index.add_responses(PromptResponse.id.in_([row['id'] for row in inserted]))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return None, f'Error saving responses: {str(e)}', 400
+
+        return inserted, None, 201
+
+    def duplicate_responses(self, src_prompt_id, dst_prompt_id):
+        """Copy a conversation onto another prompt with one INSERT ... SELECT; returns the row count"""
+        try:
+            copied = PromptResponse.copy_to_prompt(src_prompt_id, dst_prompt_id)
+            search_index.reindex_responses(dst_prompt_id)
+            db.session.commit()
+            return copied
+        except Exception:
+            db.session.rollback()
+            raise
\ No newline at end of file
@@ -1,7 +1,11 @@
 from flask import flash, request
 from flask_login import current_user, login_required
 from core.base_controller import BaseController
+from core.passwords import HasherBusy
+from core.related import related_index
 from models.user import User
+from core.pagination import KeysetPage
+from core.stats import LibraryStats
 
 class UserController(BaseController):
     """Controller for user management"""
@@ -15,6 +19,17 @@ class UserController(BaseController):
         
         return self.model_class.get_all()
     
+    def get_users_page(self, cursor=None, per_page=None):
+        """Get one page of users, newest first (admin only)"""
+        if not current_user.is_authenticated or not current_user.is_admin:
+            return KeysetPage([])
+        
+        return self.model_class.get_keyset_page(cursor=cursor, per_page=per_page)
+    
+    def get_project_counts(self, users):
+        """Map user id -> project count for a list of users"""
+        return LibraryStats.project_counts(user.id for user in users)
+    
     def get_user(self, user_id):
         """Get specific user"""
         if not current_user.is_authenticated:
@@ -27,6 +42,28 @@ class UserController(BaseController):
         
         return None
     
+    def export_library(self, user_id, fmt='ndjson', compress=None):
+        """Streaming export of a user's library: (filename, mimetype, chunks) or None"""
+        if not current_user.is_authenticated:
+            return None
+        
+        # Users can export their own library, admins can export any
+        if not (current_user.is_admin or current_user.id == user_id):
+            flash('Permission denied', 'error')
+            return None
+        
+        from core.export import LibraryExport, FORMATS  # tarfile/zlib only load when exporting
+        
+        if fmt not in FORMATS or compress not in (None, '', 'gzip'):
+            flash('Unsupported export format', 'error')
+            return None
+        
+        if not self.get_by_id(user_id):
+            flash('User not found', 'error')
+            return None
+        
+        return LibraryExport(user_id).stream(fmt, compress or None)
+    
     def create_user(self, username, email, password, confirm_password, is_admin=False):
         """Create new user (admin only)"""
         if not current_user.is_authenticated or not current_user.is_admin:
@@ -47,7 +84,11 @@ class UserController(BaseController):
             return None
         
         # Create user
-        user = User.create_user(username, email, password, is_admin)
+        try:
+            user = User.create_user(username, email, password, is_admin)
+        except HasherBusy:
+            flash('The server is busy hashing passwords. Please try again in a moment.', 'error')
+            return None
         if user:
             flash(f'User "{user.username}" created successfully!', 'success')
         
@@ -114,8 +155,12 @@ class UserController(BaseController):
             return False
         
         # Verify current password for non-admin requests
-        if not current_user.is_admin and not user.check_password(current_password):
-            flash('Current password is incorrect', 'error')
+        try:
+            if not current_user.is_admin and not user.check_password(current_password):
+                flash('Current password is incorrect', 'error')
+                return False
+        except HasherBusy:
+            flash('The server is busy hashing passwords. Please try again in a moment.', 'error')
             return False
         
         # Validate new password
@@ -128,7 +173,11 @@ class UserController(BaseController):
             return False
         
         # Update password
-        user.set_password(new_password)
+        try:
+            user.set_password(new_password)
+        except HasherBusy:
+            flash('The server is busy hashing passwords. Please try again in a moment.', 'error')
+            return False
         user.save()
         flash('Password updated successfully!', 'success')
         return True
@@ -152,6 +201,7 @@ class UserController(BaseController):
         username = user.username
         
         if self.delete(user_id):
+            related_index.remove_user(user_id)
             flash(f'User "{username}" deleted successfully!', 'success')
             return True
         
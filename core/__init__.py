@@ -5,4 +5,14 @@ db = SQLAlchemy()
 
 def init_app_extensions(app):
     """Initialize Flask extensions"""
-    db.init_app(app)
\ No newline at end of file
+    from core.pool import engine_options, install_statement_timeout
+    
+    # Pool settings from DB_* config; explicit SQLALCHEMY_ENGINE_OPTIONS win
+    options = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    
+    db.init_app(app)
+    
+    with app.app_context():
+        install_statement_timeout(db.engine, app.config)
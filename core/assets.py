@@ -0,0 +1,122 @@
+import hashlib
+import json
+import mimetypes
+import os
+from flask import current_app, request, send_from_directory, url_for
+from core.compression import add_vary, encoders, is_compressible, negotiate
+
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+PRECOMPRESSED = {'br': '.br', 'zstd': '.zst', 'gzip': '.gz'}
+
+
+def _fingerprint(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+class AssetManifest:
+    """Maps static filenames to fingerprinted copies built by `flask assets build`"""
+
+    def __init__(self):
+        self._manifest = None
+        self._hashes = {}
+
+    def load(self):
+        if self._manifest is None:
+            path = os.path.join(current_app.static_folder, DIST_DIR, MANIFEST)
+            try:
+                with open(path) as f:
+                    self._manifest = json.load(f)
+            except FileNotFoundError:
+                self._manifest = {}
+        return self._manifest
+
+    def url(self, filename):
+        """URL for a static file: the built, fingerprinted copy when available.
+
+        Without a build (development), the file is served as is with its content
+        hash in the query string, so edits still bust caches.
+        """
+        built = self.load().get(filename)
+        if built:
+            return url_for('static', filename=f'{DIST_DIR}/{built}')
+        path = os.path.join(current_app.static_folder, filename)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._hashes.get(filename)
+        if cached is None or cached[0] != mtime:
+            cached = self._hashes[filename] = (mtime, _fingerprint(path))
+        return url_for('static', filename=filename, v=cached[1])
+
+    def build(self, static_folder):
+        """Write fingerprinted and precompressed copies of every static file into static/dist"""
+        dist = os.path.join(static_folder, DIST_DIR)
+        manifest = {}
+        for directory, dirs, files in os.walk(static_folder):
+            if os.path.abspath(directory) == os.path.abspath(dist):
+                dirs[:] = []
+                continue
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(directory, d)) != os.path.abspath(dist)]
+            for name in sorted(files):
+                source = os.path.join(directory, name)
+                relative = os.path.relpath(source, static_folder).replace(os.sep, '/')
+                stem, ext = os.path.splitext(relative)
+                built = f'{stem}.{_fingerprint(source)}{ext}'
+                target = os.path.join(dist, built)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(source, 'rb') as f:
+                    data = f.read()
+                with open(target, 'wb') as f:
+                    f.write(data)
+
+                mimetype = mimetypes.guess_type(name)[0]
+                if is_compressible(mimetype):
+                    for encoding, suffix in PRECOMPRESSED.items():
+                        if encoding in encoders():
+                            with open(target + suffix, 'wb') as f:
+                                f.write(encoders()[encoding](data))
+                manifest[relative] = built
+
+        with open(os.path.join(dist, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        self._manifest = manifest
+        return manifest
+
+
+assets = AssetManifest()
+
+
+def serve_static(filename):
+    """Static view: precompressed variants and immutable caching for fingerprinted files"""
+    static_folder = current_app.static_folder
+    immutable = filename.startswith(DIST_DIR + '/') or 'v' in request.args
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    response = None
+    if is_compressible(mimetype) and 'Range' not in request.headers:
+        available = [encoding for encoding, suffix in PRECOMPRESSED.items()
+                     if os.path.isfile(os.path.join(static_folder, filename + suffix))]
+        encoding = negotiate(available) if available else None
+        if encoding:
+            response = send_from_directory(static_folder, filename + PRECOMPRESSED[encoding], mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            add_vary(response)
+
+    if response is None:
+        response = send_from_directory(static_folder, filename)
+        if is_compressible(mimetype):
+            add_vary(response)
+
+    if immutable:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Serve static files through serve_static and expose asset_url() to templates"""
+    app.view_functions['static'] = serve_static
+    app.jinja_env.globals['asset_url'] = assets.url
@@ -1,5 +1,6 @@
 from flask import flash, redirect, url_for, request, jsonify
 from flask_login import current_user
+from core.ownership import ownership
 
 class BaseController:
     """Base controller with common functionality"""
@@ -55,6 +56,7 @@ class BaseController:
                 return False
             
             instance.delete()
+            ownership.forget()
             flash('Record deleted successfully', 'success')
             return True
         except Exception as e:
@@ -1,5 +1,6 @@
 from datetime import datetime
 from core import db
+from core.pagination import paginate_keyset
 
 class BaseModel(db.Model):
     """Base model with common fields and methods"""
@@ -8,18 +9,50 @@ class BaseModel(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    search_entity = None  # 'prompt', 'response' or 'attachment' for rows kept in search_documents
     
     def save(self):
-        """Save instance to database"""
+        """Save instance to database, bumping updated_at (the HTTP cache validator)"""
+        self.updated_at = datetime.utcnow()
         db.session.add(self)
+        db.session.flush()
+        self.update_indexes()
         db.session.commit()
         return self
     
     def delete(self):
-        """Delete instance from database"""
+        """Delete instance from database, with the index rows it owns"""
+        self.remove_indexes()
         db.session.delete(self)
         db.session.commit()
     
+    def update_indexes(self):
+        """Bring derived index rows up to date after a flush, in the save's transaction"""
+        if self.search_entity:
+            from core.search_index import search_index
+            search_index.index(self)
+    
+    def remove_indexes(self):
+        """Drop derived index rows before this row is deleted"""
+        from core.search_index import search_index
+        search_index.remove(self)
+    
+    def search_document(self):
+        """(title, body) indexed for this row; models with a search_entity override it"""
+        raise NotImplementedError
+    
+    def search_scope(self, documents):
+        """Condition on `documents` (SearchDocument) selecting the rows deleted along with this one.
+
+        Prompt, Project and User scopes use only prompt_id and user_id, so they also
+        apply to other per-prompt index tables such as LSHBucket.
+        """
+        if self.search_entity:
+            return db.and_(documents.entity_type == self.search_entity, documents.entity_id == self.id)
+        return None
+    
     @classmethod
     def get_by_id(cls, id):
         """Get instance by ID"""
@@ -39,6 +72,13 @@ class BaseModel(db.Model):
             error_out=False
         )
     
+    @classmethod
+    def get_keyset_page(cls, query=None, cursor=None, per_page=None, descending=True):
+        """Get one page ordered by (created_at, id), continuing after `cursor`"""
+        if query is None:
+            query = cls.query
+        return paginate_keyset(query, cls.created_at, cls.id, cursor, per_page, descending)
+    
     def to_dict(self):
         """Convert instance to dictionary"""
         return {
@@ -0,0 +1,61 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('app.boot')
+
+
+class BootTimer:
+    """Wall-clock time of each create_app() phase, reported once the app is built"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def report(self):
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'phases': dict(self.phases),
+        }
+
+
+def warm_up(app):
+    """Precompile every template, open the pool's connections and load the Markdown parser.
+
+    Moves first-request costs into boot (WARMUP_ON_BOOT), e.g. before a worker
+    starts accepting traffic.
+    """
+    from sqlalchemy.pool import QueuePool
+    from core import db
+    from core.markdown_renderer import markdown_renderer
+
+    env = app.jinja_env
+    for name in env.list_templates(extensions=['html']):
+        env.get_template(name)
+
+    with app.app_context():
+        pool = db.engine.pool
+        size = pool.size() if isinstance(pool, QueuePool) else 0
+        connections = [db.engine.connect() for _ in range(size)]
+        for connection in connections:
+            connection.close()  # back to the pool, already established
+
+    markdown_renderer.render('*warm-up*')  # imports markdown and builds this thread's parser
+
+
+def log_boot(app, timer):
+    """Keep the boot report on the app (see /admin/api/boot) and log it"""
+    report = timer.report()
+    app.extensions['boot_report'] = report
+    target = app.config.get('BOOT_TIME_TARGET_MS')
+    level = logging.WARNING if target and report['total_ms'] > target else logging.INFO
+    logger.log(level, 'app booted in %.1f ms %s', report['total_ms'], report['phases'])
+    return report
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+
+class LRUCache:
+    """Thread-safe mapping bounded to `maxsize` entries, evicting the least recently used"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+class MemoryCache:
+    """In-process cache with per-entry expiry, bounded like LRUCache.
+
+    Local stand-in for a shared backend: each worker process keeps its own copy.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.ttl = ttl
+        self._entries = LRUCache(maxsize)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._entries.delete(key)
+            return default
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries.set(key, (expires_at, value))
+
+    def delete(self, key):
+        self._entries.delete(key)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared by all workers through Redis; values are stored as JSON"""
+
+    def __init__(self, url, prefix='', ttl=None):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return default
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+
+CACHE_BACKENDS = {
+    'memory': lambda namespace, maxsize, ttl: MemoryCache(maxsize, ttl),
+    'redis': lambda namespace, maxsize, ttl: RedisCache(Config.CACHE_REDIS_URL, f'{namespace}:', ttl),
+}
+
+
+def make_cache(namespace, backend='memory', maxsize=1024, ttl=None):
+    """Create a cache from CACHE_BACKENDS; `namespace` keeps shared backends' keys apart"""
+    factory = CACHE_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f'Unknown cache backend: {backend}')
+    return factory(namespace, maxsize, ttl)
@@ -0,0 +1,305 @@
+import os
+import click
+from flask.cli import AppGroup
+from core import db
+
+db_cli = AppGroup('db', help='Schema management.')
+attachments_cli = AppGroup('attachments', help='Attachment storage maintenance.')
+assets_cli = AppGroup('assets', help='Static asset build.')
+export_cli = AppGroup('export', help='Library exports and backups.')
+stats_cli = AppGroup('stats', help='Stored content statistics.')
+search_cli = AppGroup('search', help='Unified search index.')
+similar_cli = AppGroup('similar', help='Near-duplicate prompt detection.')
+related_cli = AppGroup('related', help='Related prompts index.')
+
+
+@db_cli.command('upgrade')
+def upgrade_database():
+    """Create the schema on an empty database, or apply pending database/migrations."""
+    from core.migrations import upgrade
+
+    mode, versions = upgrade(db.engine)
+    if mode == 'created':
+        click.echo(f'Schema up to date; {len(versions)} migrations recorded as applied.')
+    else:
+        for version in versions:
+            click.echo(f'Applied {version}')
+        click.echo(f'{len(versions)} migrations applied.')
+
+
+@db_cli.command('status')
+def migration_status():
+    """List applied and pending migrations."""
+    from core.migrations import applied_versions, migration_files
+
+    applied = applied_versions(db.engine)
+    for version, _ in migration_files():
+        click.echo(f'{"applied" if version in applied else "pending":<8} {version}')
+
+
+@attachments_cli.command('migrate')
+@click.option('--batch-size', default=200, show_default=True, help='Rows moved per transaction.')
+def migrate_attachments(batch_size):
+    """Move inline attachment content into the blob store."""
+    from models.attachment import Attachment
+    from core.storage import get_blob_store
+
+    store = get_blob_store()
+    moved, last_id = 0, 0
+    while True:
+        batch = Attachment.query.filter(
+            Attachment.id > last_id,
+            Attachment.blob_hash.is_(None),
+            Attachment.content.isnot(None)
+        ).order_by(Attachment.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        for att in batch:
+            data = att.content.encode('utf-8')
+            att.blob_hash = store.put(data)
+            att.size = len(data)
+            att.content = None
+        db.session.commit()
+
+        moved += len(batch)
+        last_id = batch[-1].id
+        click.echo(f'Moved {moved} attachments...')
+
+    click.echo(f'Done. {moved} attachments now in the blob store.')
+
+
+@attachments_cli.command('gc')
+@click.option('--dry-run', is_flag=True, help='List unreferenced blobs without deleting them.')
+def collect_garbage(dry_run):
+    """Delete blobs no attachment row references (e.g. after prompt deletes)."""
+    from models.attachment import Attachment
+    from core.storage import get_blob_store
+
+    store = get_blob_store()
+    referenced = {h for (h,) in db.session.query(Attachment.blob_hash).filter(
+        Attachment.blob_hash.isnot(None)).distinct()}
+
+    removed = 0
+    for directory, _, files in os.walk(store.root):
+        for name in files:
+            if name.startswith('.tmp-') or name in referenced:
+                continue
+            removed += 1
+            if dry_run:
+                click.echo(os.path.join(directory, name))
+            else:
+                store.delete(name)
+
+    click.echo(f'{"Would remove" if dry_run else "Removed"} {removed} unreferenced blobs.')
+
+
+@assets_cli.command('build')
+def build_assets():
+    """Write fingerprinted, precompressed copies of static files to static/dist."""
+    from flask import current_app
+    from core.assets import assets
+    from core.compression import encoders
+
+    manifest = assets.build(current_app.static_folder)
+    click.echo(f'Built {len(manifest)} assets ({", ".join(sorted(encoders()))}).')
+
+
+@assets_cli.command('clean')
+def clean_assets():
+    """Remove static/dist so templates fall back to the source files."""
+    import shutil
+    from flask import current_app
+    from core.assets import DIST_DIR
+
+    shutil.rmtree(os.path.join(current_app.static_folder, DIST_DIR), ignore_errors=True)
+    click.echo('Removed built assets.')
+
+
+@export_cli.command('library')
+@click.argument('user')
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'tar']), default='ndjson', show_default=True)
+@click.option('--gzip', 'compress', flag_value='gzip', default=None, help='Compress the output with gzip.')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True),
+              help='File to write (default: stdout).')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows fetched per cursor round trip.')
+def export_library(user, fmt, compress, output, batch_size):
+    """Stream USER's library (username or id) to a file or stdout."""
+    import sys
+    from models.user import User
+    from core.export import LibraryExport
+
+    account = User.query.filter_by(username=user).first()
+    if account is None and user.isdigit():
+        account = db.session.get(User, int(user))
+    if account is None:
+        raise click.ClickException(f'No such user: {user}')
+
+    filename, _, chunks = LibraryExport(account.id, batch_size).stream(fmt, compress)
+    out = open(output, 'wb') if output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if output:
+            out.close()
+    if output:
+        click.echo(f'Wrote {written} bytes to {output}.', err=True)
+
+
+@stats_cli.command('backfill')
+@click.option('--batch-size', default=500, show_default=True, help='Rows updated per transaction.')
+@click.option('--all', 'recompute', is_flag=True, help='Recompute every row, e.g. after changing the tokenizer.')
+def backfill_stats(batch_size, recompute):
+    """Compute line/word/character/token counts for rows that have none."""
+    from models.prompt import Prompt
+    from models.prompt_response import PromptResponse
+    from models.attachment import Attachment
+    from core.content_stats import measure, token_counter
+
+    for model in (Prompt, PromptResponse, Attachment):
+        updated, last_id = 0, 0
+        columns = [model.id, model.content, model.updated_at] + ([model.blob_hash] if model is Attachment else [])
+        while True:
+            query = db.select(*columns).where(model.id > last_id).order_by(model.id).limit(batch_size)
+            if not recompute:
+                query = query.where(model.token_count.is_(None))
+            rows = db.session.execute(query).all()
+            if not rows:
+                break
+
+            changes = []
+            for row in rows:
+                text = row.content
+                if model is Attachment and row.blob_hash:
+                    from core.storage import get_blob_store
+                    text = get_blob_store().read(row.blob_hash).decode('utf-8', errors='replace')
+                # updated_at is written back unchanged so HTTP validators stay valid
+                changes.append({'id': row.id, 'updated_at': row.updated_at, **measure(text, estimate=False)._asdict()})
+            # bulk UPDATE by primary key
+            db.session.execute(db.update(model).execution_options(synchronize_session=False), changes)
+            db.session.commit()
+
+            updated += len(rows)
+            last_id = rows[-1].id
+        click.echo(f'{model.__tablename__}: {updated} rows measured.')
+
+    if not token_counter.exact:
+        click.echo('tiktoken or its encoding is unavailable; token counts were left empty '
+                   '(pip install -r requirements.txt, then `flask stats tokenizer`).')
+
+
+@stats_cli.command('tokenizer')
+def fetch_tokenizer():
+    """Download the TOKENIZER_ENCODING files into TIKTOKEN_CACHE_DIR, so token counting works offline."""
+    from config import Config
+    from core.content_stats import token_counter
+
+    if not token_counter.exact:
+        raise click.ClickException(f'Could not load {Config.TOKENIZER_ENCODING!r}; is tiktoken installed '
+                                   'and the network reachable?')
+    click.echo(f'{Config.TOKENIZER_ENCODING} cached in {os.environ.get("TIKTOKEN_CACHE_DIR")}.')
+
+
+@search_cli.command('reindex')
+@click.option('--user', 'user_ids', type=int, multiple=True, help='Only this user\'s library (repeatable).')
+def reindex_search(user_ids):
+    """Rebuild search_documents from prompts, responses and attachments, one user per transaction."""
+    from models.user import User
+    from models.project import Project
+    from core.search_index import search_index
+
+    if not user_ids:
+        user_ids = db.session.execute(db.select(User.id).order_by(User.id)).scalars().all()
+    total = 0
+    for user_id in user_ids:
+        indexed = search_index.reindex(Project.user_id == user_id)
+        db.session.commit()
+        total += indexed
+        click.echo(f'user {user_id}: {indexed} documents')
+    click.echo(f'{total} documents indexed for {len(user_ids)} users.')
+
+
+@search_cli.command('language')
+def rebuild_search_indexes():
+    """Recreate the full-text GIN indexes for SEARCH_LANGUAGE (the migrations build them for 'english')."""
+    from config import Config
+    from models.prompt import Prompt
+    from models.search_document import SearchDocument
+
+    if db.engine.dialect.name != 'postgresql':
+        raise click.ClickException('Only PostgreSQL has language-specific search indexes')
+    indexes = [index for model in (Prompt, SearchDocument) for index in model.__table__.indexes
+               if index.name in ('idx_prompts_search', 'idx_search_documents_search')]
+    with db.engine.begin() as conn:
+        for index in indexes:
+            conn.exec_driver_sql(f'DROP INDEX IF EXISTS {index.name}')
+            index.create(conn)
+            click.echo(f'{index.name} rebuilt')
+    click.echo(f'Search indexes use the {Config.SEARCH_LANGUAGE!r} text search configuration.')
+
+
+@similar_cli.command('backfill')
+@click.option('--all', 'recompute', is_flag=True, help='Re-sign every prompt, e.g. after changing MINHASH_* settings.')
+def backfill_signatures(recompute):
+    """Compute MinHash signatures and LSH buckets for prompts that have none."""
+    from core.near_duplicates import near_duplicates
+
+    signed = near_duplicates.backfill(recompute=recompute)
+    db.session.commit()
+    click.echo(f'{signed} prompts signed.')
+
+
+@similar_cli.command('clusters')
+@click.argument('username')
+@click.option('--threshold', type=float, help='Minimum estimated Jaccard similarity [NEAR_DUPLICATE_THRESHOLD].')
+@click.option('--json', 'as_json', is_flag=True, help='Print the clusters as JSON.')
+def duplicate_clusters(username, threshold, as_json):
+    """Group a user's prompts into clusters of near-duplicates."""
+    import json
+    from models.user import User
+    from models.prompt import Prompt
+    from core.near_duplicates import near_duplicates
+
+    user = User.get_by_username(username)
+    if not user:
+        raise click.ClickException(f'No user named {username!r}')
+
+    clusters = near_duplicates.clusters(user.id, threshold)
+    titles = dict(db.session.execute(
+        db.select(Prompt.id, Prompt.title).where(Prompt.id.in_([i for c in clusters for i in c]))
+    ).all())
+    if as_json:
+        click.echo(json.dumps([[{'id': i, 'title': titles.get(i)} for i in cluster] for cluster in clusters], indent=2))
+        return
+    for number, cluster in enumerate(clusters, 1):
+        click.echo(f'cluster {number} ({len(cluster)} prompts)')
+        for prompt_id in cluster:
+            click.echo(f'  {prompt_id:>8}  {titles.get(prompt_id)}')
+    click.echo(f'{len(clusters)} clusters, {sum(map(len, clusters))} prompts.')
+
+
+@related_cli.command('rebuild')
+def rebuild_related():
+    """Rebuild the related prompts index from every prompt, e.g. after generating data or changing RELATED_* settings."""
+    from core.related import related_index
+
+    if not related_index.enabled:
+        raise click.ClickException('RELATED_INDEX_DIR is empty; the related prompts index is disabled')
+    indexed = related_index.rebuild()
+    stats = related_index.stats()
+    click.echo(f'{indexed} prompts indexed ({stats["bytes"] / 1024 / 1024:.1f} MB in {related_index.directory}).')
+
+
+def register_commands(app):
+    """Attach maintenance commands to `flask --app app ...`"""
+    app.cli.add_command(db_cli)
+    app.cli.add_command(attachments_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(export_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(similar_cli)
+    app.cli.add_command(related_cli)
@@ -0,0 +1,107 @@
+import gzip
+from flask import request
+from config import Config
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'application/xml',
+    'image/svg+xml',
+}
+
+
+def _load_encoders():
+    """Available encoders by Content-Encoding token; brotli and zstandard are optional"""
+    encoders = {'gzip': lambda data: gzip.compress(data, compresslevel=Config.COMPRESSION_GZIP_LEVEL, mtime=0)}
+    try:
+        import brotli
+        encoders['br'] = lambda data: brotli.compress(data, quality=Config.COMPRESSION_BROTLI_QUALITY)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        compressor = zstandard.ZstdCompressor(level=Config.COMPRESSION_ZSTD_LEVEL)
+        encoders['zstd'] = compressor.compress
+    except ImportError:
+        pass
+    return encoders
+
+
+_encoders = None
+
+
+def encoders():
+    """Encoders by token; brotli/zstandard are imported on first use, not at boot"""
+    global _encoders
+    if _encoders is None:
+        _encoders = _load_encoders()
+    return _encoders
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES)
+
+
+def negotiate(available=None):
+    """Best Content-Encoding the client accepts, in COMPRESSION_ALGORITHMS preference order"""
+    offered = [name.strip() for name in Config.COMPRESSION_ALGORITHMS.split(',')]
+    offered = [name for name in offered if name in (available if available is not None else encoders())]
+    if not offered:
+        return None
+    return request.accept_encodings.best_match(offered)
+
+
+def add_vary(response, header='Accept-Encoding'):
+    if header not in response.vary:
+        response.vary.add(header)
+
+
+def weaken_etag(response):
+    """A strong ETag names exact bytes; the encoded body no longer matches it"""
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response):
+    """after_request hook: compress text-like bodies the client can decode"""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or (response.is_streamed and not response.direct_passthrough)
+            or not is_compressible(response.mimetype)):
+        return response
+
+    add_vary(response)
+    if request.method == 'HEAD' or 'Range' in request.headers:
+        return response  # byte ranges address the identity encoding
+
+    length = response.content_length
+    if length is None and not response.direct_passthrough:
+        length = response.calculate_content_length()
+    if length is not None and length < Config.COMPRESSION_MIN_SIZE:
+        return response
+    if response.direct_passthrough and (length is None or length > Config.COMPRESSION_MAX_SIZE):
+        return response  # large file downloads stay streamed
+
+    encoding = negotiate()
+    if encoding is None:
+        return response
+
+    if response.direct_passthrough:
+        response.direct_passthrough = False  # read the (small) file so it can be encoded
+    data = response.get_data()
+    if len(data) < Config.COMPRESSION_MIN_SIZE:
+        return response
+
+    response.set_data(encoders()[encoding](data))
+    response.headers['Content-Encoding'] = encoding
+    response.headers.pop('Accept-Ranges', None)
+    weaken_etag(response)
+    return response
+
+
+def init_compression(app):
+    """Negotiated gzip/brotli/zstd compression of HTML, JSON and text attachments"""
+    if app.config.get('COMPRESSION_ENABLED'):
+        app.after_request(compress_response)
@@ -0,0 +1,106 @@
+import hashlib
+import os
+from collections import namedtuple
+from config import Config
+from core import db
+from core.cache import LRUCache
+
+STAT_COLUMNS = ('line_count', 'word_count', 'char_count', 'token_count')
+
+ContentStats = namedtuple('ContentStats', STAT_COLUMNS)
+
+
+class TokenCounter:
+    """BPE token counts from tiktoken, with an LRU of results keyed by content hash.
+
+    Encoding files are read from TIKTOKEN_CACHE_DIR (`flask stats tokenizer`
+    fills it), so counting needs no network. Without tiktoken or its files,
+    count() falls back to the usual four-characters-per-token estimate, which is
+    shown but never stored (see measure).
+    """
+
+    def __init__(self, encoding_name=None, cache_size=None):
+        self.encoding_name = encoding_name or Config.TOKENIZER_ENCODING
+        self.cache = LRUCache(cache_size or Config.TOKEN_CACHE_SIZE)
+        self._encoding = None
+        self._loaded = False
+
+    @property
+    def encoding(self):
+        if not self._loaded:
+            self._loaded = True
+            if Config.TIKTOKEN_CACHE_DIR:
+                os.environ.setdefault('TIKTOKEN_CACHE_DIR', Config.TIKTOKEN_CACHE_DIR)
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception:  # not installed, or encoding files unavailable offline
+                self._encoding = None
+        return self._encoding
+
+    @property
+    def exact(self):
+        return self.encoding is not None
+
+    @staticmethod
+    def estimate(text):
+        return (len(text) + 3) // 4
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding is None:
+            return self.estimate(text)
+
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        tokens = self.cache.get(key)
+        if tokens is None:
+            tokens = len(self.encoding.encode(text, disallowed_special=()))
+            self.cache.set(key, tokens)
+        return tokens
+
+
+token_counter = TokenCounter()
+
+
+def measure(text, estimate=True):
+    """Line, word, character and token counts of `text`.
+
+    With estimate=False (values to store) token_count is None unless tiktoken
+    counted it, so `flask stats backfill` can fill in exact counts later.
+    """
+    text = text or ''
+    return ContentStats(
+        line_count=text.count('\n') + 1 if text else 0,
+        word_count=len(text.split()),
+        char_count=len(text),
+        token_count=token_counter.count(text) if estimate or token_counter.exact else None,
+    )
+
+
+class ContentStatsMixin:
+    """Stored content statistics, set whenever the model's text content is written"""
+
+    line_count = db.Column(db.Integer, nullable=True)
+    word_count = db.Column(db.Integer, nullable=True)
+    char_count = db.Column(db.Integer, nullable=True)
+    token_count = db.Column(db.Integer, nullable=True)
+
+    def set_content_stats(self, text):
+        for column, value in zip(STAT_COLUMNS, measure(text, estimate=False)):
+            setattr(self, column, value)
+
+    def stored_text(self):
+        """The text the statistics describe"""
+        return self.content or ''
+
+    @property
+    def stats(self):
+        """Stored statistics; rows without a stored token count are measured on the fly"""
+        if self.token_count is None:
+            return measure(self.stored_text())
+        return ContentStats(self.line_count, self.word_count, self.char_count, self.token_count)
+
+    @classmethod
+    def stat_columns(cls):
+        return [getattr(cls, column) for column in STAT_COLUMNS]
@@ -0,0 +1,388 @@
+import csv
+import io
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+from core import db
+from core.storage import get_blob_store, blobs_enabled
+from core.content_stats import measure, STAT_COLUMNS
+from core.passwords import password_hasher
+from core.search_index import search_index
+from core.near_duplicates import near_duplicates
+from core.related import related_index
+
+SYLLABLES = (
+    'ka lo mi ra te su no vi pa de zo ri ba mu ne lu fa go hi ju '
+    'an el in or us ex on al ar en'
+).split()
+COMMON_WORDS = (
+    'the of and to a in is you that it for on with as are this be at or by from '
+    'prompt model answer context summary system user assistant output example data '
+    'write explain list code table step result question format style tone'
+).split()
+
+
+class TextPool:
+    """Pre-generated texts with log-normally distributed word counts.
+
+    Rows draw from the pool instead of generating text per row, which keeps
+    output realistic in size while costing one random number per row. Rendered
+    HTML and content statistics are computed once per pool entry.
+    """
+
+    def __init__(self, rng, vocabulary, cum_weights, size, median_words, sigma,
+                 max_chars=None, markdown=False, render=None):
+        self.texts = []
+        for _ in range(size):
+            words = max(1, int(rng.lognormvariate(math.log(median_words), sigma)))
+            text = self._compose(rng, vocabulary, cum_weights, words, markdown)
+            if max_chars:
+                text = text[:max_chars].rstrip()
+            self.texts.append(text)
+        self.html = [render(text) for text in self.texts] if render else None
+        self.stats = [tuple(measure(text, estimate=False)) for text in self.texts]  # stored content statistics
+
+    @staticmethod
+    def _compose(rng, vocabulary, cum_weights, words, markdown):
+        tokens = rng.choices(vocabulary, cum_weights=cum_weights, k=words)
+        sentences, start = [], 0
+        while start < len(tokens):
+            length = rng.randint(6, 18)
+            sentence = ' '.join(tokens[start:start + length])
+            sentences.append(sentence[:1].upper() + sentence[1:] + '.')
+            start += length
+
+        paragraphs, start = [], 0
+        while start < len(sentences):
+            length = rng.randint(2, 5)
+            paragraphs.append(' '.join(sentences[start:start + length]))
+            start += length
+
+        if markdown and len(paragraphs) > 1:
+            # assistant-style replies: a heading, a list and the odd code block
+            paragraphs[0] = '## ' + paragraphs[0].split('.')[0]
+            if len(paragraphs) > 2:
+                paragraphs[1] = '\n'.join('- ' + s for s in paragraphs[1].split('. ') if s)
+            if rng.random() < 0.2:
+                paragraphs.append('```\n' + ' '.join(tokens[:12]) + '\n```')
+        return '\n\n'.join(paragraphs)
+
+    def pick(self, rng):
+        return int(rng.random() * len(self.texts))
+
+
+class _CsvStream:
+    """File-like object producing CSV from a row iterator on demand, for COPY FROM STDIN"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out, lineterminator='\n')
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _next_chunk(self, rows_per_chunk=1000):
+        self._out.seek(0)
+        self._out.truncate()
+        for _ in range(rows_per_chunk):
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+        return self._out.getvalue()
+
+
+class GeneratedData:
+    """Ids of one generated tree; every id follows from its position, no lookups needed"""
+
+    def __init__(self, generator, bases):
+        self.generator = generator
+        self.bases = bases
+
+    def user_id(self, u):
+        return self.bases['users'] + u
+
+    def username(self, u):
+        return f'{self.generator.username_prefix}{self.user_id(u)}'
+
+    def project_ids(self, u):
+        g = self.generator
+        return [self.bases['projects'] + u * g.projects + p for p in range(g.projects)]
+
+    def prompt_ids(self, u):
+        """(project_id, prompt_id) pairs owned by user `u`"""
+        g = self.generator
+        pairs = []
+        for p in range(g.projects):
+            project_index = u * g.projects + p
+            for q in range(g.prompts):
+                pairs.append((self.bases['projects'] + project_index,
+                              self.bases['prompts'] + project_index * g.prompts + q))
+        return pairs
+
+    def attachment_ids(self, u):
+        """(project_id, prompt_id, attachment_id) triples owned by user `u`"""
+        g = self.generator
+        triples = []
+        for project_id, prompt_id in self.prompt_ids(u):
+            prompt_index = prompt_id - self.bases['prompts']
+            for a in range(g.attachments):
+                triples.append((project_id, prompt_id,
+                                self.bases['attachments'] + prompt_index * g.attachments + a))
+        return triples
+
+    def counts(self):
+        g = self.generator
+        projects = g.users * g.projects
+        prompts = projects * g.prompts
+        return {
+            'users': g.users,
+            'projects': projects,
+            'prompts': prompts,
+            'prompt_responses': prompts * g.responses,
+            'attachments': prompts * g.attachments,
+        }
+
+
+class DataGenerator:
+    """Seeded bulk generator for users × projects × prompts × responses × attachments.
+
+    Ids are assigned up front (after the current maximum of each table), so foreign
+    keys are computed rather than read back. Rows stream into the database with
+    COPY on PostgreSQL and multi-row INSERTs elsewhere; sequences are advanced
+    afterwards. All generated users share `password`.
+    """
+
+    def __init__(self, users=10, projects=5, prompts=20, responses=10, attachments=1,
+                 seed=0, password='password', username_prefix='user',
+                 epoch=datetime(2025, 1, 1), span_days=365, pool_size=2000, chunk_size=5000):
+        self.users = users
+        self.projects = projects
+        self.prompts = prompts
+        self.responses = responses
+        self.attachments = attachments
+        self.seed = seed
+        self.password = password
+        self.username_prefix = username_prefix
+        self.epoch = epoch
+        self.span_days = span_days
+        self.pool_size = pool_size
+        self.chunk_size = chunk_size
+
+    def run(self, progress=None):
+        """Generate and load everything; returns a GeneratedData describing the ids"""
+        from models.user import User
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+        from models.attachment import Attachment
+
+        rng = random.Random(self.seed)
+        self._build_pools(rng)
+        models = [User, Project, Prompt, PromptResponse, Attachment]
+        bases = {model.__tablename__: self._next_id(model) for model in models}
+        data = GeneratedData(self, bases)
+
+        plan = [
+            (User, self._user_rows(bases)),
+            (Project, self._project_rows(rng, bases)),
+            (Prompt, self._prompt_rows(rng, bases)),
+            (PromptResponse, self._response_rows(rng, bases)),
+            (Attachment, self._attachment_rows(rng, bases)),
+        ]
+        counts = data.counts()
+        for model, (columns, rows) in plan:
+            self._load(model.__table__, columns, rows)
+            if progress:
+                progress(model.__tablename__, counts[model.__tablename__])
+
+        self._advance_sequences(models)
+
+        with db.engine.begin() as conn:
+            indexed = search_index.add_prompts(Prompt.id >= bases['prompts'], conn)
+            signed = near_duplicates.backfill(Prompt.id >= bases['prompts'], executor=conn)
+        related = related_index.add_prompts(Prompt.id >= bases['prompts'])  # files, after the rows are committed
+        if progress:
+            progress('search_documents', indexed)
+            progress('prompt_lsh_buckets', signed)
+            progress('related_index', related)
+        return data
+
+    # -- text -----------------------------------------------------------------
+
+    def _build_pools(self, rng):
+        from models.prompt_response import PromptResponse
+
+        vocabulary = list(COMMON_WORDS)
+        while len(vocabulary) < 3000:
+            vocabulary.append(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))))
+        # Zipf-like word frequencies
+        cum_weights = list(itertools.accumulate(1.0 / rank for rank in range(1, len(vocabulary) + 1)))
+
+        def pool(median, sigma, max_chars=None, markdown=False, render=None, size=self.pool_size):
+            return TextPool(rng, vocabulary, cum_weights, size, median, sigma,
+                            max_chars=max_chars, markdown=markdown, render=render)
+
+        self.titles = pool(5, 0.4, max_chars=100, size=min(self.pool_size, 500))
+        self.descriptions = pool(20, 0.6, size=min(self.pool_size, 500))
+        self.prompt_texts = pool(80, 0.9, max_chars=10000)
+        self.user_texts = pool(40, 1.0)
+        self.assistant_texts = pool(220, 0.8, markdown=True,
+                                    render=lambda text: PromptResponse.render_html('assistant', text))
+        self.attachment_texts = pool(300, 0.9, size=min(self.pool_size, 200))
+
+        self.attachment_blobs = None
+        if blobs_enabled():
+            store = get_blob_store()
+            self.attachment_blobs = [
+                (store.put(text.encode('utf-8')), len(text.encode('utf-8')))
+                for text in self.attachment_texts.texts
+            ]
+
+    def _timestamp(self, rng):
+        return self.epoch + timedelta(seconds=rng.random() * self.span_days * 86400)
+
+    # -- rows -----------------------------------------------------------------
+
+    def _user_rows(self, bases):
+        password_hash = password_hasher.hash(self.password)  # hashing per user would dominate
+        columns = ['id', 'username', 'email', 'password', 'is_admin', 'created_at']
+
+        def rows():
+            for u in range(self.users):
+                user_id = bases['users'] + u
+                username = f'{self.username_prefix}{user_id}'
+                yield (user_id, username, f'{username}@example.test', password_hash, False,
+                       self.epoch + timedelta(minutes=u))
+        return columns, rows()
+
+    def _project_rows(self, rng, bases):
+        columns = ['id', 'user_id', 'name', 'description', 'created_at']
+
+        def rows():
+            for u in range(self.users):
+                for p in range(self.projects):
+                    yield (bases['projects'] + u * self.projects + p, bases['users'] + u,
+                           self.titles.texts[self.titles.pick(rng)],
+                           self.descriptions.texts[self.descriptions.pick(rng)],
+                           self._timestamp(rng))
+        return columns, rows()
+
+    def _prompt_rows(self, rng, bases):
+        columns = ['id', 'project_id', 'title', 'content', *STAT_COLUMNS, 'created_at']
+
+        def rows():
+            for project_index in range(self.users * self.projects):
+                for q in range(self.prompts):
+                    index = self.prompt_texts.pick(rng)
+                    yield (bases['prompts'] + project_index * self.prompts + q,
+                           bases['projects'] + project_index,
+                           self.titles.texts[self.titles.pick(rng)],
+                           self.prompt_texts.texts[index], *self.prompt_texts.stats[index],
+                           self._timestamp(rng))
+        return columns, rows()
+
+    def _response_rows(self, rng, bases):
+        columns = ['id', 'prompt_id', 'role', 'content', 'content_html', *STAT_COLUMNS, 'created_at']
+
+        def rows():
+            response_id = bases['prompt_responses']
+            for prompt_index in range(self.users * self.projects * self.prompts):
+                prompt_id = bases['prompts'] + prompt_index
+                started = self._timestamp(rng)
+                for r in range(self.responses):
+                    created_at = started + timedelta(seconds=30 * r)
+                    if r % 2 == 0:
+                        index = self.user_texts.pick(rng)
+                        yield (response_id, prompt_id, 'user', self.user_texts.texts[index], None,
+                               *self.user_texts.stats[index], created_at)
+                    else:
+                        index = self.assistant_texts.pick(rng)
+                        yield (response_id, prompt_id, 'assistant', self.assistant_texts.texts[index],
+                               self.assistant_texts.html[index], *self.assistant_texts.stats[index], created_at)
+                    response_id += 1
+        return columns, rows()
+
+    def _attachment_rows(self, rng, bases):
+        columns = ['id', 'prompt_id', 'filename', 'mime_type', 'content', 'blob_hash', 'size', *STAT_COLUMNS,
+                   'created_at']
+
+        def rows():
+            attachment_id = bases['attachments']
+            for prompt_index in range(self.users * self.projects * self.prompts):
+                for a in range(self.attachments):
+                    index = self.attachment_texts.pick(rng)
+                    text = self.attachment_texts.texts[index]
+                    if self.attachment_blobs:
+                        blob_hash, size = self.attachment_blobs[index]
+                        content = None
+                    else:
+                        blob_hash, size, content = None, len(text.encode('utf-8')), text
+                    yield (attachment_id, bases['prompts'] + prompt_index, f'notes-{a + 1}.txt',
+                           'text/plain', content, blob_hash, size, *self.attachment_texts.stats[index],
+                           self._timestamp(rng))
+                    attachment_id += 1
+        return columns, rows()
+
+    # -- loading --------------------------------------------------------------
+
+    @staticmethod
+    def _next_id(model):
+        with db.engine.connect() as conn:
+            return (conn.execute(db.select(db.func.max(model.id))).scalar() or 0) + 1
+
+    def _load(self, table, columns, rows):
+        # generated rows end with created_at; new rows start out unmodified
+        columns = columns + ['updated_at']
+        rows = (row + (row[-1],) for row in rows)
+        with db.engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                self._copy(conn, table, columns, rows)
+            else:
+                self._insert(conn, table, columns, rows)
+
+    @staticmethod
+    def _copy(conn, table, columns, rows):
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f'COPY {table.name} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)',
+                _CsvStream(rows)
+            )
+        finally:
+            cursor.close()
+
+    def _insert(self, conn, table, columns, rows):
+        statement = table.insert()
+        batch = []
+        for row in rows:
+            batch.append(dict(zip(columns, row)))
+            if len(batch) >= self.chunk_size:
+                conn.execute(statement, batch)
+                batch = []
+        if batch:
+            conn.execute(statement, batch)
+
+    @staticmethod
+    def _advance_sequences(models):
+        if db.engine.dialect.name != 'postgresql':
+            return  # SQLite picks max(rowid) + 1 by itself
+        with db.engine.begin() as conn:
+            for model in models:
+                table = model.__tablename__
+                conn.execute(db.text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                ))
+
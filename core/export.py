@@ -0,0 +1,213 @@
+import io
+import json
+import os
+import tarfile
+import time
+import zlib
+from datetime import datetime
+from core import db
+
+EXPORT_VERSION = 1
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'tar': ('application/x-tar', 'tar'),
+}
+CHUNK_SIZE = 64 * 1024
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+def _dumps(record):
+    return json.dumps(record, default=_json_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte stream into gzip members on the fly, one output chunk per input chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _TarSink:
+    """Write target for a streaming tarfile; drained after every member"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        self.buffer.write(data)
+        return len(data)
+
+    def drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+class LibraryExport:
+    """A user's projects, prompts, responses and attachments as a stream of bytes.
+
+    Every table is read with one server-side cursor (`yield_per`) over plain column
+    rows, never ORM objects, so memory stays flat whatever the library size. Parents
+    always precede their children, which keeps the stream importable in one pass.
+    """
+
+    def __init__(self, user_id, batch_size=1000):
+        self.user_id = user_id
+        self.batch_size = batch_size
+
+    def _stream(self, query):
+        result = db.session.execute(query.execution_options(yield_per=self.batch_size))
+        for row in result.mappings():
+            yield dict(row)
+
+    def header(self):
+        from models.user import User
+
+        user = db.session.execute(
+            db.select(User.id, User.username, User.email, User.is_admin, User.created_at, User.updated_at)
+            .where(User.id == self.user_id)
+        ).mappings().first()
+        return {
+            'type': 'export',
+            'version': EXPORT_VERSION,
+            'exported_at': datetime.utcnow(),
+            'user': dict(user) if user else None,
+        }
+
+    def projects(self):
+        from models.project import Project
+
+        return self._stream(
+            db.select(Project.id, Project.name, Project.description, Project.forked_from_id,
+                      Project.created_at, Project.updated_at)
+            .where(Project.user_id == self.user_id).order_by(Project.id))
+
+    def prompts(self):
+        from models.project import Project
+        from models.prompt import Prompt
+
+        return self._stream(
+            db.select(Prompt.id, Prompt.project_id, Prompt.title, Prompt.content, Prompt.cloned_from_id,
+                      Prompt.created_at, Prompt.updated_at)
+            .join(Project).where(Project.user_id == self.user_id).order_by(Prompt.id))
+
+    def responses(self):
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+
+        return self._stream(
+            db.select(PromptResponse.id, PromptResponse.prompt_id, Prompt.project_id, PromptResponse.role,
+                      PromptResponse.content, PromptResponse.extra_metadata,
+                      PromptResponse.created_at, PromptResponse.updated_at)
+            .join(Prompt, PromptResponse.prompt_id == Prompt.id).join(Project)
+            .where(Project.user_id == self.user_id).order_by(PromptResponse.id))
+
+    def attachments(self):
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.attachment import Attachment
+
+        return self._stream(
+            db.select(Attachment.id, Attachment.prompt_id, Prompt.project_id, Attachment.filename,
+                      Attachment.mime_type, Attachment.size, Attachment.blob_hash, Attachment.content,
+                      Attachment.created_at, Attachment.updated_at)
+            .join(Prompt, Attachment.prompt_id == Prompt.id).join(Project)
+            .where(Project.user_id == self.user_id).order_by(Attachment.id))
+
+    @staticmethod
+    def _attachment_bytes(row):
+        from core.storage import get_blob_store
+
+        if row['blob_hash']:
+            return get_blob_store().read(row['blob_hash'])
+        return (row['content'] or '').encode('utf-8')
+
+    def records(self):
+        """Export header, then projects, prompts, responses and attachments as dicts"""
+        yield self.header()
+        for kind, rows in (('project', self.projects()), ('prompt', self.prompts()),
+                           ('response', self.responses())):
+            for row in rows:
+                yield {'type': kind, **row}
+        for row in self.attachments():
+            content = self._attachment_bytes(row).decode('utf-8', errors='replace')
+            row.pop('blob_hash')
+            yield {'type': 'attachment', **row, 'content': content}
+
+    def ndjson(self):
+        """One JSON object per line, flushed in ~64 KB chunks"""
+        buffered, size = [], 0
+        for record in self.records():
+            line = (_dumps(record) + '\n').encode('utf-8')
+            buffered.append(line)
+            size += len(line)
+            if size >= CHUNK_SIZE:
+                yield b''.join(buffered)
+                buffered, size = [], 0
+        if buffered:
+            yield b''.join(buffered)
+
+    def tar(self):
+        """A tar of JSON files (one per row) plus raw attachment files, streamed member by member"""
+        sink = _TarSink()
+        archive = tarfile.open(fileobj=sink, mode='w|', format=tarfile.PAX_FORMAT)
+        now = time.time()
+
+        def add(name, data, fileobj=None, size=None):
+            info = tarfile.TarInfo(name)
+            info.mtime = now
+            info.mode = 0o644
+            if fileobj is None:
+                info.size = len(data)
+                fileobj = io.BytesIO(data)
+            else:
+                info.size = size
+            archive.addfile(info, fileobj)
+            return sink.drain()
+
+        yield add('library/export.json', _dumps(self.header()).encode('utf-8'))
+        for row in self.projects():
+            yield add(f'library/projects/{row["id"]}/project.json', _dumps(row).encode('utf-8'))
+        for row in self.prompts():
+            yield add(f'library/projects/{row["project_id"]}/prompts/{row["id"]}/prompt.json',
+                      _dumps(row).encode('utf-8'))
+        for row in self.responses():
+            yield add(f'library/projects/{row["project_id"]}/prompts/{row["prompt_id"]}'
+                      f'/responses/{row["id"]}.json', _dumps(row).encode('utf-8'))
+        for row in self.attachments():
+            base = f'library/projects/{row["project_id"]}/prompts/{row["prompt_id"]}/attachments/{row["id"]}'
+            filename = os.path.basename(row['filename'].replace('\\', '/')) or 'attachment'
+            meta = {key: value for key, value in row.items() if key != 'content'}
+            yield add(f'{base}.json', _dumps(meta).encode('utf-8'))
+            yield self._tar_attachment(add, f'{base}/{filename}', row)
+
+        archive.close()
+        yield sink.drain()
+
+    def _tar_attachment(self, add, name, row):
+        from core.storage import get_blob_store
+
+        path = get_blob_store().path(row['blob_hash']) if row['blob_hash'] else None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                return add(name, None, f, os.fstat(f.fileno()).st_size)
+        return add(name, self._attachment_bytes(row))
+
+    def stream(self, fmt='ndjson', compress=None):
+        """(filename, mimetype, byte chunks) for an export in `fmt`, optionally gzip-compressed"""
+        mimetype, extension = FORMATS[fmt]
+        chunks = self.ndjson() if fmt == 'ndjson' else self.tar()
+        filename = f'library-{self.user_id}-{datetime.utcnow():%Y%m%d}.{extension}'
+        if compress == 'gzip':
+            return filename + '.gz', 'application/gzip', gzip_chunks(chunks)
+        return filename, mimetype, chunks
@@ -0,0 +1,138 @@
+import hashlib
+import os
+from flask import current_app, request, session
+from flask_login import current_user
+from core import db
+
+_deploy_token = None
+
+
+def deploy_token():
+    """Fingerprint of the templates and static files, so HTML validators change on deploy"""
+    global _deploy_token
+    if _deploy_token is None:
+        digest = hashlib.sha256()
+        for folder in (current_app.template_folder, current_app.static_folder):
+            root = os.path.join(current_app.root_path, folder) if folder else None
+            if not root or not os.path.isdir(root):
+                continue
+            for directory, _, files in sorted(os.walk(root)):
+                for name in sorted(files):
+                    stat = os.stat(os.path.join(directory, name))
+                    digest.update(f'{directory}/{name}:{stat.st_mtime_ns}:{stat.st_size}'.encode())
+        _deploy_token = digest.hexdigest()[:16]
+    return _deploy_token
+
+
+def page_parts():
+    """Validator inputs every rendered page depends on besides its data: viewer, URL and deploy"""
+    return (current_user.get_id(), getattr(current_user, 'updated_at', None),
+            request.query_string, deploy_token())
+
+
+class Validator:
+    """Strong ETag and Last-Modified for a response, derived from row versions"""
+
+    def __init__(self, parts, last_modified):
+        self.etag = hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32]
+        self.last_modified = last_modified
+
+
+def not_modified(validator, for_html=False):
+    """A 304 response if the client's cached copy is current, else None.
+
+    HTML pages (`for_html`) are always rendered while a flash message is pending,
+    since the page would show it; JSON endpoints never render flashes.
+    """
+    if for_html and session.get('_flashes'):
+        return None
+
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(validator.etag)
+    elif request.if_modified_since and validator.last_modified:
+        fresh = validator.last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        fresh = False
+
+    if not fresh:
+        return None
+    return with_validator(current_app.response_class(status=304), validator)
+
+
+def with_validator(response, validator):
+    """Attach the validator; clients must revalidate before reusing the response"""
+    response.set_etag(validator.etag)
+    if validator.last_modified:
+        response.last_modified = validator.last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _children(model, condition, joins=()):
+    """Count, newest updated_at and highest id of child rows: changes on insert, update and delete"""
+    columns = []
+    for aggregate in (db.func.count(model.id), db.func.max(model.updated_at), db.func.max(model.id)):
+        query = db.select(aggregate)
+        for target in joins:
+            query = query.join(target)
+        columns.append(query.where(condition).scalar_subquery())
+    return columns
+
+
+def _latest(*timestamps):
+    present = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(present) if present else None
+
+
+class ResourceVersions:
+    """Validators computed from updated_at and child aggregates, without loading content columns"""
+
+    @staticmethod
+    def prompt(user_id, project_id, prompt_id, *extra, responses=True, attachments=True):
+        """Validator for a prompt owned by `user_id`, or None if there is no such prompt"""
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+        from models.attachment import Attachment
+
+        columns = [Prompt.updated_at, Project.updated_at]
+        if responses:
+            columns += _children(PromptResponse, PromptResponse.prompt_id == Prompt.id)
+        if attachments:
+            columns += _children(Attachment, Attachment.prompt_id == Prompt.id)
+
+        row = db.session.execute(
+            db.select(*columns).select_from(Prompt).join(Project)
+            .where(Prompt.id == prompt_id, Prompt.project_id == project_id, Project.user_id == user_id)
+        ).first()
+        if row is None:
+            return None
+
+        timestamps = [row[0], row[1]]
+        if responses:
+            timestamps.append(row[3])
+        if attachments:
+            timestamps.append(row[-2])
+        return Validator(('prompt', prompt_id, tuple(row), extra), _latest(*timestamps))
+
+    @staticmethod
+    def project(user_id, project_id, *extra):
+        """Validator for a project owned by `user_id` and everything in it, or None"""
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+        from models.attachment import Attachment
+
+        in_project = Prompt.project_id == Project.id
+        columns = [Project.updated_at]
+        columns += _children(Prompt, in_project)
+        columns += _children(PromptResponse, in_project, [Prompt])
+        columns += _children(Attachment, in_project, [Prompt])
+
+        row = db.session.execute(
+            db.select(*columns).where(Project.id == project_id, Project.user_id == user_id)
+        ).first()
+        if row is None:
+            return None
+        return Validator(('project', project_id, tuple(row), extra), _latest(row[0], row[2], row[5], row[8]))
@@ -0,0 +1,149 @@
+import json
+import logging
+import re
+import time
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from config import Config
+from core import db
+
+logger = logging.getLogger('app.sql')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM_RE = re.compile(r'%\(\w+\)s|%s|:\w+|\?')
+_LIST_RE = re.compile(r'\(\?(?:\s*,\s*\?)+\)')
+
+
+def statement_shape(statement):
+    """Normalize SQL so statements differing only in parameters or literals compare equal"""
+    shape = _WHITESPACE_RE.sub(' ', statement).strip()
+    shape = _STRING_RE.sub('?', shape)
+    shape = _PARAM_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    return _LIST_RE.sub('(...)', shape)
+
+
+class RequestQueryStats:
+    """Queries issued while handling one request, grouped by statement shape"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = {}
+        self.templates = []
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        shape = statement_shape(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            entry = self.shapes[shape] = {
+                'count': 0,
+                'duration': 0.0,
+                'template': self.templates[-1] if self.templates else None,
+            }
+        entry['count'] += 1
+        entry['duration'] += duration
+
+    def repeated(self):
+        return {shape: entry for shape, entry in self.shapes.items() if entry['count'] > 1}
+
+    def likely_n_plus_one(self, threshold):
+        """Repeated SELECT shapes at or above `threshold` executions: usually a lazy load in a loop"""
+        return [
+            {
+                'statement': shape,
+                'count': entry['count'],
+                'ms': round(entry['duration'] * 1000, 3),
+                'template': entry['template'],
+            }
+            for shape, entry in self.shapes.items()
+            if entry['count'] >= threshold and shape.upper().startswith('SELECT')
+        ]
+
+
+def _current_stats():
+    if not has_request_context():
+        return None
+    return g.get('_sql_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['_query_started'].pop()
+    stats = _current_stats()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(context):
+    if context.connection is not None:
+        started = context.connection.info.get('_query_started')
+        if started:
+            started.pop()
+
+
+def _template_started(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None:
+        stats.templates.append(template.name)
+
+
+def _template_finished(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None and stats.templates:
+        stats.templates.pop()
+
+
+def _start_request():
+    g._sql_stats = RequestQueryStats()
+
+
+def _finish_request(response):
+    stats = g.pop('_sql_stats', None)
+    if stats is None:
+        return response
+
+    db_ms = round(stats.duration * 1000, 3)
+    response.headers.add(
+        'Server-Timing', f'db;dur={db_ms};desc="{stats.count} queries"'
+    )
+
+    n_plus_one = stats.likely_n_plus_one(Config.SQL_N_PLUS_ONE_THRESHOLD)
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'queries': stats.count,
+        'db_ms': db_ms,
+        'repeated': {shape: entry['count'] for shape, entry in stats.repeated().items()},
+        'n_plus_one': n_plus_one,
+    }
+    if n_plus_one:
+        logger.warning(json.dumps(record))
+    else:
+        logger.info(json.dumps(record))
+    return response
+
+
+def init_instrumentation(app):
+    """Count queries and DB time per request; report via Server-Timing and the app.sql log"""
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,41 @@
+import hashlib
+import threading
+from config import Config
+from core.cache import LRUCache
+
+
+class MarkdownRenderer:
+    """Markdown to HTML with reused parser instances and an LRU of rendered output"""
+
+    def __init__(self, extensions=None, cache_size=None):
+        self.extensions = extensions or ['fenced_code']
+        self.cache = LRUCache(cache_size or Config.MARKDOWN_CACHE_SIZE)
+        self._local = threading.local()
+
+    def _parser(self):
+        """Per-thread Markdown instance; instances are reusable but not thread-safe"""
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            import markdown
+            parser = markdown.Markdown(extensions=self.extensions)
+            self._local.parser = parser
+        return parser
+
+    @staticmethod
+    def cache_key(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def render(self, text):
+        """Render `text`, reusing the cached HTML for content seen before"""
+        if not text:
+            return ''
+
+        key = self.cache_key(text)
+        html = self.cache.get(key)
+        if html is None:
+            html = self._parser().reset().convert(text)
+            self.cache.set(key, html)
+        return html
+
+
+markdown_renderer = MarkdownRenderer()
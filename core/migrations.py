@@ -0,0 +1,67 @@
+import glob
+import os
+from datetime import datetime
+from core import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'migrations')
+
+# Kept out of db.metadata so drop_all()/create_all() in scripts never touch it
+_metadata = db.MetaData()
+schema_migrations = db.Table(
+    'schema_migrations', _metadata,
+    db.Column('version', db.String(255), primary_key=True),
+    db.Column('applied_at', db.DateTime, nullable=False),
+)
+
+
+def migration_files():
+    """(version, path) of every SQL migration, in order"""
+    paths = sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*.sql')))
+    return [(os.path.splitext(os.path.basename(path))[0], path) for path in paths]
+
+
+def applied_versions(engine):
+    with engine.connect() as conn:
+        if not db.inspect(conn).has_table('schema_migrations'):
+            return set()
+        return set(conn.execute(db.select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(engine):
+    applied = applied_versions(engine)
+    return [(version, path) for version, path in migration_files() if version not in applied]
+
+
+def _record(conn, versions):
+    if versions:
+        now = datetime.utcnow()
+        conn.execute(db.insert(schema_migrations), [{'version': v, 'applied_at': now} for v in versions])
+
+
+def upgrade(engine):
+    """Bring the schema up to date; returns (mode, versions).
+
+    A database without tables gets the full schema from the models and every
+    migration is recorded as already applied ('created'). An existing PostgreSQL
+    database runs each pending migration file in its own transaction ('migrated').
+    The migrations are PostgreSQL SQL, so other databases only get missing tables
+    created ('created').
+    """
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        fresh = not db.inspect(conn).has_table('users')
+    pending = pending_migrations(engine)
+
+    if fresh or engine.dialect.name != 'postgresql':
+        db.metadata.create_all(engine)
+        with engine.begin() as conn:
+            _record(conn, [version for version, _ in pending])
+        return 'created', [version for version, _ in pending]
+
+    for version, path in pending:
+        with open(path) as f:
+            sql = f.read()
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql)
+            _record(conn, [version])
+    return 'migrated', [version for version, _ in pending]
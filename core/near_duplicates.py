@@ -0,0 +1,315 @@
+import hashlib
+import re
+import zlib
+from collections import namedtuple
+from config import Config
+from core import db
+from core.cache import LRUCache
+from models.lsh_bucket import LSHBucket
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+MERSENNE_PRIME = (1 << 31) - 1  # a * x + b stays below 2**63 for a, b, x < 2**31
+
+SimilarPrompt = namedtuple('SimilarPrompt', 'prompt_id title project_id project_name similarity')
+
+
+class MinHasher:
+    """MinHash signatures of word shingles, as compact uint32 NumPy arrays.
+
+    Each of `permutations` hash functions h(x) = (a * x + b) mod p keeps its minimum
+    over the shingle hashes; the fraction of equal positions in two signatures
+    estimates the Jaccard similarity of the shingle sets. Signatures are split
+    into `bands` bands; two texts share a band bucket with probability
+    1 - (1 - s**rows)**bands, which is what makes LSH candidate lookup work.
+    """
+
+    def __init__(self, permutations=None, bands=None, shingle_size=None, seed=1):
+        import numpy as np
+
+        self.permutations = permutations or Config.MINHASH_PERMUTATIONS
+        self.bands = bands or Config.MINHASH_BANDS
+        if self.permutations % self.bands:
+            raise ValueError('MINHASH_PERMUTATIONS must be a multiple of MINHASH_BANDS')
+        self.rows = self.permutations // self.bands
+        self.shingle_size = shingle_size or Config.MINHASH_SHINGLE_SIZE
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, self.permutations, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, self.permutations, dtype=np.uint64)
+        # band i's bucket keys never collide with band j's
+        self.band_salt = np.arange(1, self.bands + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+    @property
+    def nbytes(self):
+        return self.permutations * 4
+
+    def shingles(self, text):
+        """CRC32 of every run of `shingle_size` words (lowercased)"""
+        words = WORD_RE.findall((text or '').lower())
+        if len(words) < self.shingle_size:
+            return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+        k = self.shingle_size
+        return {zlib.crc32(' '.join(words[i:i + k]).encode('utf-8')) for i in range(len(words) - k + 1)}
+
+    def signature(self, text, chunk=1024):
+        """uint32 signature array, or None for text without words"""
+        import numpy as np
+
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles)) % np.uint64(MERSENNE_PRIME)
+        result = np.full(self.permutations, MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, len(x), chunk):
+            hashed = (np.outer(x[start:start + chunk], self.a) + self.b) % np.uint64(MERSENNE_PRIME)
+            np.minimum(result, hashed.min(axis=0), out=result)
+        return result.astype(np.uint32)
+
+    def signature_bytes(self, text):
+        signature = self.signature(text)
+        return signature.tobytes() if signature is not None else None
+
+    def matrix(self, blobs):
+        """(n, permutations) uint32 matrix from stored signature bytes"""
+        import numpy as np
+
+        if not blobs:
+            return np.empty((0, self.permutations), dtype=np.uint32)
+        return np.frombuffer(b''.join(blobs), dtype=np.uint32).reshape(len(blobs), self.permutations)
+
+    def band_keys(self, signatures):
+        """(n, bands) int64 bucket keys: an FNV-style hash of each band's rows"""
+        import numpy as np
+
+        rows = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        keys = np.broadcast_to(self.band_salt, (len(signatures), self.bands)).copy()
+        for r in range(self.rows):
+            keys ^= rows[:, :, r]
+            keys *= np.uint64(0x100000001B3)
+        return keys.view(np.int64)
+
+    @staticmethod
+    def similarity(signature, signatures):
+        """Estimated Jaccard similarity of `signature` to each row of `signatures`"""
+        return (signatures == signature).mean(axis=1)
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.size[i] += self.size[j]
+
+    def groups(self):
+        groups = {}
+        for i in range(len(self.parent)):
+            groups.setdefault(self.find(i), []).append(i)
+        return list(groups.values())
+
+
+class NearDuplicateIndex:
+    """LSH buckets of prompt MinHash signatures in prompt_lsh_buckets.
+
+    Prompt.minhash holds the signature (set whenever content is written); this
+    index keeps one (user_id, bucket) row per band so similar() looks up
+    candidates through an index instead of comparing against every prompt.
+    """
+
+    def __init__(self, chunk_size=500):
+        self.chunk_size = chunk_size
+        self._hasher = None
+        self._signatures = LRUCache(4096)  # bulk backfills see the same content repeatedly
+
+    @property
+    def hasher(self):
+        if self._hasher is None:
+            self._hasher = MinHasher()
+        return self._hasher
+
+    def signature_bytes(self, text):
+        key = hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+        signature = self._signatures.get(key)
+        if signature is None:
+            signature = self.hasher.signature_bytes(text) or b''
+            self._signatures.set(key, signature)
+        return signature or None
+
+    def _valid(self, blob):
+        return blob is not None and len(blob) == self.hasher.nbytes
+
+    # -- maintenance ----------------------------------------------------------
+
+    def index(self, prompt, executor=None):
+        """Replace the buckets of one flushed prompt"""
+        from models.prompt import Prompt
+
+        self.add_prompts(Prompt.id == prompt.id, executor, replace=True)
+
+    def remove(self, prompt_id, executor=None):
+        (executor or db.session).execute(db.delete(LSHBucket).where(LSHBucket.prompt_id == prompt_id))
+
+    def remove_scope(self, instance, executor=None):
+        """Drop the buckets of every prompt deleted along with a project or user (see BaseModel.search_scope)"""
+        condition = instance.search_scope(LSHBucket)
+        if condition is not None:
+            (executor or db.session).execute(db.delete(LSHBucket).where(condition))
+
+    def add_prompts(self, condition, executor=None, replace=False):
+        """Insert buckets for prompts matching `condition` (may refer to Prompt and Project); does not commit"""
+        from models.project import Project
+        from models.prompt import Prompt
+
+        executor = executor or db.session
+        if replace:
+            ids = db.select(Prompt.id).join(Project, Prompt.project_id == Project.id).where(condition)
+            executor.execute(db.delete(LSHBucket).where(LSHBucket.prompt_id.in_(ids)))
+
+        rows = executor.execute(
+            db.select(Prompt.id, Project.user_id, Prompt.minhash)
+            .join(Project, Prompt.project_id == Project.id)
+            .where(condition, Prompt.minhash.isnot(None))
+            .execution_options(yield_per=self.chunk_size)
+        )
+        count = 0
+        for chunk in rows.partitions(self.chunk_size):
+            chunk = [row for row in chunk if self._valid(row.minhash)]
+            if not chunk:
+                continue
+            keys = self.hasher.band_keys(self.hasher.matrix([row.minhash for row in chunk]))
+            buckets = [
+                {'prompt_id': row.id, 'user_id': row.user_id, 'band': band, 'bucket': int(key)}
+                for row, row_keys in zip(chunk, keys) for band, key in enumerate(row_keys)
+            ]
+            executor.execute(db.insert(LSHBucket), buckets)
+            count += len(chunk)
+        return count
+
+    def backfill(self, condition=None, recompute=False, executor=None):
+        """Compute missing (or all) signatures of prompts matching `condition` and rebuild their buckets.
+
+        updated_at is written back unchanged so HTTP validators stay valid.
+        Returns the number of prompts signed.
+        """
+        from models.project import Project
+        from models.prompt import Prompt
+
+        executor = executor or db.session
+        if condition is None:
+            condition = db.true()
+        table = Prompt.__table__
+        update = table.update().where(table.c.id == db.bindparam('b_id'))\
+            .values(minhash=db.bindparam('b_minhash'), updated_at=db.bindparam('b_updated_at'))
+
+        signed, last_id = 0, 0
+        while True:
+            query = db.select(Prompt.id, Prompt.content, Prompt.updated_at)\
+                .join(Project, Prompt.project_id == Project.id)\
+                .where(condition, Prompt.id > last_id).order_by(Prompt.id).limit(self.chunk_size)
+            if not recompute:
+                query = query.where(Prompt.minhash.is_(None))
+            rows = executor.execute(query).all()
+            if not rows:
+                break
+            executor.execute(update, [
+                {'b_id': row.id, 'b_minhash': self.signature_bytes(row.content), 'b_updated_at': row.updated_at}
+                for row in rows
+            ])
+            self.add_prompts(Prompt.id.in_([row.id for row in rows]), executor, replace=True)
+            signed += len(rows)
+            last_id = rows[-1].id
+        return signed
+
+    # -- queries --------------------------------------------------------------
+
+    def similar(self, prompt, threshold=None, limit=None):
+        """Near-duplicates of `prompt` in its owner's library, most similar first"""
+        import numpy as np
+        from models.project import Project
+        from models.prompt import Prompt
+
+        if not self._valid(prompt.minhash):
+            return []
+        threshold = Config.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        limit = min(limit or Config.NEAR_DUPLICATE_LIMIT, Config.NEAR_DUPLICATE_CANDIDATES)
+        signature = self.hasher.matrix([prompt.minhash])
+        keys = [int(key) for key in self.hasher.band_keys(signature)[0]]
+        user_id = prompt.project.user_id
+
+        # prompts sharing more bands are likelier duplicates; verify the best candidates only
+        shared = db.func.count().label('shared')
+        candidates = db.select(LSHBucket.prompt_id)\
+            .where(LSHBucket.user_id == user_id, LSHBucket.bucket.in_(keys), LSHBucket.prompt_id != prompt.id)\
+            .group_by(LSHBucket.prompt_id).order_by(shared.desc()).limit(Config.NEAR_DUPLICATE_CANDIDATES)
+        rows = db.session.execute(
+            db.select(Prompt.id, Prompt.title, Prompt.project_id, Project.name, Prompt.minhash)
+            .join(Project, Prompt.project_id == Project.id)
+            .where(Prompt.id.in_(candidates), Project.user_id == user_id)
+        ).all()
+        rows = [row for row in rows if self._valid(row.minhash)]
+        if not rows:
+            return []
+
+        scores = self.hasher.similarity(signature[0], self.hasher.matrix([row.minhash for row in rows]))
+        order = np.argsort(-scores, kind='stable')
+        return [
+            SimilarPrompt(rows[i].id, rows[i].title, rows[i].project_id, rows[i].name, round(float(scores[i]), 3))
+            for i in order if scores[i] >= threshold
+        ][:limit]
+
+    def clusters(self, user_id, threshold=None):
+        """Groups of near-duplicate prompt ids in a user's library, largest first.
+
+        Candidate pairs come only from shared band buckets: within each bucket,
+        members are compared against one representative and those above
+        `threshold` are unioned, the rest form the next round. That is
+        O(n * bands) for typical libraries instead of O(n**2) pairwise.
+        """
+        import numpy as np
+        from models.project import Project
+        from models.prompt import Prompt
+
+        threshold = Config.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        rows = db.session.execute(
+            db.select(Prompt.id, Prompt.minhash).join(Project, Prompt.project_id == Project.id)
+            .where(Project.user_id == user_id, Prompt.minhash.isnot(None)).order_by(Prompt.id)
+        ).all()
+        rows = [row for row in rows if self._valid(row.minhash)]
+        if len(rows) < 2:
+            return []
+
+        signatures = self.hasher.matrix([row.minhash for row in rows])
+        keys = self.hasher.band_keys(signatures)
+        sets = UnionFind(len(rows))
+        for band in range(self.hasher.bands):
+            column = keys[:, band]
+            order = np.argsort(column, kind='stable')
+            boundaries = np.flatnonzero(np.diff(column[order])) + 1
+            for members in np.split(order, boundaries):
+                while len(members) > 1:
+                    representative, rest = members[0], members[1:]
+                    scores = self.hasher.similarity(signatures[representative], signatures[rest])
+                    for member in rest[scores >= threshold]:
+                        sets.union(int(representative), int(member))
+                    members = rest[scores < threshold]
+
+        ids = [row.id for row in rows]
+        groups = [sorted(ids[i] for i in group) for group in sets.groups() if len(group) > 1]
+        return sorted(groups, key=lambda group: (-len(group), group[0]))
+
+near_duplicates = NearDuplicateIndex()
@@ -0,0 +1,84 @@
+from flask import g, has_app_context
+from core import db
+
+_MISSING = object()
+
+
+class OwnershipResolver:
+    """Loads a user's project, prompt or attachment together with its ownership chain.
+
+    Each lookup is a single joined query filtered on the owning user, and every
+    entity it loads is remembered for the rest of the request, so repeated checks
+    by routes and controllers hit the database once.
+    """
+
+    def project(self, user_id, project_id):
+        """The project if `user_id` owns it, else None"""
+        from models.project import Project
+
+        key = ('project', user_id, project_id)
+        found = self._cached(key)
+        if found is not _MISSING:
+            return found
+
+        project = Project.query.filter_by(id=project_id, user_id=user_id).first()
+        self._remember(key, project)
+        return project
+
+    def prompt(self, user_id, project_id, prompt_id):
+        """The prompt (with its project loaded) if it is in a project `user_id` owns, else None"""
+        from models.project import Project
+        from models.prompt import Prompt
+
+        key = ('prompt', user_id, project_id, prompt_id)
+        found = self._cached(key)
+        if found is not _MISSING:
+            return found
+
+        prompt = Prompt.query.join(Project)\
+            .filter(Prompt.id == prompt_id, Prompt.project_id == project_id, Project.user_id == user_id)\
+            .options(db.contains_eager(Prompt.project))\
+            .first()
+        self._remember(key, prompt)
+        if prompt is not None:
+            self._remember(('project', user_id, project_id), prompt.project)
+        return prompt
+
+    def attachment(self, user_id, project_id, prompt_id, attachment_id):
+        """The attachment (with prompt and project loaded) if `user_id` owns it, else None"""
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.attachment import Attachment
+
+        key = ('attachment', user_id, project_id, prompt_id, attachment_id)
+        found = self._cached(key)
+        if found is not _MISSING:
+            return found
+
+        attachment = Attachment.query.join(Prompt).join(Project)\
+            .filter(Attachment.id == attachment_id, Attachment.prompt_id == prompt_id,
+                    Prompt.project_id == project_id, Project.user_id == user_id)\
+            .options(db.contains_eager(Attachment.prompt).contains_eager(Prompt.project))\
+            .first()
+        self._remember(key, attachment)
+        if attachment is not None:
+            self._remember(('prompt', user_id, project_id, prompt_id), attachment.prompt)
+            self._remember(('project', user_id, project_id), attachment.prompt.project)
+        return attachment
+
+    def forget(self):
+        """Drop everything remembered for this request (e.g. after a delete)"""
+        if has_app_context():
+            g.pop('_ownership', None)
+
+    def _cached(self, key):
+        if not has_app_context():
+            return _MISSING
+        return g.get('_ownership', {}).get(key, _MISSING)
+
+    def _remember(self, key, value):
+        if has_app_context():
+            g.setdefault('_ownership', {})[key] = value
+
+
+ownership = OwnershipResolver()
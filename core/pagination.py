@@ -0,0 +1,82 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from config import Config
+from core import db
+
+
+def encode_cursor(created_at, id):
+    """Encode a (created_at, id) position as an opaque URL-safe token"""
+    raw = json.dumps([created_at.isoformat(), id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a token from encode_cursor(); returns None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        return None
+
+
+def clamp_page_size(per_page):
+    """Apply the configured default and upper bound to a requested page size"""
+    if not per_page or per_page < 1:
+        return Config.PAGE_SIZE
+    return min(per_page, Config.MAX_PAGE_SIZE)
+
+
+class KeysetPage:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, items, next_cursor=None, per_page=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def paginate_keyset(query, created_at_column, id_column, cursor=None, per_page=None, descending=True):
+    """Fetch the page of `query` that follows `cursor` in (created_at, id) order.
+
+    Seeks with a row-value comparison instead of OFFSET, so the cost of a page does
+    not grow with its position. Reads one extra row to tell whether a next page exists.
+    """
+    per_page = clamp_page_size(per_page)
+    key = db.tuple_(created_at_column, id_column)
+
+    position = decode_cursor(cursor)
+    if position:
+        query = query.filter(key < position if descending else key > position)
+
+    if descending:
+        query = query.order_by(None).order_by(created_at_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(None).order_by(created_at_column.asc(), id_column.asc())
+
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return KeysetPage(items, next_cursor, per_page)
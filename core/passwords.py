@@ -0,0 +1,92 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+from config import Config
+
+
+class HasherBusy(RuntimeError):
+    """Every hashing slot stayed taken for PASSWORD_HASH_TIMEOUT seconds"""
+
+
+def canonical_method(method):
+    """Werkzeug method string with every cost parameter spelled out, as stored in hashes.
+
+    'scrypt' -> 'scrypt:32768:8:1', 'pbkdf2' -> 'pbkdf2:sha256:<default iterations>'.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = (args + ['32768', '8', '1'][len(args):])[:3]
+        return f'scrypt:{int(n)}:{int(r)}:{int(p)}'
+    if name == 'pbkdf2':
+        hash_name, iterations = (args + ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)][len(args):])[:2]
+        return f'pbkdf2:{hash_name}:{int(iterations)}'
+    raise ValueError(f'Unsupported PASSWORD_HASH_METHOD: {method!r}')
+
+
+class PasswordHasher:
+    """Password hashing on a bounded pool, so a burst of logins cannot pin every worker thread.
+
+    At most `workers` hashes run at once and `queue` more may wait for a slot;
+    beyond that callers wait up to `timeout` seconds and then get HasherBusy.
+    hashlib's scrypt and PBKDF2 release the GIL, so the default thread pool
+    hashes in parallel; 'process' isolates the CPU work completely and
+    'inline' hashes on the calling thread (no pool, no limit).
+    """
+
+    def __init__(self, method=None, executor=None, workers=None, queue=None, timeout=None, salt_length=16):
+        self.method = canonical_method(method or Config.PASSWORD_HASH_METHOD)
+        self.executor_kind = executor or Config.PASSWORD_HASH_EXECUTOR
+        self.workers = workers or Config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+        self.queue = Config.PASSWORD_HASH_QUEUE if queue is None else queue
+        self.timeout = Config.PASSWORD_HASH_TIMEOUT if timeout is None else timeout
+        self.salt_length = salt_length
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None and self.executor_kind != 'inline':
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_kind == 'process':
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    elif self.executor_kind == 'thread':
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                            thread_name_prefix='password-hash')
+                    else:
+                        raise ValueError(f'Unknown PASSWORD_HASH_EXECUTOR: {self.executor_kind}')
+        return self._executor
+
+    def _run(self, fn, *args):
+        executor = self.executor
+        if executor is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy('password hashing is at capacity')
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, stored_hash, password):
+        if not stored_hash:
+            return False
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """True when `stored_hash` was made with another algorithm or other cost parameters"""
+        return not stored_hash or stored_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
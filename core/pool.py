@@ -0,0 +1,121 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class PoolMetrics:
+    """Counters for connection checkouts, time spent waiting for one, and timeouts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_ms_total': round(self.wait_total * 1000, 3),
+                'wait_ms_avg': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_ms_max': round(self.wait_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited and how many timed out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return entry
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics  # keep counting across engine.dispose()
+        return pool
+
+
+def engine_options(database_uri, settings):
+    """SQLALCHEMY_ENGINE_OPTIONS for `database_uri` built from the DB_* pool settings in `settings` (app.config)"""
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite':
+        return {}  # SQLAlchemy picks the right pool for SQLite files and :memory:
+
+    if settings['DB_PGBOUNCER']:
+        # PgBouncer (transaction mode) owns the pooling; a server connection is
+        # only ours for one transaction, so no client-side pool and no
+        # connect-time session settings.
+        return {'poolclass': NullPool}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings['DB_POOL_SIZE'],
+        'max_overflow': settings['DB_MAX_OVERFLOW'],
+        'pool_timeout': settings['DB_POOL_TIMEOUT'],
+        'pool_recycle': settings['DB_POOL_RECYCLE'],
+        'pool_pre_ping': settings['DB_POOL_PRE_PING'],
+    }
+    timeout = settings['DB_STATEMENT_TIMEOUT']
+    if timeout and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={timeout}'}
+    return options
+
+
+def install_statement_timeout(engine, settings):
+    """Apply DB_STATEMENT_TIMEOUT from `settings` per transaction with SET LOCAL (PgBouncer mode)"""
+    timeout = settings['DB_STATEMENT_TIMEOUT']
+    if not (settings['DB_PGBOUNCER'] and timeout):
+        return
+    if engine.dialect.name != 'postgresql':
+        return
+
+    @event.listens_for(engine, 'begin')
+    def set_statement_timeout(conn):
+        conn.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout)}')
+
+
+def pool_status(engine, settings):
+    """Live pool state and checkout metrics for `engine`"""
+    pool = engine.pool
+    status = {
+        'pool_class': type(pool).__name__,
+        'pgbouncer_mode': settings['DB_PGBOUNCER'],
+        'status': pool.status(),
+    }
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,396 @@
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import zlib
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from config import Config
+from core import db
+from core.cache import LRUCache
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run a single worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+USERS_DIR, DF_FILE, META_FILE, LOCK_FILE = 'users', 'df.bin', 'meta.json', 'lock'
+LAYOUT = 2  # one rows file per user
+INITIAL_CAPACITY = 64  # rows per user file; the file doubles when full
+
+RelatedPrompt = namedtuple('RelatedPrompt', 'prompt_id title project_id project_name score')
+
+
+class RelatedIndex:
+    """TF-IDF rows of every prompt in memory-mapped files that all workers share.
+
+    The matrix is sparse in a fixed-width (ELL) layout: each row keeps the
+    `terms` most frequent hashed words of one prompt (title words count twice)
+    with 1 + log(tf) weights, zero-padded. Rows are partitioned into one file per
+    user, so a lookup or a write only pages in that user's library. Document
+    frequencies live in one shared file and are adjusted as rows change, so IDF
+    weighting and cosine similarity happen at query time and creating or editing
+    a prompt rewrites one row, never the matrix. Writers serialize on a file lock;
+    readers map the files read-only and remap when a writer has grown or rebuilt them.
+    """
+
+    def __init__(self, directory=None, features=None, terms=None, chunk_size=1000, open_files=256):
+        self.directory = Config.RELATED_INDEX_DIR if directory is None else directory
+        self.features = features or Config.RELATED_FEATURES
+        self.terms = terms or Config.RELATED_TERMS_PER_ROW
+        self.chunk_size = chunk_size
+        self._maps = LRUCache(open_files)  # (path, writable) -> ((inode, size), memmap)
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    @property
+    def row_dtype(self):
+        import numpy as np
+
+        return np.dtype([('prompt_id', '<i8'), ('feature', '<i4', (self.terms,)), ('tf', '<f4', (self.terms,))])
+
+    def vector(self, title, content):
+        """(features, tf) arrays of a prompt's `terms` most frequent hashed words"""
+        import numpy as np
+
+        counts = Counter()
+        for text, weight in ((title, 2), (content, 1)):
+            for word in WORD_RE.findall((text or '').lower()):
+                counts[zlib.crc32(word.encode('utf-8')) % self.features] += weight
+        features = np.zeros(self.terms, dtype='<i4')
+        tf = np.zeros(self.terms, dtype='<f4')
+        for i, (feature, count) in enumerate(counts.most_common(self.terms)):
+            features[i], tf[i] = feature, 1 + math.log(count)
+        return features, tf
+
+    # -- files ----------------------------------------------------------------
+
+    def _path(self, name, directory=None):
+        return os.path.join(directory or self.directory, name)
+
+    def _user_path(self, user_id, directory=None):
+        return os.path.join(directory or self.directory, USERS_DIR, f'{int(user_id)}.bin')
+
+    def _map(self, path, dtype, writable=False):
+        """Memory map of one index file, reopened when a writer has grown or replaced it"""
+        import numpy as np
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_ino, stat.st_size)
+        cached = self._maps.get((path, writable))
+        if cached and cached[0] == key:
+            return cached[1]
+        array = np.memmap(path, dtype=dtype, mode='r+' if writable else 'r')
+        self._maps.set((path, writable), (key, array))
+        return array
+
+    def _df(self, writable=False):
+        df = self._map(self._path(DF_FILE), '<i8', writable)
+        return df if df is not None and len(df) == self.features + 1 else None
+
+    def _rows(self, user_id, writable=False, create=False):
+        """A user's rows; with `create`, an empty file is made for a new user (call locked)"""
+        path = self._user_path(user_id)
+        if create and not os.path.exists(path):
+            self._allocate(path, INITIAL_CAPACITY)
+        return self._map(path, self.row_dtype, writable)
+
+    def _allocate(self, path, capacity):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.truncate(capacity * self.row_dtype.itemsize)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(LOCK_FILE), 'a') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _meta(self):
+        return {'features': self.features, 'terms': self.terms, 'layout': LAYOUT}
+
+    def _create(self, directory):
+        """Empty shared files in `directory`; user files are made on first write"""
+        os.makedirs(os.path.join(directory, USERS_DIR), exist_ok=True)
+        with open(self._path(DF_FILE, directory), 'wb') as f:
+            f.truncate((self.features + 1) * 8)  # [documents, df of each feature]
+        with open(self._path(META_FILE, directory), 'w') as f:
+            json.dump(self._meta(), f)
+
+    def _ensure(self):
+        """Create the files, or start over if they were built with other RELATED_* settings; call locked"""
+        try:
+            with open(self._path(META_FILE)) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            meta = None
+        if meta == self._meta() and os.path.exists(self._path(DF_FILE)):
+            return
+        if meta is not None:
+            logger.warning('Related index settings changed; index reset, run `flask related rebuild`')
+        shutil.rmtree(self._path(USERS_DIR), ignore_errors=True)
+        self._create(self.directory)
+
+    def _grow(self, user_id, rows):
+        with open(self._user_path(user_id), 'r+b') as f:
+            f.truncate(2 * len(rows) * self.row_dtype.itemsize)
+        return self._rows(user_id, writable=True)
+
+    # -- maintenance ----------------------------------------------------------
+
+    def update(self, prompt_id, user_id, title, content):
+        """Write (or rewrite) the row of one prompt"""
+        self.update_many([(prompt_id, user_id, title, content)])
+
+    def update_many(self, prompts):
+        """Write the rows of (prompt_id, user_id, title, content) tuples under one lock.
+
+        The index is derived data: a failed write is logged, not raised, and
+        `flask related rebuild` repairs it.
+        """
+        if not self.enabled:
+            return 0
+        vectors = [(prompt_id, user_id, *self.vector(title, content))
+                   for prompt_id, user_id, title, content in prompts]
+        if not vectors:
+            return 0
+        try:
+            with self._locked():
+                self._ensure()
+                df = self._df(writable=True)
+                for prompt_id, user_id, features, tf in vectors:
+                    self._write_row(df, prompt_id, user_id, features, tf)
+        except OSError:
+            logger.exception('Could not update the related prompts index')
+            return 0
+        return len(vectors)
+
+    def _write_row(self, df, prompt_id, user_id, features, tf):
+        import numpy as np
+
+        rows = self._rows(user_id, writable=True, create=True)
+        slots = np.flatnonzero(rows['prompt_id'] == prompt_id)
+        if len(slots):
+            slot = slots[0]
+            self._count(df, rows['feature'][slot], rows['tf'][slot], -1)
+        else:
+            free = np.flatnonzero(rows['prompt_id'] == 0)
+            if len(free):
+                slot = free[0]
+            else:
+                slot = len(rows)
+                rows = self._grow(user_id, rows)
+            df[0] += 1
+        rows['feature'][slot] = features
+        rows['tf'][slot] = tf
+        rows['prompt_id'][slot] = prompt_id
+        self._count(df, features, tf, 1)
+
+    @staticmethod
+    def _count(df, features, tf, delta):
+        # features within a row are distinct, so fancy-index += counts each once
+        df[1 + features[tf > 0]] += delta
+
+    def _drop(self, df, rows, slots):
+        for slot in slots:
+            self._count(df, rows['feature'][slot], rows['tf'][slot], -1)
+            df[0] -= 1
+            rows[slot] = 0
+
+    def remove(self, user_id, prompt_ids):
+        """Drop the rows of a user's deleted prompts"""
+        import numpy as np
+
+        if not self.enabled or not prompt_ids:
+            return
+        try:
+            with self._locked():
+                df, rows = self._df(writable=True), self._rows(user_id, writable=True)
+                if df is not None and rows is not None:
+                    self._drop(df, rows, np.flatnonzero(np.isin(rows['prompt_id'], list(prompt_ids))))
+        except OSError:
+            logger.exception('Could not update the related prompts index')
+
+    def remove_user(self, user_id):
+        """Drop a deleted user's rows file"""
+        import numpy as np
+
+        if not self.enabled:
+            return
+        try:
+            with self._locked():
+                df, rows = self._df(writable=True), self._rows(user_id, writable=True)
+                if rows is None:
+                    return
+                if df is not None:
+                    self._drop(df, rows, np.flatnonzero(rows['prompt_id']))
+                del rows
+                self._maps.delete((self._user_path(user_id), True))
+                os.remove(self._user_path(user_id))
+        except OSError:
+            logger.exception('Could not update the related prompts index')
+
+    def _prompt_rows(self, condition):
+        from models.project import Project
+        from models.prompt import Prompt
+
+        return db.session.execute(
+            db.select(Prompt.id, Project.user_id, Prompt.title, Prompt.content)
+            .join(Project, Prompt.project_id == Project.id).where(condition)
+            .order_by(Project.user_id, Prompt.id)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+    def add_prompts(self, condition):
+        """Write rows for committed prompts matching `condition` (may refer to Prompt and Project)"""
+        if not self.enabled:
+            return 0
+        rows = self._prompt_rows(condition)
+        return sum(self.update_many(chunk) for chunk in rows.partitions(self.chunk_size))
+
+    def rebuild(self):
+        """Build the index of every prompt next to the live one, then swap the files in.
+
+        Rows written by workers while this runs are lost with the old files;
+        rebuild when the library is quiet, or re-save the prompts edited meanwhile.
+        """
+        import numpy as np
+
+        staging = self.directory.rstrip(os.sep) + '.building'
+        shutil.rmtree(staging, ignore_errors=True)
+        self._create(staging)
+        df = np.memmap(self._path(DF_FILE, staging), dtype='<i8', mode='r+')
+
+        def write_user(user_id, vectors):
+            path = self._user_path(user_id, staging)
+            self._allocate(path, max(INITIAL_CAPACITY, len(vectors)))
+            rows = np.memmap(path, dtype=self.row_dtype, mode='r+')
+            for slot, (prompt_id, features, tf) in enumerate(vectors):
+                rows['prompt_id'][slot], rows['feature'][slot], rows['tf'][slot] = prompt_id, features, tf
+                self._count(df, features, tf, 1)
+            rows.flush()
+
+        # rows arrive ordered by user, so one user's vectors are held at a time
+        total, user, vectors = 0, None, []
+        for chunk in self._prompt_rows(db.true()).partitions(self.chunk_size):
+            for prompt_id, user_id, title, content in chunk:
+                if user_id != user and vectors:
+                    write_user(user, vectors)
+                    total, vectors = total + len(vectors), []
+                user = user_id
+                vectors.append((prompt_id, *self.vector(title, content)))
+        if vectors:
+            write_user(user, vectors)
+            total += len(vectors)
+        df[0] = total
+        df.flush()
+        del df
+
+        with self._locked():
+            retired = self._path(USERS_DIR) + '.old'
+            shutil.rmtree(retired, ignore_errors=True)
+            if os.path.exists(self._path(USERS_DIR)):
+                os.rename(self._path(USERS_DIR), retired)
+            os.rename(self._path(USERS_DIR, staging), self._path(USERS_DIR))
+            for name in (DF_FILE, META_FILE):
+                os.replace(self._path(name, staging), self._path(name))
+        self._maps.clear()
+        shutil.rmtree(retired, ignore_errors=True)
+        os.rmdir(staging)
+        return total
+
+    def stats(self):
+        """Prompts, user files and size on disk of the index"""
+        df = self._df()
+        if df is None:
+            return {'prompts': 0, 'users': 0, 'bytes': 0}
+        users = self._path(USERS_DIR)
+        files = [os.path.join(users, name) for name in os.listdir(users)] if os.path.isdir(users) else []
+        return {
+            'prompts': int(df[0]),
+            'users': len(files),
+            'bytes': os.path.getsize(self._path(DF_FILE)) + sum(map(os.path.getsize, files)),
+        }
+
+    # -- queries --------------------------------------------------------------
+
+    def related(self, prompt, limit=None):
+        """Prompts of the same user closest to `prompt` by cosine similarity of TF-IDF rows"""
+        import numpy as np
+        from models.project import Project
+        from models.prompt import Prompt
+
+        limit = limit or Config.RELATED_LIMIT
+        if not self.enabled or limit < 1:
+            return []
+        user_id = prompt.project.user_id
+        df, rows = self._df(), self._rows(user_id)
+        if df is None or rows is None:
+            return []
+
+        ids = rows['prompt_id']
+        slots = np.flatnonzero((ids != prompt.id) & (ids != 0))
+        if not len(slots):
+            return []
+        documents = max(int(df[0]), 1)
+
+        def idf(features):
+            return np.log((documents + 1) / (df[1 + features] + 1)).astype(np.float32) + 1
+
+        # the query is the prompt as it is now, whatever state its own row is in
+        query_features, query_tf = self.vector(prompt.title, prompt.content)
+        present = query_tf > 0
+        query_weights = query_tf[present] * idf(query_features[present])
+        order = np.argsort(query_features[present])
+        query_features, query_weights = query_features[present][order], query_weights[order]
+        query_norm = np.linalg.norm(query_weights)
+        if not query_norm:
+            return []
+
+        # weight of each row feature in the query, via binary search in its sorted features
+        features = rows['feature'][slots]
+        positions = np.minimum(np.searchsorted(query_features, features), len(query_features) - 1)
+        in_query = np.where(query_features[positions] == features, query_weights[positions], 0)
+        weights = rows['tf'][slots] * idf(features)
+        norms = np.linalg.norm(weights, axis=1)
+        scores = (weights * in_query).sum(axis=1) / np.maximum(norms * query_norm, 1e-12)
+
+        # a few spares in case some rows belong to prompts deleted since they were written
+        k = min(2 * limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        candidates = {int(ids[slots[i]]): float(scores[i]) for i in top if scores[i] >= Config.RELATED_MIN_SCORE}
+        if not candidates:
+            return []
+
+        found = {
+            row.id: row for row in db.session.execute(
+                db.select(Prompt.id, Prompt.title, Prompt.project_id, Project.name)
+                .join(Project, Prompt.project_id == Project.id)
+                .where(Prompt.id.in_(list(candidates)), Project.user_id == user_id)
+            )
+        }
+        return [
+            RelatedPrompt(prompt_id, found[prompt_id].title, found[prompt_id].project_id,
+                          found[prompt_id].name, round(score, 3))
+            for prompt_id, score in candidates.items() if prompt_id in found
+        ][:limit]
+
+
+related_index = RelatedIndex()
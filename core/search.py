@@ -0,0 +1,396 @@
+import re
+from collections import namedtuple
+from config import Config
+from core import db
+from core.pagination import KeysetPage
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+PHRASE_RE = re.compile(r'"([^"]*)"')
+TERM_RE = re.compile(r'(\w+)(\*?)', re.UNICODE)
+
+
+class SearchQuery:
+    """Search input parsed into plain terms, prefix terms and quoted phrases"""
+
+    def __init__(self, terms=None, prefixes=None, phrases=None):
+        self.terms = terms or []
+        self.prefixes = prefixes or []
+        self.phrases = phrases or []
+
+    @classmethod
+    def parse(cls, raw, prefix_last=False):
+        """Parse user input: "quoted text" is a phrase, a trailing * marks a prefix"""
+        raw = raw or ''
+        terms, prefixes, phrases = [], [], []
+        for match in PHRASE_RE.findall(raw):
+            words = [w.lower() for w in WORD_RE.findall(match)]
+            if len(words) == 1:
+                terms.append(words[0])
+            elif words:
+                phrases.append(words)
+
+        matches = TERM_RE.findall(PHRASE_RE.sub(' ', raw))
+        for index, (word, star) in enumerate(matches):
+            word = word.lower()
+            is_last = index == len(matches) - 1
+            if star or (prefix_last and is_last and not raw.endswith(' ')):
+                prefixes.append(word)
+            else:
+                terms.append(word)
+
+        return cls(terms, prefixes, phrases)
+
+    def is_empty(self):
+        return not (self.terms or self.prefixes or self.phrases)
+
+    def to_tsquery(self):
+        """Render as a PostgreSQL to_tsquery() expression"""
+        parts = list(self.terms)
+        parts += [f'{word}:*' for word in self.prefixes]
+        parts += ['(' + ' <-> '.join(words) + ')' for words in self.phrases]
+        return ' & '.join(parts)
+
+    def to_fts5(self):
+        """Render as an SQLite FTS5 MATCH expression"""
+        parts = [f'"{word}"' for word in self.terms]
+        parts += [f'"{word}"*' for word in self.prefixes]
+        parts += ['"' + ' '.join(words) + '"' for words in self.phrases]
+        return ' '.join(parts)
+
+    def like_patterns(self):
+        """Substring patterns for backends without a text search engine"""
+        patterns = [f'%{word}%' for word in self.terms + self.prefixes]
+        patterns += ['%' + ' '.join(words) + '%' for words in self.phrases]
+        return patterns
+
+
+def clamp_result_limit(limit):
+    """Apply the SEARCH_RESULT_LIMIT default and cap to a requested number of results"""
+    if not limit or limit < 1:
+        return Config.SEARCH_RESULT_LIMIT
+    return min(limit, Config.SEARCH_RESULT_LIMIT)
+
+
+def _language():
+    language = Config.SEARCH_LANGUAGE
+    if not re.fullmatch(r'[a-z_]+', language):
+        raise ValueError(f'Invalid search language: {language}')
+    return db.literal_column(f"'{language}'::regconfig")
+
+
+def prompt_search_vector(title, content):
+    """tsvector expression indexed by idx_prompts_search.
+
+    Queries must use this exact expression for PostgreSQL to pick the GIN index.
+    """
+    language = _language()
+    title_vector = db.func.setweight(
+        db.func.to_tsvector(language, db.func.coalesce(title, db.literal_column("''"))),
+        db.literal_column("'A'")
+    )
+    content_vector = db.func.setweight(
+        db.func.to_tsvector(language, db.func.coalesce(content, db.literal_column("''"))),
+        db.literal_column("'B'")
+    )
+    return title_vector.op('||')(content_vector)
+
+
+def document_search_vector(title, body):
+    """tsvector expression indexed by idx_search_documents_search (same weighting as prompts)"""
+    return prompt_search_vector(title, body)
+
+
+def sqlite_fts_ddl(table, columns):
+    """FTS5 external-content table `<table>_fts` over `columns`, kept in sync by triggers"""
+    fts = f'{table}_fts'
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {names}, content='{table}', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});
+        END""",
+    ]
+
+
+def install_sqlite_index(table, columns=('title', 'content')):
+    """Create the FTS5 shadow table and its sync triggers alongside `table`"""
+    for statement in sqlite_fts_ddl(table.name, columns):
+        db.event.listen(table, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+
+
+class PostgresSearchBackend:
+    """Full-text search over the GIN-indexed tsvector expression"""
+
+    def _parts(self, query):
+        from models.prompt import Prompt
+
+        vector = prompt_search_vector(Prompt.title, Prompt.content)
+        return vector, db.func.to_tsquery(_language(), query.to_tsquery())
+
+    def match(self, base_query, query):
+        vector, tsquery = self._parts(query)
+        return base_query.filter(vector.op('@@')(tsquery))
+
+    def rank(self, query):
+        vector, tsquery = self._parts(query)
+        return [db.func.ts_rank_cd(vector, tsquery).desc()]
+
+    def _document_parts(self, query):
+        from models.search_document import SearchDocument
+
+        vector = document_search_vector(SearchDocument.title, SearchDocument.body)
+        return vector, db.func.to_tsquery(_language(), query.to_tsquery())
+
+    def match_documents(self, statement, query):
+        vector, tsquery = self._document_parts(query)
+        return statement.where(vector.op('@@')(tsquery))
+
+    def document_score(self, query):
+        vector, tsquery = self._document_parts(query)
+        return db.func.ts_rank_cd(vector, tsquery)
+
+
+class SQLiteSearchBackend:
+    """Full-text search through the prompts_fts FTS5 table"""
+
+    def match(self, base_query, query):
+        from models.prompt import Prompt
+
+        fts = db.table('prompts_fts', db.column('rowid'))
+        return base_query.join(fts, fts.c.rowid == Prompt.id)\
+            .filter(db.text('prompts_fts MATCH :fts_query').bindparams(fts_query=query.to_fts5()))
+
+    def rank(self, query):
+        return [db.text('bm25(prompts_fts, 10.0, 1.0)')]
+
+    def match_documents(self, statement, query):
+        from models.search_document import SearchDocument
+
+        fts = db.table('search_documents_fts', db.column('rowid'))
+        return statement.join(fts, fts.c.rowid == SearchDocument.id)\
+            .where(db.text('search_documents_fts MATCH :fts_query').bindparams(fts_query=query.to_fts5()))
+
+    def document_score(self, query):
+        return db.literal_column('-bm25(search_documents_fts, 10.0, 1.0)')
+
+
+class LikeSearchBackend:
+    """Substring matching for databases without a supported text search engine"""
+
+    def match(self, base_query, query):
+        from models.prompt import Prompt
+
+        for pattern in query.like_patterns():
+            base_query = base_query.filter(db.or_(
+                Prompt.title.ilike(pattern),
+                Prompt.content.ilike(pattern)
+            ))
+        return base_query
+
+    def rank(self, query):
+        return []
+
+    def match_documents(self, statement, query):
+        from models.search_document import SearchDocument
+
+        for pattern in query.like_patterns():
+            statement = statement.where(db.or_(
+                SearchDocument.title.ilike(pattern),
+                SearchDocument.body.ilike(pattern)
+            ))
+        return statement
+
+    def document_score(self, query):
+        return db.literal(0.0)
+
+
+class PromptSearchEngine:
+    """Ranked prompt search scoped to a user's projects"""
+
+    backends = {
+        'postgresql': PostgresSearchBackend(),
+        'sqlite': SQLiteSearchBackend(),
+    }
+    fallback = LikeSearchBackend()
+
+    def get_backend(self):
+        return self.backends.get(db.engine.dialect.name, self.fallback)
+
+    def _matching(self, user_id, query):
+        from models.prompt import Prompt
+        from models.project import Project
+
+        base_query = Prompt.query.join(Project)\
+            .filter(Project.user_id == user_id)\
+            .options(db.contains_eager(Prompt.project))
+        return self.get_backend().match(base_query, query)
+
+    def search(self, user_id, search_term, limit=None, prefix_last=False):
+        """Return at most `limit` prompts matching `search_term`, best match first"""
+        from models.prompt import Prompt
+
+        query = SearchQuery.parse(search_term, prefix_last=prefix_last)
+        if query.is_empty():
+            return []
+
+        limit = clamp_result_limit(limit)
+        backend = self.get_backend()
+        return self._matching(user_id, query)\
+            .order_by(*backend.rank(query), Prompt.created_at.desc(), Prompt.id.desc())\
+            .limit(limit).all()
+
+    def search_page(self, user_id, search_term, cursor=None, per_page=None, prefix_last=False):
+        """Return one page of matching prompts, newest first, continuing after `cursor`"""
+        from models.prompt import Prompt
+
+        query = SearchQuery.parse(search_term, prefix_last=prefix_last)
+        if query.is_empty():
+            return KeysetPage([])
+
+        return Prompt.get_keyset_page(self._matching(user_id, query), cursor, per_page)
+
+
+prompt_search = PromptSearchEngine()
+
+
+SearchHit = namedtuple('SearchHit', 'entity_type entity_id title snippet score')
+PromptHits = namedtuple('PromptHits', 'prompt_id title project_id project_name score match_count hits')
+
+
+class DocumentSearchResults:
+    """Hits grouped by prompt, with match counts per entity type"""
+
+    def __init__(self, groups=None, facets=None, truncated=False):
+        self.groups = groups or []
+        self.facets = facets or {}
+        self.truncated = truncated  # more matches than SEARCH_CANDIDATE_LIMIT; only the best were grouped
+
+    @property
+    def total(self):
+        return sum(group.match_count for group in self.groups)
+
+
+def snippet(text, query, length=None):
+    """About `length` characters of `text` around the first literal match of a query word"""
+    length = length or Config.SEARCH_SNIPPET_LENGTH
+    text = ' '.join((text or '').split())
+    lowered = text.lower()
+    words = query.terms + query.prefixes + [word for phrase in query.phrases for word in phrase]
+    positions = [p for p in (lowered.find(word) for word in words) if p >= 0]
+    start = max(min(positions) - length // 4, 0) if positions else 0
+    excerpt = text[start:start + length]
+    return ('…' if start else '') + excerpt + ('…' if start + length < len(text) else '')
+
+
+class DocumentSearchEngine:
+    """Search over search_documents: prompts, responses and attachments in one index.
+
+    At most SEARCH_CANDIDATE_LIMIT of the best-ranked matches are grouped per
+    query, whatever the size of the library (see _candidates). Facet counts
+    are exact and cover every entity type; the type filter applies to the groups only.
+    """
+
+    backends = PromptSearchEngine.backends
+    fallback = PromptSearchEngine.fallback
+
+    def get_backend(self):
+        return self.backends.get(db.engine.dialect.name, self.fallback)
+
+    def _candidates(self, user_id, query, types=None):
+        """The best SEARCH_CANDIDATE_LIMIT matches of a user's documents, optionally of some types only.
+
+        Ordering by rank before the limit makes the database score every match,
+        so cost still grows with the match count, but only the best-ranked rows
+        reach Python and the same query always yields the same groups. Ties (and
+        the unranked LIKE fallback) prefer prompt documents, then the newest.
+        """
+        from models.search_document import SearchDocument
+
+        backend = self.get_backend()
+        score = backend.document_score(query).label('score')
+        statement = db.select(
+            SearchDocument.id, SearchDocument.prompt_id, SearchDocument.entity_type, score
+        ).where(SearchDocument.user_id == user_id)
+        if types:
+            statement = statement.where(SearchDocument.entity_type.in_(types))
+        statement = backend.match_documents(statement, query).order_by(
+            score.desc(), (SearchDocument.entity_type == 'prompt').desc(),
+            SearchDocument.created_at.desc(), SearchDocument.id.desc()
+        ).limit(Config.SEARCH_CANDIDATE_LIMIT)
+        return db.session.execute(statement).all()
+
+    def _facets(self, user_id, query):
+        """Number of matching documents of each entity type, uncapped"""
+        from models.search_document import SearchDocument
+
+        statement = db.select(SearchDocument.entity_type, db.func.count())\
+            .select_from(SearchDocument).where(SearchDocument.user_id == user_id)
+        statement = self.get_backend().match_documents(statement, query).group_by(SearchDocument.entity_type)
+        return dict(db.session.execute(statement).all())
+
+    def search(self, user_id, search_term, types=None, limit=None, hits_per_prompt=None, prefix_last=False):
+        """Return the best `limit` prompts with matches in their text, responses or attachments"""
+        from models.search_document import SearchDocument
+        from models.prompt import Prompt
+        from models.project import Project
+
+        query = SearchQuery.parse(search_term, prefix_last=prefix_last)
+        if query.is_empty():
+            return DocumentSearchResults()
+
+        limit = clamp_result_limit(limit)
+        hits_per_prompt = max(hits_per_prompt or Config.SEARCH_HITS_PER_PROMPT, 1)
+        facets = self._facets(user_id, query)
+        matches = sum(count for entity_type, count in facets.items() if not types or entity_type in types)
+        truncated = matches > Config.SEARCH_CANDIDATE_LIMIT
+        candidates = self._candidates(user_id, query, types) if matches else []
+
+        by_prompt = {}
+        for row in sorted(candidates, key=lambda row: (-row.score, -row.id)):
+            by_prompt.setdefault(row.prompt_id, []).append(row)
+        best = sorted(by_prompt.items(), key=lambda item: (-item[1][0].score, -item[0]))[:limit]
+        if not best:
+            return DocumentSearchResults([], facets, truncated)
+
+        shown = {row.id: row.score for _, rows in best for row in rows[:hits_per_prompt]}
+        documents = {
+            doc.id: doc for doc in db.session.execute(
+                db.select(SearchDocument.id, SearchDocument.entity_type, SearchDocument.entity_id,
+                          SearchDocument.title, SearchDocument.body)
+                .where(SearchDocument.id.in_(shown))
+            )
+        }
+        prompts = {
+            row.id: row for row in db.session.execute(
+                db.select(Prompt.id, Prompt.title, Prompt.project_id, Project.name.label('project_name'))
+                .join(Project, Prompt.project_id == Project.id)
+                .where(Prompt.id.in_([prompt_id for prompt_id, _ in best]))
+            )
+        }
+
+        groups = []
+        for prompt_id, rows in best:
+            prompt = prompts.get(prompt_id)
+            if prompt is None:
+                continue
+            hits = [
+                SearchHit(doc.entity_type, doc.entity_id, doc.title, snippet(doc.body, query), shown[doc.id])
+                for doc in (documents[row.id] for row in rows[:hits_per_prompt] if row.id in documents)
+            ]
+            groups.append(PromptHits(prompt.id, prompt.title, prompt.project_id, prompt.project_name,
+                                     rows[0].score, len(rows), hits))
+        return DocumentSearchResults(groups, facets, truncated)
+
+
+document_search = DocumentSearchEngine()
@@ -0,0 +1,148 @@
+from core import db
+from core.cache import LRUCache
+from core.storage import get_blob_store
+from models.search_document import SearchDocument
+
+
+class SearchIndex:
+    """Keeps search_documents in step with prompts, responses and attachments.
+
+    Single rows are re-indexed from BaseModel.save() and delete(), in the same
+    transaction. Bulk writes that bypass the ORM (INSERT ... SELECT copies, batch
+    inserts, generated data) call add_prompts() or add_responses() themselves.
+    """
+
+    def __init__(self, chunk_size=500):
+        self.chunk_size = chunk_size
+
+    # -- single rows ----------------------------------------------------------
+
+    def index(self, instance, executor=None):
+        """Replace the document of one flushed prompt, response or attachment"""
+        from models.project import Project
+        from models.prompt import Prompt
+
+        executor = executor or db.session
+        entity = instance.search_entity
+        prompt_id = instance.id if entity == 'prompt' else instance.prompt_id
+        title, body = instance.search_document()
+        owner = db.select(Project.user_id).join(Prompt, Prompt.project_id == Project.id)\
+            .where(Prompt.id == prompt_id).scalar_subquery()
+
+        executor.execute(db.delete(SearchDocument).where(
+            SearchDocument.entity_type == entity, SearchDocument.entity_id == instance.id))
+        executor.execute(db.insert(SearchDocument).values(
+            user_id=owner, prompt_id=prompt_id, entity_type=entity, entity_id=instance.id,
+            title=title[:255] if title else None, body=body or '', created_at=instance.created_at,
+        ))
+
+    def remove(self, instance, executor=None):
+        """Drop the documents that go away with `instance` (see BaseModel.search_scope)"""
+
+        condition = instance.search_scope(SearchDocument)
+        if condition is not None:
+            (executor or db.session).execute(db.delete(SearchDocument).where(condition))
+
+    # -- bulk -----------------------------------------------------------------
+
+    def add_prompts(self, condition, executor=None):
+        """Index prompts matching `condition` with their responses and attachments; returns the row count.
+
+        `condition` may refer to Prompt and Project. Does not remove existing
+        documents (see reindex) and does not commit.
+        """
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+        from models.attachment import Attachment
+
+        executor = executor or db.session
+        source = db.select(
+            Project.user_id, Prompt.id, db.literal('prompt'), Prompt.id, Prompt.title, Prompt.content,
+            Prompt.created_at
+        ).join(Project, Prompt.project_id == Project.id).where(condition)
+        count = executor.execute(db.insert(SearchDocument).from_select(self._columns(), source)).rowcount
+
+        prompt_ids = db.select(Prompt.id).join(Project, Prompt.project_id == Project.id).where(condition)
+        count += self.add_responses(PromptResponse.prompt_id.in_(prompt_ids), executor)
+        count += self.add_attachments(Attachment.prompt_id.in_(prompt_ids), executor)
+        return count
+
+    def add_responses(self, condition, executor=None):
+        """INSERT ... SELECT documents for responses matching `condition`; does not commit"""
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+
+        source = db.select(
+            Project.user_id, PromptResponse.prompt_id, db.literal('response'), PromptResponse.id,
+            db.null(), PromptResponse.content, PromptResponse.created_at
+        ).join(Prompt, Prompt.id == PromptResponse.prompt_id)\
+            .join(Project, Prompt.project_id == Project.id).where(condition)
+        return (executor or db.session).execute(
+            db.insert(SearchDocument).from_select(self._columns(), source)).rowcount
+
+    def add_attachments(self, condition, executor=None):
+        """Index attachments matching `condition`; blob-stored text is read from the blob store"""
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.attachment import Attachment
+
+        executor = executor or db.session
+        rows = executor.execute(
+            db.select(
+                Project.user_id, Attachment.prompt_id, Attachment.id, Attachment.filename,
+                Attachment.content, Attachment.blob_hash, Attachment.created_at
+            ).join(Prompt, Prompt.id == Attachment.prompt_id)
+            .join(Project, Prompt.project_id == Project.id).where(condition)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+        texts = LRUCache(256)  # copies share blobs
+        count, batch = 0, []
+        for user_id, prompt_id, attachment_id, filename, content, blob_hash, created_at in rows:
+            if blob_hash:
+                content = texts.get(blob_hash)
+                if content is None:
+                    content = get_blob_store().read(blob_hash).decode('utf-8')
+                    texts.set(blob_hash, content)
+            batch.append({
+                'user_id': user_id, 'prompt_id': prompt_id, 'entity_type': 'attachment',
+                'entity_id': attachment_id, 'title': filename[:255], 'body': content or '',
+                'created_at': created_at,
+            })
+            if len(batch) >= self.chunk_size:
+                executor.execute(db.insert(SearchDocument), batch)
+                count, batch = count + len(batch), []
+        if batch:
+            executor.execute(db.insert(SearchDocument), batch)
+            count += len(batch)
+        return count
+
+    def reindex(self, condition=None, executor=None):
+        """Rebuild the documents of prompts matching `condition` (every prompt when None)"""
+        from models.project import Project
+        from models.prompt import Prompt
+
+        executor = executor or db.session
+        if condition is None:
+            condition = db.true()
+        prompt_ids = db.select(Prompt.id).join(Project, Prompt.project_id == Project.id).where(condition)
+        executor.execute(db.delete(SearchDocument).where(SearchDocument.prompt_id.in_(prompt_ids)))
+        return self.add_prompts(condition, executor)
+
+    def reindex_responses(self, prompt_id, executor=None):
+        """Rebuild the response documents of one prompt, e.g. after copying a conversation onto it"""
+        from models.prompt_response import PromptResponse
+
+        executor = executor or db.session
+        executor.execute(db.delete(SearchDocument).where(
+            SearchDocument.prompt_id == prompt_id, SearchDocument.entity_type == 'response'))
+        return self.add_responses(PromptResponse.prompt_id == prompt_id, executor)
+
+    @staticmethod
+    def _columns():
+        return ['user_id', 'prompt_id', 'entity_type', 'entity_id', 'title', 'body', 'created_at']
+
+
+search_index = SearchIndex()
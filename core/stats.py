@@ -0,0 +1,88 @@
+from core import db
+
+
+def _total(column, condition, joins=()):
+    """Scalar subquery aggregating `column` over rows matching `condition`"""
+    query = db.select(column)
+    for target in joins:
+        query = query.join(target)
+    return query.where(condition).scalar_subquery()
+
+
+def _characters(model):
+    """Summed char_count, measuring only rows written before the statistics columns existed"""
+    return db.func.coalesce(db.func.sum(db.func.coalesce(model.char_count, db.func.length(model.content))), 0)
+
+
+class LibraryStats:
+    """Library counts computed with aggregate SQL instead of loading rows"""
+
+    @staticmethod
+    def for_user(user_id):
+        """Totals across a user's whole library, in a single query"""
+        from models.project import Project
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+        from models.attachment import Attachment
+
+        owned = Project.user_id == user_id
+        row = db.session.execute(db.select(
+            _total(db.func.count(Project.id), owned).label('projects'),
+            _total(db.func.count(Prompt.id), owned, [Project]).label('prompts'),
+            _total(_characters(Prompt), owned, [Project]).label('prompt_characters'),
+            _total(db.func.count(PromptResponse.id), owned, [Prompt, Project]).label('responses'),
+            _total(_characters(PromptResponse), owned, [Prompt, Project]).label('response_characters'),
+            _total(db.func.count(Attachment.id), owned, [Prompt, Project]).label('attachments'),
+        )).one()
+
+        stats = row._asdict()
+        stats['characters'] = stats['prompt_characters'] + stats['response_characters']
+        return stats
+
+    @staticmethod
+    def for_project(project_id):
+        """Totals for one project, in a single query"""
+        from models.prompt import Prompt
+        from models.prompt_response import PromptResponse
+        from models.attachment import Attachment
+
+        in_project = Prompt.project_id == project_id
+        row = db.session.execute(db.select(
+            _total(db.func.count(Prompt.id), in_project).label('prompts'),
+            _total(_characters(Prompt), in_project).label('prompt_characters'),
+            _total(db.func.count(PromptResponse.id), in_project, [Prompt]).label('responses'),
+            _total(db.func.count(Attachment.id), in_project, [Prompt]).label('attachments'),
+        )).one()
+        return row._asdict()
+
+    @staticmethod
+    def prompt_counts(project_ids):
+        """Map project id -> prompt count for the given projects, in one GROUP BY"""
+        from models.prompt import Prompt
+
+        project_ids = list(project_ids)
+        if not project_ids:
+            return {}
+
+        rows = db.session.query(Prompt.project_id, db.func.count(Prompt.id))\
+            .filter(Prompt.project_id.in_(project_ids))\
+            .group_by(Prompt.project_id).all()
+        counts = dict.fromkeys(project_ids, 0)
+        counts.update(rows)
+        return counts
+
+    @staticmethod
+    def project_counts(user_ids):
+        """Map user id -> project count for the given users, in one GROUP BY"""
+        from models.project import Project
+
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        rows = db.session.query(Project.user_id, db.func.count(Project.id))\
+            .filter(Project.user_id.in_(user_ids))\
+            .group_by(Project.user_id).all()
+        counts = dict.fromkeys(user_ids, 0)
+        counts.update(rows)
+        return counts
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import tempfile
+from config import Config
+
+
+class BlobStore:
+    """Interface for attachment storage backends"""
+
+    def put(self, data):
+        """Store `data` (bytes) and return its content hash"""
+        raise NotImplementedError
+
+    def read(self, digest):
+        """Return the stored bytes for `digest`"""
+        raise NotImplementedError
+
+    def path(self, digest):
+        """Local file path for `digest`, or None if the backend has no files to stream"""
+        return None
+
+    def exists(self, digest):
+        raise NotImplementedError
+
+    def delete(self, digest):
+        raise NotImplementedError
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+
+class FilesystemBlobStore(BlobStore):
+    """Content-addressed files on local disk, deduplicated by SHA-256.
+
+    A blob with hash `abcdef...` lives at `<root>/ab/cd/abcdef...`.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        if len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+            raise ValueError(f'Invalid blob hash: {digest!r}')
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, data):
+        digest = self.digest(data)
+        target = self.path(digest)
+        if os.path.exists(target):
+            return digest  # identical content is already stored
+
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, target)  # atomic: readers never see a partial blob
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    def read(self, digest):
+        with open(self.path(digest), 'rb') as blob:
+            return blob.read()
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def delete(self, digest):
+        try:
+            os.unlink(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+
+BLOB_STORES = {
+    'filesystem': lambda: FilesystemBlobStore(Config.ATTACHMENT_STORAGE_PATH),
+}
+
+_store = None
+
+
+def get_blob_store():
+    """Configured blob store (ATTACHMENT_BLOB_BACKEND), created on first use"""
+    global _store
+    if _store is None:
+        factory = BLOB_STORES.get(Config.ATTACHMENT_BLOB_BACKEND)
+        if factory is None:
+            raise ValueError(f'Unknown ATTACHMENT_BLOB_BACKEND: {Config.ATTACHMENT_BLOB_BACKEND}')
+        _store = factory()
+    return _store
+
+
+def blobs_enabled():
+    """Whether new attachment content goes to the blob store instead of the database"""
+    return Config.ATTACHMENT_STORAGE == 'blob'
@@ -0,0 +1,58 @@
+import os
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from core.cache import LRUCache
+
+
+class FragmentCacheExtension(Extension):
+    """`{% cache key, ... %}...{% endcache %}` reuses a block's rendered HTML while its keys are unchanged.
+
+    Keys should name the versions the block depends on (e.g. `project.id,
+    project.updated_at, prompt_count`): a write changes the key, so stale
+    fragments are never served and simply age out of the bounded LRU.
+    Caching is skipped while templates auto-reload (debug), since an edited
+    template would otherwise keep serving old fragments.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        keys = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            keys.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+
+        block = nodes.Const(f'{parser.name}:{lineno}')  # template and line identify the block
+        call = self.call_method('_cache', [block, nodes.List(keys)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache(self, block, keys, caller):
+        cache = self.environment.fragment_cache
+        if cache is None or self.environment.auto_reload:
+            return caller()
+
+        key = f'{block}|{keys!r}'
+        html = cache.get(key)
+        if html is None:
+            html = caller()
+            cache.set(key, html)
+        return html
+
+
+def configure_jinja(app):
+    """Bytecode cache and fragment caching; must run before app.jinja_env is first used"""
+    directory = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    options = dict(app.jinja_options)
+    options['extensions'] = list(options.get('extensions', ())) + [FragmentCacheExtension]
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        options['bytecode_cache'] = FileSystemBytecodeCache(directory)
+    app.jinja_options = options
+
+    size = app.config.get('FRAGMENT_CACHE_SIZE')
+    app.jinja_env.fragment_cache = LRUCache(size) if size else None
@@ -0,0 +1,125 @@
+import re
+import time
+import uuid
+from bisect import bisect_left
+from config import Config
+from core import db
+from core.cache import LRUCache, make_cache
+
+KEY_LENGTH = 32  # indexed characters per key; longer queries are checked against the full title
+SCAN_FACTOR = 16  # keys examined per requested result before ranking stops looking
+_WORD = re.compile(r'\w+')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    return _SPACE.sub(' ', text.casefold()).strip()
+
+
+class PrefixIndex:
+    """Sorted word-suffix keys over titles, searched by prefix with bisect.
+
+    Every title is indexed once per word, from that word to the end, so "api"
+    finds "Build a REST API" and "rest api" matches across words. Keys are
+    truncated to KEY_LENGTH characters to bound memory.
+    """
+
+    def __init__(self, items):
+        self.items = items  # (kind, id, title, project_id, project_name)
+        self._titles = [normalize(item[2]) for item in items]
+        entries = []
+        for position, title in enumerate(self._titles):
+            for match in _WORD.finditer(title):
+                entries.append((title[match.start():match.start() + KEY_LENGTH], match.start(), position))
+        entries.sort()
+        self._keys = [entry[0] for entry in entries]
+        self._refs = [(entry[1], entry[2]) for entry in entries]
+
+    def __len__(self):
+        return len(self.items)
+
+    def search(self, query, limit):
+        """Up to `limit` items whose title has a word starting with `query`.
+
+        Whole-title prefix matches rank first, then shorter titles.
+        """
+        query = normalize(query)
+        if not query or limit < 1:
+            return []
+        key = query[:KEY_LENGTH]
+        start = bisect_left(self._keys, key)
+        stop = min(bisect_left(self._keys, key + '\U0010ffff'), start + limit * SCAN_FACTOR)
+
+        best = {}
+        for index in range(start, stop):
+            offset, position = self._refs[index]
+            title = self._titles[position]
+            if len(query) > KEY_LENGTH and not title.startswith(query, offset):
+                continue
+            rank = (offset > 0, len(title), title)
+            if position not in best or rank < best[position]:
+                best[position] = rank
+        ranked = sorted(best, key=best.get)[:limit]
+        return [self.items[position] for position in ranked]
+
+
+class TypeaheadIndex:
+    """Per-user prefix indexes over prompt and project titles.
+
+    Indexes are built in process on first use and kept in an LRU. Writes bump the
+    user's generation token in the cache backend, which may be shared (redis), so
+    every worker rebuilds on its next lookup; TYPEAHEAD_TTL bounds staleness from
+    bulk loads that bypass the controllers.
+    """
+
+    def __init__(self):
+        self._indexes = None
+        self._generations = None
+
+    def _caches(self):
+        if self._indexes is None:
+            self._generations = make_cache('typeahead', Config.TYPEAHEAD_BACKEND, Config.TYPEAHEAD_CACHE_SIZE)
+            self._indexes = LRUCache(Config.TYPEAHEAD_CACHE_SIZE)
+        return self._indexes, self._generations
+
+    def get(self, user_id):
+        """The user's PrefixIndex, rebuilt if a write happened since it was built"""
+        indexes, generations = self._caches()
+        generation = generations.get(str(user_id))
+        entry = indexes.get(user_id)
+        if entry is not None:
+            built_generation, built_at, index = entry
+            if built_generation == generation and time.monotonic() - built_at < Config.TYPEAHEAD_TTL:
+                return index
+
+        index = self.build(user_id)
+        indexes.set(user_id, (generation, time.monotonic(), index))
+        return index
+
+    def invalidate(self, user_id):
+        """Call after changing the titles of a user's prompts or projects"""
+        indexes, generations = self._caches()
+        generations.set(str(user_id), uuid.uuid4().hex)
+        indexes.delete(user_id)
+
+    @staticmethod
+    def build(user_id):
+        from models.project import Project
+        from models.prompt import Prompt
+
+        projects = db.session.execute(
+            db.select(Project.id, Project.name).where(Project.user_id == user_id)
+        ).all()
+        prompts = db.session.execute(
+            db.select(Prompt.id, Prompt.title, Prompt.project_id, Project.name)
+            .join(Project).where(Project.user_id == user_id)
+        ).all()
+        items = [('project', id, name, id, name) for id, name in projects]
+        items += [('prompt', id, title, project_id, project_name) for id, title, project_id, project_name in prompts]
+        return PrefixIndex(items)
+
+    def suggest(self, user_id, query, limit):
+        return self.get(user_id).search(query, limit)
+
+
+typeahead = TypeaheadIndex()
@@ -0,0 +1,80 @@
+from datetime import datetime
+from config import Config
+from core import db
+from core.cache import make_cache
+
+
+class UserCache:
+    """Identity cache for the login user_loader.
+
+    Holds each user's columns (never the password hash) for USER_CACHE_TTL seconds
+    so authenticated requests can skip the users lookup. User.save() and
+    User.delete() invalidate the entry.
+    """
+
+    def __init__(self):
+        self._cache = None
+
+    @property
+    def enabled(self):
+        return Config.USER_CACHE_TTL > 0
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = make_cache('user', Config.USER_CACHE_BACKEND,
+                                     Config.USER_CACHE_SIZE, Config.USER_CACHE_TTL)
+        return self._cache
+
+    def load(self, user_id):
+        """Return the user with `user_id`, from the cache when possible"""
+        from models.user import User
+
+        if not self.enabled:
+            return User.get_by_id(user_id)
+
+        data = self.cache.get(str(user_id))
+        if data is not None:
+            return self._restore(User, data)
+
+        user = User.get_by_id(user_id)
+        if user is not None:
+            self.cache.set(str(user_id), self._dump(user))
+        return user
+
+    def invalidate(self, user_id):
+        if self.enabled and user_id is not None:
+            self.cache.delete(str(user_id))
+
+    @staticmethod
+    def _dump(user):
+        data = {}
+        for column in user.__table__.columns:
+            if column.name == 'password':
+                continue
+            value = getattr(user, column.name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            data[column.name] = value
+        return data
+
+    @staticmethod
+    def _restore(model, data):
+        """Rebuild a persistent instance without a query.
+
+        Columns left out of the cache (the password hash) are expired and load on
+        first access.
+        """
+        user = db.inspect(model).class_manager.new_instance()
+        for column in model.__table__.columns:
+            if column.name not in data:
+                continue
+            value = data[column.name]
+            if value is not None and isinstance(column.type, db.DateTime):
+                value = datetime.fromisoformat(value)
+            setattr(user, column.name, value)
+        db.make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+
+user_cache = UserCache()
@@ -1,51 +1,94 @@
 # create_dummy_data.py
+"""Create demo accounts and, optionally, large volumes of synthetic data.
+
+    python create_dummy_data.py                      # demo accounts only
+    python create_dummy_data.py --users 1000 --projects 10 --prompts 100 --responses 10
+"""
+import argparse
+import time
 from app import create_app
 from core import db
+from core.datagen import DataGenerator
+from core.migrations import upgrade
 from models.user import User
 from models.project import Project
 from models.prompt import Prompt
 from models.prompt_response import PromptResponse
 
+def create_demo_accounts():
+    """Admin and alice accounts with a small sample project"""
+    # Create admin user
+    if not User.get_by_username('admin'):
+        admin = User.create_user('admin', 'admin@example.com', 'adminpass', is_admin=True)
+        print(f'Created admin: admin / adminpass (id={admin.id})')
+    else:
+        print('admin already exists')
+
+    # Create regular user
+    if not User.get_by_username('alice'):
+        alice = User.create_user('alice', 'alice@example.com', 'alicepass', is_admin=False)
+        print(f'Created user: alice / alicepass (id={alice.id})')
+    else:
+        alice = User.get_by_username('alice')
+        print('alice already exists')
+
+    # Create sample project, prompt, and conversation for alice
+    if alice and alice.get_projects_count() == 0:
+        project = Project(user_id=alice.id, name='Demo Project', description='A sample project created for testing')
+        project.save()
+
+        prompt = Prompt(project_id=project.id, title='Hello prompt', content='Say hello to the world')
+        prompt.save()
+
+        # Add initial conversation
+        resp = PromptResponse(
+            prompt_id=prompt.id,
+            role='assistant',
+            content='Hello!'
+        )
+        resp.save()
+
+        print('Sample project, prompt, and conversation created for alice')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=0, help='synthetic users to generate')
+    parser.add_argument('--projects', type=int, default=5, help='projects per user')
+    parser.add_argument('--prompts', type=int, default=20, help='prompts per project')
+    parser.add_argument('--responses', type=int, default=10, help='responses per prompt')
+    parser.add_argument('--attachments', type=int, default=1, help='attachments per prompt')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for repeatable output')
+    parser.add_argument('--password', default='password', help='password shared by generated users')
+    parser.add_argument('--no-demo', action='store_true', help='skip the admin/alice demo accounts')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     app = create_app()
     with app.app_context():
-        # ensure tables exist (SQLAlchemy models)
-        db.create_all()
-
-        # Create admin user
-        if not User.get_by_username('admin'):
-            admin = User.create_user('admin', 'admin@example.com', 'adminpass', is_admin=True)
-            print(f'Created admin: admin / adminpass (id={admin.id})')
-        else:
-            print('admin already exists')
-
-        # Create regular user
-        if not User.get_by_username('alice'):
-            alice = User.create_user('alice', 'alice@example.com', 'alicepass', is_admin=False)
-            print(f'Created user: alice / alicepass (id={alice.id})')
-        else:
-            alice = User.get_by_username('alice')
-            print('alice already exists')
-
-        # Create sample project, prompt, and conversation for alice
-        if alice and len(alice.projects) == 0:
-            project = Project(user_id=alice.id, name='Demo Project', description='A sample project created for testing')
-            project.save()
-
-            prompt = Prompt(project_id=project.id, title='Hello prompt', content='Say hello to the world')
-            prompt.save()
-
-            # Add initial conversation
-            resp = PromptResponse(
-                prompt_id=prompt.id,
-                role='assistant',
-                content='Hello!'
+        # same schema step as `flask db upgrade` (the app no longer creates tables at boot)
+        upgrade(db.engine)
+
+        if not args.no_demo:
+            create_demo_accounts()
+
+        if args.users > 0:
+            generator = DataGenerator(
+                users=args.users, projects=args.projects, prompts=args.prompts,
+                responses=args.responses, attachments=args.attachments,
+                seed=args.seed, password=args.password
             )
-            resp.save()
+            started = time.perf_counter()
+
+            def progress(table, rows):
+                print(f'  {table}: {rows} rows ({time.perf_counter() - started:.1f}s)')
 
-            print('Sample project, prompt, and conversation created for alice')
+            print('Generating synthetic data...')
+            data = generator.run(progress=progress)
+            print(f'Generated users {data.username(0)}..{data.username(args.users - 1)} '
+                  f'(password: {args.password})')
 
         print('Done.')
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,7 @@
+-- Full-text search index for Prompt.search_by_user (replaces ILIKE scans).
+-- The expression must match prompt_search_vector() in core/search.py.
+-- It is built for SEARCH_LANGUAGE='english'; `flask search language` rebuilds it for another setting.
+CREATE INDEX IF NOT EXISTS idx_prompts_search ON prompts USING GIN (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')
+);
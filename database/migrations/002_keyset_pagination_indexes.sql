@@ -0,0 +1,5 @@
+-- Composite indexes backing keyset pagination on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_user_created ON projects(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_prompts_project_created ON prompts(project_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_responses_prompt_created ON prompt_responses(prompt_id, created_at, id);
@@ -0,0 +1,3 @@
+-- Markdown rendered at write time for assistant responses.
+-- Existing rows stay NULL and are rendered (and cached) on view.
+ALTER TABLE prompt_responses ADD COLUMN IF NOT EXISTS content_html TEXT;
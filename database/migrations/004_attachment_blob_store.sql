@@ -0,0 +1,6 @@
+-- Attachment content can live in the content-addressed blob store.
+-- Move existing rows with: flask --app app attachments migrate
+ALTER TABLE attachments ALTER COLUMN content DROP NOT NULL;
+ALTER TABLE attachments ADD COLUMN IF NOT EXISTS blob_hash VARCHAR(64);
+ALTER TABLE attachments ADD COLUMN IF NOT EXISTS size INT;
+CREATE INDEX IF NOT EXISTS idx_attachments_blob_hash ON attachments(blob_hash);
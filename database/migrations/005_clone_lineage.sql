@@ -0,0 +1,7 @@
+-- Clones remember their source; copied child rows are mapped through cloned_from_id.
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS forked_from_id INT
+    REFERENCES projects (id) ON DELETE SET NULL;
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS cloned_from_id INT
+    REFERENCES prompts (id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_projects_forked_from_id ON projects(forked_from_id);
+CREATE INDEX IF NOT EXISTS idx_prompts_cloned_from_id ON prompts(cloned_from_id);
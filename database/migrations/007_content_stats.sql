@@ -0,0 +1,14 @@
+-- Content statistics stored on write (lines, words, characters, BPE tokens).
+-- Nullable: existing rows are measured on read until `flask --app app stats backfill` fills them.
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS line_count INT;
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS word_count INT;
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS char_count INT;
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS token_count INT;
+ALTER TABLE prompt_responses ADD COLUMN IF NOT EXISTS line_count INT;
+ALTER TABLE prompt_responses ADD COLUMN IF NOT EXISTS word_count INT;
+ALTER TABLE prompt_responses ADD COLUMN IF NOT EXISTS char_count INT;
+ALTER TABLE prompt_responses ADD COLUMN IF NOT EXISTS token_count INT;
+ALTER TABLE attachments ADD COLUMN IF NOT EXISTS line_count INT;
+ALTER TABLE attachments ADD COLUMN IF NOT EXISTS word_count INT;
+ALTER TABLE attachments ADD COLUMN IF NOT EXISTS char_count INT;
+ALTER TABLE attachments ADD COLUMN IF NOT EXISTS token_count INT;
@@ -0,0 +1,40 @@
+-- Unified search index over prompts, responses and attachments (core/search_index.py).
+-- Backfills everything stored in the database; run `flask --app app search reindex`
+-- afterwards to include attachments kept in the blob store.
+CREATE TABLE IF NOT EXISTS search_documents (
+    id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    prompt_id INT NOT NULL REFERENCES prompts (id) ON DELETE CASCADE,
+    entity_type VARCHAR(20) NOT NULL,
+    entity_id INT NOT NULL,
+    title VARCHAR(255),
+    body TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_search_documents_entity UNIQUE (entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_prompt_id ON search_documents(prompt_id);
+CREATE INDEX IF NOT EXISTS idx_search_documents_user_type ON search_documents(user_id, entity_type);
+
+INSERT INTO search_documents (user_id, prompt_id, entity_type, entity_id, title, body, created_at)
+SELECT pj.user_id, p.id, 'prompt', p.id, p.title, p.content, p.created_at
+FROM prompts p JOIN projects pj ON pj.id = p.project_id
+ON CONFLICT (entity_type, entity_id) DO NOTHING;
+
+INSERT INTO search_documents (user_id, prompt_id, entity_type, entity_id, title, body, created_at)
+SELECT pj.user_id, r.prompt_id, 'response', r.id, NULL, r.content, r.created_at
+FROM prompt_responses r JOIN prompts p ON p.id = r.prompt_id JOIN projects pj ON pj.id = p.project_id
+ON CONFLICT (entity_type, entity_id) DO NOTHING;
+
+INSERT INTO search_documents (user_id, prompt_id, entity_type, entity_id, title, body, created_at)
+SELECT pj.user_id, a.prompt_id, 'attachment', a.id, a.filename, a.content, a.created_at
+FROM attachments a JOIN prompts p ON p.id = a.prompt_id JOIN projects pj ON pj.id = p.project_id
+WHERE a.content IS NOT NULL
+ON CONFLICT (entity_type, entity_id) DO NOTHING;
+
+-- Built after the backfill; must match document_search_vector() in core/search.py.
+-- It is built for SEARCH_LANGUAGE='english'; `flask search language` rebuilds it for another setting.
+CREATE INDEX IF NOT EXISTS idx_search_documents_search ON search_documents USING GIN (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(body, '')), 'B')
+);
@@ -0,0 +1,13 @@
+-- MinHash signatures and LSH band buckets for near-duplicate prompts (core/near_duplicates.py).
+-- Signatures are computed in Python: run `flask --app app similar backfill` afterwards.
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS minhash BYTEA;
+
+CREATE TABLE IF NOT EXISTS prompt_lsh_buckets (
+    prompt_id INT NOT NULL REFERENCES prompts (id) ON DELETE CASCADE,
+    band SMALLINT NOT NULL,
+    user_id INT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    bucket BIGINT NOT NULL,
+    PRIMARY KEY (prompt_id, band)
+);
+
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets_user_bucket ON prompt_lsh_buckets(user_id, bucket);
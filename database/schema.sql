@@ -1,6 +1,8 @@
 -- Database schema for AI Prompt Manager
 -- This file creates all necessary tables and relationships
 
+DROP TABLE IF EXISTS prompt_lsh_buckets;
+DROP TABLE IF EXISTS search_documents;
 DROP TABLE IF EXISTS prompt_responses;
 DROP TABLE IF EXISTS prompts;
 DROP TABLE IF EXISTS projects;
@@ -14,7 +16,8 @@ CREATE TABLE users (
     email VARCHAR(100) UNIQUE NOT NULL,
     password VARCHAR(255) NOT NULL,
     is_admin BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
 -- Projects table
@@ -23,10 +26,15 @@ CREATE TABLE projects (
     user_id INT NOT NULL,
     name VARCHAR(100) NOT NULL,
     description TEXT,
+    forked_from_id INT,
     created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
     CONSTRAINT fk_project_user
         FOREIGN KEY (user_id) REFERENCES users (id)
-        ON DELETE CASCADE
+        ON DELETE CASCADE,
+    CONSTRAINT fk_project_forked_from
+        FOREIGN KEY (forked_from_id) REFERENCES projects (id)
+        ON DELETE SET NULL
 );
 
 -- Prompts table (no more `result` column)
@@ -35,10 +43,20 @@ CREATE TABLE prompts (
     project_id INT NOT NULL,
     title VARCHAR(100) NOT NULL,
     content TEXT NOT NULL,
+    line_count INT,              -- content statistics, computed on write
+    word_count INT,
+    char_count INT,
+    token_count INT,
+    minhash BYTEA,               -- MinHash signature of content (core/near_duplicates.py)
+    cloned_from_id INT,
     created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
     CONSTRAINT fk_prompt_project
         FOREIGN KEY (project_id) REFERENCES projects (id)
-        ON DELETE CASCADE
+        ON DELETE CASCADE,
+    CONSTRAINT fk_prompt_cloned_from
+        FOREIGN KEY (cloned_from_id) REFERENCES prompts (id)
+        ON DELETE SET NULL
 );
 
 -- Prompt Responses table (conversation history)
@@ -48,7 +66,13 @@ CREATE TABLE prompt_responses (
     role VARCHAR(20) NOT NULL CHECK (role IN ('user', 'assistant', 'system')),
     content TEXT NOT NULL,
     extra_metadata JSONB,
+    content_html TEXT,
+    line_count INT,
+    word_count INT,
+    char_count INT,
+    token_count INT,
     created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
     CONSTRAINT fk_response_prompt
         FOREIGN KEY (prompt_id) REFERENCES prompts (id)
         ON DELETE CASCADE
@@ -59,13 +83,55 @@ CREATE TABLE attachments (
     prompt_id INT NOT NULL,
     filename VARCHAR(255) NOT NULL,
     mime_type VARCHAR(100) NOT NULL DEFAULT 'text/plain',
-    content TEXT NOT NULL,
+    content TEXT,                -- inline content; NULL when stored in the blob store
+    blob_hash VARCHAR(64),       -- SHA-256 of the content in the blob store
+    size INT,                    -- content size in bytes
+    line_count INT,
+    word_count INT,
+    char_count INT,
+    token_count INT,
     created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
     CONSTRAINT fk_attachment_prompt
         FOREIGN KEY (prompt_id) REFERENCES prompts (id)
         ON DELETE CASCADE
 );
 
+-- Unified search index: one row per prompt, response and attachment.
+-- Maintained by the application (core/search_index.py).
+CREATE TABLE search_documents (
+    id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL,
+    prompt_id INT NOT NULL,
+    entity_type VARCHAR(20) NOT NULL,  -- 'prompt', 'response' or 'attachment'
+    entity_id INT NOT NULL,
+    title VARCHAR(255),                -- prompt title or attachment filename
+    body TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_search_documents_entity UNIQUE (entity_type, entity_id),
+    CONSTRAINT fk_search_document_user
+        FOREIGN KEY (user_id) REFERENCES users (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_search_document_prompt
+        FOREIGN KEY (prompt_id) REFERENCES prompts (id)
+        ON DELETE CASCADE
+);
+
+-- LSH band buckets of prompt MinHash signatures, for near-duplicate lookup
+CREATE TABLE prompt_lsh_buckets (
+    prompt_id INT NOT NULL,
+    band SMALLINT NOT NULL,
+    user_id INT NOT NULL,
+    bucket BIGINT NOT NULL,
+    PRIMARY KEY (prompt_id, band),
+    CONSTRAINT fk_lsh_bucket_prompt
+        FOREIGN KEY (prompt_id) REFERENCES prompts (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_lsh_bucket_user
+        FOREIGN KEY (user_id) REFERENCES users (id)
+        ON DELETE CASCADE
+);
+
 -- Indexes for better performance
 CREATE INDEX idx_projects_user_id ON projects(user_id);
 CREATE INDEX idx_prompts_project_id ON prompts(project_id);
@@ -74,4 +140,31 @@ CREATE INDEX idx_responses_prompt_id ON prompt_responses(prompt_id);
 CREATE INDEX idx_responses_created_at ON prompt_responses(created_at);
 CREATE INDEX idx_users_username ON users(username);
 CREATE INDEX idx_attachments_prompt_id ON attachments(prompt_id);
-CREATE INDEX idx_attachments_created_at ON attachments(created_at);
\ No newline at end of file
+CREATE INDEX idx_attachments_created_at ON attachments(created_at);
+CREATE INDEX idx_attachments_blob_hash ON attachments(blob_hash);
+CREATE INDEX idx_projects_forked_from_id ON projects(forked_from_id);
+CREATE INDEX idx_prompts_cloned_from_id ON prompts(cloned_from_id);
+
+-- Composite indexes backing keyset pagination on (created_at, id)
+CREATE INDEX idx_users_created ON users(created_at, id);
+CREATE INDEX idx_projects_user_created ON projects(user_id, created_at, id);
+CREATE INDEX idx_prompts_project_created ON prompts(project_id, created_at, id);
+CREATE INDEX idx_responses_prompt_created ON prompt_responses(prompt_id, created_at, id);
+
+-- Full-text search over prompt title (weight A) and content (weight B).
+-- The expression must match prompt_search_vector() in core/search.py.
+CREATE INDEX idx_prompts_search ON prompts USING GIN (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')
+);
+
+-- Unified search: same weighting over search_documents (document_search_vector() in core/search.py).
+CREATE INDEX idx_search_documents_prompt_id ON search_documents(prompt_id);
+CREATE INDEX idx_search_documents_user_type ON search_documents(user_id, entity_type);
+CREATE INDEX idx_search_documents_search ON search_documents USING GIN (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(body, '')), 'B')
+);
+
+-- Near-duplicate candidates: prompts of one user sharing a band bucket
+CREATE INDEX idx_lsh_buckets_user_bucket ON prompt_lsh_buckets(user_id, bucket);
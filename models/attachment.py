@@ -1,7 +1,10 @@
+import hashlib
 from core import db
 from core.base_model import BaseModel
+from core.storage import get_blob_store, blobs_enabled
+from core.content_stats import ContentStatsMixin, STAT_COLUMNS
 
-class Attachment(BaseModel):
+class Attachment(ContentStatsMixin, BaseModel):
     __tablename__ = 'attachments'
 
     prompt_id = db.Column(
@@ -11,4 +14,80 @@ class Attachment(BaseModel):
     )
     filename = db.Column(db.String(255), nullable=False)
     mime_type = db.Column(db.String(100), nullable=False, default='text/plain')
-    content = db.Column(db.Text, nullable=False)
\ No newline at end of file
+    content = db.Column(db.Text, nullable=True)  # inline content; NULL when stored as a blob
+    blob_hash = db.Column(db.String(64), nullable=True, index=True)  # SHA-256 of the blob
+    size = db.Column(db.Integer, nullable=True)  # content size in bytes
+
+    search_entity = 'attachment'
+
+    def __init__(self, prompt_id, filename, mime_type, content):
+        self.prompt_id = prompt_id
+        self.filename = filename
+        self.mime_type = mime_type
+        self.set_content(content)
+
+    def set_content(self, text):
+        """Store text in the blob store (deduplicated) or inline, per ATTACHMENT_STORAGE"""
+        data = text.encode('utf-8')
+        self.size = len(data)
+        self.set_content_stats(text)
+        if blobs_enabled():
+            self.blob_hash = get_blob_store().put(data)
+            self.content = None
+        else:
+            self.blob_hash = None
+            self.content = text
+
+    def read_bytes(self):
+        if self.blob_hash:
+            return get_blob_store().read(self.blob_hash)
+        return (self.content or '').encode('utf-8')
+
+    def read_text(self):
+        if self.blob_hash:
+            return self.read_bytes().decode('utf-8')
+        return self.content or ''
+
+    def stored_text(self):
+        return self.read_text()
+
+    def search_document(self):
+        return self.filename, self.read_text()
+
+    def blob_path(self):
+        """Local file to stream for downloads, or None for inline content"""
+        if not self.blob_hash:
+            return None
+        return get_blob_store().path(self.blob_hash)
+
+    @property
+    def etag(self):
+        """Strong validator: the content hash with the filename and type sent alongside it"""
+        content_hash = self.blob_hash or hashlib.sha256(self.read_bytes()).hexdigest()
+        representation = f'{content_hash}\0{self.filename}\0{self.mime_type}'
+        return hashlib.sha256(representation.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def copy_to_prompt(cls, src_prompt_id, dst_prompt_id):
+        """INSERT ... SELECT one prompt's attachments onto another. Blobs are shared, not copied."""
+        source = db.select(
+            db.literal(dst_prompt_id), cls.filename, cls.mime_type, cls.content,
+            cls.blob_hash, cls.size, *cls.stat_columns(), cls.created_at
+        ).where(cls.prompt_id == src_prompt_id)
+        return cls._insert_copies(source)
+
+    @classmethod
+    def copy_to_clones(cls, clone_condition):
+        """INSERT ... SELECT attachments onto cloned prompts matching `clone_condition`"""
+        from models.prompt import Prompt
+
+        source = db.select(
+            Prompt.id, cls.filename, cls.mime_type, cls.content, cls.blob_hash, cls.size,
+            *cls.stat_columns(), cls.created_at
+        ).join(Prompt, Prompt.cloned_from_id == cls.prompt_id).where(clone_condition)
+        return cls._insert_copies(source)
+
+    @classmethod
+    def _insert_copies(cls, source):
+        columns = ['prompt_id', 'filename', 'mime_type', 'content', 'blob_hash', 'size', *STAT_COLUMNS, 'created_at']
+        return db.session.execute(db.insert(cls).from_select(columns, source)).rowcount
\ No newline at end of file
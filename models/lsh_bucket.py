@@ -0,0 +1,19 @@
+from core import db
+
+
+class LSHBucket(db.Model):
+    """One LSH band bucket of a prompt's MinHash signature, maintained by core.near_duplicates"""
+
+    __tablename__ = 'prompt_lsh_buckets'
+
+    prompt_id = db.Column(db.Integer, db.ForeignKey('prompts.id', ondelete='CASCADE'), primary_key=True)
+    band = db.Column(db.SmallInteger, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    bucket = db.Column(db.BigInteger, nullable=False)  # hash of the band's rows, salted per band
+
+    __table_args__ = (
+        db.Index('idx_lsh_buckets_user_bucket', 'user_id', 'bucket'),
+    )
+
+    def __repr__(self):
+        return f'<LSHBucket {self.prompt_id}:{self.band}>'
@@ -9,6 +9,16 @@ class Project(BaseModel):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
+    forked_from_id = db.Column(
+        db.Integer,
+        db.ForeignKey('projects.id', ondelete='SET NULL'),
+        nullable=True,
+        index=True
+    )
+
+    __table_args__ = (
+        db.Index('idx_projects_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     # Relationship with prompts
     prompts = db.relationship('Prompt', backref='project', lazy=True, cascade='all, delete-orphan')
@@ -23,18 +33,35 @@ class Project(BaseModel):
         """Get all projects for a specific user"""
         return cls.query.filter_by(user_id=user_id).order_by(cls.created_at.desc()).all()
     
+    @classmethod
+    def get_page_by_user(cls, user_id, cursor=None, per_page=None):
+        """Get one page of a user's projects, newest first"""
+        return cls.get_keyset_page(cls.query.filter_by(user_id=user_id), cursor, per_page)
+    
     @classmethod
     def get_user_project(cls, user_id, project_id):
         """Get specific project belonging to user"""
         return cls.query.filter_by(id=project_id, user_id=user_id).first()
     
+    def remove_indexes(self):
+        from core.near_duplicates import near_duplicates
+        super().remove_indexes()
+        near_duplicates.remove_scope(self)
+    
+    def search_scope(self, documents):
+        """Documents of every prompt in the project"""
+        from models.prompt import Prompt
+        return documents.prompt_id.in_(db.select(Prompt.id).where(Prompt.project_id == self.id))
+    
     def get_prompts_count(self):
-        """Get count of prompts in this project"""
-        return len(self.prompts)
+        """Get count of prompts in this project (COUNT query, no rows loaded)"""
+        from models.prompt import Prompt
+        return Prompt.query.filter_by(project_id=self.id).count()
     
     def get_latest_prompts(self, limit=5):
         """Get latest prompts in this project"""
-        return [prompt for prompt in self.prompts[:limit]]
+        from models.prompt import Prompt
+        return Prompt.get_page_by_project(self.id, per_page=limit).items
     
     def is_owned_by(self, user_id):
         """Check if project is owned by specific user"""
@@ -1,7 +1,10 @@
 from core import db
 from core.base_model import BaseModel
+from core.search import prompt_search, prompt_search_vector, install_sqlite_index
+from core.content_stats import ContentStatsMixin, STAT_COLUMNS
+from core.near_duplicates import near_duplicates
 
-class Prompt(BaseModel):
+class Prompt(ContentStatsMixin, BaseModel):
     """Prompt model for storing AI prompts"""
     
     __tablename__ = 'prompts'
@@ -9,6 +12,22 @@ class Prompt(BaseModel):
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
     title = db.Column(db.String(100), nullable=False)
     content = db.Column(db.Text, nullable=False)
+    cloned_from_id = db.Column(
+        db.Integer,
+        db.ForeignKey('prompts.id', ondelete='SET NULL'),
+        nullable=True,
+        index=True
+    )
+    minhash = db.Column(db.LargeBinary, nullable=True)  # MinHash signature of content (uint32 array)
+
+    __table_args__ = (
+        db.Index(
+            'idx_prompts_search',
+            prompt_search_vector(title, content),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+        db.Index('idx_prompts_project_created', 'project_id', 'created_at', 'id'),
+    )
     
     # Relationship to multiple responses
     responses = db.relationship(
@@ -27,33 +46,81 @@ class Prompt(BaseModel):
         order_by='Attachment.created_at'
     )
 
+    search_entity = 'prompt'
+
     def __init__(self, project_id, title, content):
         self.project_id = project_id
         self.title = title
         self.content = content
     
+    @db.validates('content')
+    def _measure_content(self, key, content):
+        """Store line/word/character/token counts and the MinHash signature so reads never re-split the content"""
+        self.set_content_stats(content)
+        self.minhash = near_duplicates.signature_bytes(content)
+        return content
+    
+    def update_indexes(self):
+        super().update_indexes()
+        near_duplicates.index(self)
+    
+    def remove_indexes(self):
+        super().remove_indexes()
+        near_duplicates.remove(self.id)
+    
     @classmethod
     def get_by_project(cls, project_id):
         """Get all prompts for a specific project"""
         return cls.query.filter_by(project_id=project_id).order_by(cls.created_at.desc()).all()
     
+    @classmethod
+    def get_page_by_project(cls, project_id, cursor=None, per_page=None):
+        """Get one page of a project's prompts, newest first"""
+        return cls.get_keyset_page(cls.query.filter_by(project_id=project_id), cursor, per_page)
+    
     @classmethod
     def get_project_prompt(cls, project_id, prompt_id):
         """Get specific prompt belonging to project"""
         return cls.query.filter_by(id=prompt_id, project_id=project_id).first()
     
     @classmethod
-    def search_by_user(cls, user_id, search_term):
-        """Search prompts by title or content for specific user"""
-        from models.project import Project
-        
-        return cls.query.join(Project).filter(
-            Project.user_id == user_id,
-            db.or_(
-                cls.title.ilike(f'%{search_term}%'),
-                cls.content.ilike(f'%{search_term}%')
+    def search_by_user(cls, user_id, search_term, limit=None, prefix_last=False):
+        """Full-text search over title and content for specific user, best match first"""
+        return prompt_search.search(user_id, search_term, limit=limit, prefix_last=prefix_last)
+    
+    @classmethod
+    def search_page_by_user(cls, user_id, search_term, cursor=None, per_page=None, prefix_last=False):
+        """Full-text search for specific user, one page at a time, newest first"""
+        return prompt_search.search_page(user_id, search_term, cursor=cursor, per_page=per_page,
+                                         prefix_last=prefix_last)
+    
+    @classmethod
+    def copy_to_project(cls, src_project_id, dst_project_id):
+        """INSERT ... SELECT every prompt of one project into another, server-side.
+
+        Each copy records its source in cloned_from_id so child rows can be mapped
+        onto the copies with copy_to_clones(). Does not commit.
+        """
+        source = db.select(
+            db.literal(dst_project_id), cls.title, cls.content, *cls.stat_columns(), cls.minhash,
+            cls.created_at, cls.id
+        ).where(cls.project_id == src_project_id)
+        return db.session.execute(
+            db.insert(cls).from_select(
+                ['project_id', 'title', 'content', *STAT_COLUMNS, 'minhash', 'created_at', 'cloned_from_id'], source
             )
-        ).order_by(cls.created_at.desc()).all()
+        ).rowcount
+    
+    def search_document(self):
+        return self.title, self.content
+    
+    def search_scope(self, documents):
+        """The prompt's document and those of its responses and attachments"""
+        return documents.prompt_id == self.id
+    
+    def get_similar(self, threshold=None, limit=None):
+        """Near-duplicates of this prompt in the owner's library, most similar first"""
+        return near_duplicates.similar(self, threshold=threshold, limit=limit)
     
     def get_content_preview(self, length=100):
         """Get truncated content for preview"""
@@ -65,5 +132,14 @@ class Prompt(BaseModel):
         """Check if prompt belongs to specific user through project"""
         return self.project.user_id == user_id
     
+    def to_dict(self):
+        """Convert to dictionary, excluding the binary signature"""
+        data = super().to_dict()
+        data.pop('minhash', None)
+        return data
+    
     def __repr__(self):
-        return f'<Prompt {self.title}>'
\ No newline at end of file
+        return f'<Prompt {self.title}>'
+
+
+install_sqlite_index(Prompt.__table__)
\ No newline at end of file
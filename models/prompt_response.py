@@ -1,8 +1,10 @@
 # models/prompt_response.py
 from core import db
 from core.base_model import BaseModel
+from core.markdown_renderer import markdown_renderer
+from core.content_stats import ContentStatsMixin, STAT_COLUMNS
 
-class PromptResponse(BaseModel):
+class PromptResponse(ContentStatsMixin, BaseModel):
     """Individual messages/replies for a Prompt (system/user/assistant)"""
     __tablename__ = 'prompt_responses'
 
@@ -11,9 +13,86 @@ class PromptResponse(BaseModel):
     role = db.Column(db.String(20), nullable=False)  # 'system','user','assistant'
     content = db.Column(db.Text, nullable=False)
     extra_metadata = db.Column(db.JSON, nullable=True)  # renamed from 'metadata'
+    content_html = db.Column(db.Text, nullable=True)  # Markdown rendered at write time (assistant only)
+
+    __table_args__ = (
+        db.Index('idx_responses_prompt_created', 'prompt_id', 'created_at', 'id'),
+    )
+
+    search_entity = 'response'
 
     def __init__(self, prompt_id, role, content, extra_metadata=None):
         self.prompt_id = prompt_id
         self.role = role
         self.content = content
-        self.extra_metadata = extra_metadata
\ No newline at end of file
+        self.extra_metadata = extra_metadata
+
+    @db.validates('content')
+    def _render_content(self, key, content):
+        """Store rendered HTML and content statistics so page views do no parsing"""
+        self.content_html = self.render_html(self.role, content)
+        self.set_content_stats(content)
+        return content
+
+    @db.validates('role')
+    def _render_for_role(self, key, role):
+        """Re-render stored content when the role changes (only assistant messages are Markdown)"""
+        if self.content is not None:
+            self.content_html = self.render_html(role, self.content)
+        return role
+
+    def search_document(self):
+        return None, self.content
+
+    @staticmethod
+    def render_html(role, content):
+        """HTML stored for a message; only assistant messages are shown as Markdown"""
+        if role != 'assistant':
+            return None
+        return markdown_renderer.render(content)
+
+    @classmethod
+    def get_page_by_prompt(cls, prompt_id, cursor=None, per_page=None):
+        """Get one page of a prompt's conversation in chronological order"""
+        return cls.get_keyset_page(cls.query.filter_by(prompt_id=prompt_id), cursor, per_page,
+                                   descending=False)
+
+    @classmethod
+    def get_history_by_prompt(cls, prompt_id, before=None, per_page=None):
+        """Get the newest page of messages older than `before`, in chronological order.
+
+        The page's next_cursor points at its oldest message, so passing it back as
+        `before` walks the history backwards.
+        """
+        page = cls.get_keyset_page(cls.query.filter_by(prompt_id=prompt_id), before, per_page,
+                                   descending=True)
+        page.items.reverse()
+        return page
+
+    @classmethod
+    def copy_to_prompt(cls, src_prompt_id, dst_prompt_id):
+        """INSERT ... SELECT one prompt's conversation onto another, server-side. Does not commit."""
+        source = db.select(
+            db.literal(dst_prompt_id), cls.role, cls.content, cls.extra_metadata,
+            cls.content_html, *cls.stat_columns(), cls.created_at
+        ).where(cls.prompt_id == src_prompt_id)
+        return cls._insert_copies(source)
+
+    @classmethod
+    def copy_to_clones(cls, clone_condition):
+        """INSERT ... SELECT conversations onto cloned prompts matching `clone_condition`.
+
+        Source rows are matched through Prompt.cloned_from_id. Does not commit.
+        """
+        from models.prompt import Prompt
+
+        source = db.select(
+            Prompt.id, cls.role, cls.content, cls.extra_metadata, cls.content_html,
+            *cls.stat_columns(), cls.created_at
+        ).join(Prompt, Prompt.cloned_from_id == cls.prompt_id).where(clone_condition)
+        return cls._insert_copies(source)
+
+    @classmethod
+    def _insert_copies(cls, source):
+        columns = ['prompt_id', 'role', 'content', 'extra_metadata', 'content_html', *STAT_COLUMNS, 'created_at']
+        return db.session.execute(db.insert(cls).from_select(columns, source)).rowcount
\ No newline at end of file
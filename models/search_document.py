@@ -0,0 +1,41 @@
+from datetime import datetime
+from core import db
+from core.search import document_search_vector, install_sqlite_index
+
+ENTITY_TYPES = ('prompt', 'response', 'attachment')
+
+
+class SearchDocument(db.Model):
+    """One searchable text per prompt, response and attachment, maintained by core.search_index.
+
+    user_id and prompt_id are denormalized so a search is scoped by one indexed
+    column and hits group by prompt without joining the source tables.
+    """
+
+    __tablename__ = 'search_documents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    prompt_id = db.Column(db.Integer, db.ForeignKey('prompts.id', ondelete='CASCADE'), nullable=False)
+    entity_type = db.Column(db.String(20), nullable=False)  # 'prompt', 'response' or 'attachment'
+    entity_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(255), nullable=True)  # prompt title or attachment filename
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('entity_type', 'entity_id', name='uq_search_documents_entity'),
+        db.Index('idx_search_documents_prompt_id', 'prompt_id'),
+        db.Index('idx_search_documents_user_type', 'user_id', 'entity_type'),
+        db.Index(
+            'idx_search_documents_search',
+            document_search_vector(title, body),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+    )
+
+    def __repr__(self):
+        return f'<SearchDocument {self.entity_type}:{self.entity_id}>'
+
+
+install_sqlite_index(SearchDocument.__table__, ('title', 'body'))
@@ -1,7 +1,8 @@
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from core import db
 from core.base_model import BaseModel
+from core.passwords import password_hasher
+from core.user_cache import user_cache
 
 class User(BaseModel, UserMixin):
     """User model for authentication and user management"""
@@ -12,6 +13,10 @@ class User(BaseModel, UserMixin):
     email = db.Column(db.String(100), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
+
+    __table_args__ = (
+        db.Index('idx_users_created', 'created_at', 'id'),
+    )
     
     # Relationship with projects
     projects = db.relationship('Project', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -23,12 +28,20 @@ class User(BaseModel, UserMixin):
         self.set_password(password)
     
     def set_password(self, password):
-        """Hash and set password"""
-        self.password = generate_password_hash(password)
+        """Hash and set password (on the hashing pool; may raise HasherBusy)"""
+        self.password = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Check if provided password matches stored hash"""
-        return check_password_hash(self.password, password)
+        """Check if provided password matches stored hash (on the hashing pool; may raise HasherBusy)"""
+        return password_hasher.verify(self.password, password)
+    
+    def rehash_password(self, password):
+        """Re-hash with the configured method when the stored hash is outdated; call after a successful check"""
+        if not password_hasher.needs_rehash(self.password):
+            return False
+        self.set_password(password)
+        self.save()
+        return True
     
     @classmethod
     def get_by_username(cls, username):
@@ -51,9 +64,31 @@ class User(BaseModel, UserMixin):
         user = cls(username=username, email=email, password=password, is_admin=is_admin)
         return user.save()
     
+    def save(self):
+        """Save and drop the cached login identity"""
+        super().save()
+        user_cache.invalidate(self.id)
+        return self
+    
+    def delete(self):
+        """Delete and drop the cached login identity"""
+        user_id = self.id
+        super().delete()
+        user_cache.invalidate(user_id)
+    
+    def remove_indexes(self):
+        from core.near_duplicates import near_duplicates
+        super().remove_indexes()
+        near_duplicates.remove_scope(self)
+    
+    def search_scope(self, documents):
+        """Every document in the user's library"""
+        return documents.user_id == self.id
+    
     def get_projects_count(self):
-        """Get count of user's projects"""
-        return len(self.projects)
+        """Get count of user's projects (COUNT query, no rows loaded)"""
+        from models.project import Project
+        return Project.query.filter_by(user_id=self.id).count()
     
     def to_dict(self):
         """Convert to dictionary, excluding password"""
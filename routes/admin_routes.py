@@ -0,0 +1,25 @@
+from flask import Blueprint, current_app, jsonify, abort
+from flask_login import login_required, current_user
+from core import db
+from core.pool import pool_status
+
+# Create blueprint
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+@admin_bp.before_request
+@login_required
+def require_admin():
+    """All admin endpoints are restricted to administrators"""
+    if not current_user.is_admin:
+        abort(403)
+
+@admin_bp.route('/api/pool')
+def api_pool():
+    """Database connection pool state and checkout metrics"""
+    return jsonify(pool_status(db.engine, current_app.config))
+
+
+@admin_bp.route('/api/boot')
+def api_boot():
+    """How long this worker's create_app() took, by phase"""
+    return jsonify(current_app.extensions.get('boot_report', {}))
@@ -1,7 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify, make_response
 from flask_login import login_required, current_user
 from controllers.project_controller import ProjectController
 from controllers.prompt_controller import PromptController
+from core.http_cache import not_modified, with_validator, page_parts
 
 # Create blueprint
 project_bp = Blueprint('project', __name__, url_prefix='/projects')
@@ -21,8 +22,12 @@ def dashboard():
 @login_required
 def list_projects():
     """List all user projects"""
-    projects = project_controller.get_user_projects()
-    return render_template('projects.html', projects=projects)
+    page = project_controller.get_user_projects_page(
+        request.args.get('cursor'), request.args.get('per_page', type=int))
+    return render_template('projects.html',
+                         projects=page.items,
+                         page=page,
+                         prompt_counts=project_controller.get_prompt_counts(page.items))
 
 @project_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -42,15 +47,34 @@ def create_project():
 @login_required
 def view_project(project_id):
     """View specific project and its prompts"""
-    project = project_controller.get_user_project(project_id)
-    if not project:
+    validator = project_controller.get_project_validator(project_id, page_parts())
+    if not validator:
         return redirect(url_for('project.dashboard'))
+    cached = not_modified(validator, for_html=True)
+    if cached:
+        return cached
+    
+    project = project_controller.get_user_project(project_id)
     
-    prompts = prompt_controller.get_project_prompts(project_id)
+    page = prompt_controller.get_project_prompts_page(
+        project_id, request.args.get('cursor'), request.args.get('per_page', type=int))
     
-    return render_template('project_detail.html', 
-                         project=project, 
-                         prompts=prompts)
+    return with_validator(make_response(render_template('project_detail.html', 
+                                                        project=project, 
+                                                        prompts=page.items,
+                                                        page=page,
+                                                        stats=project_controller.get_project_stats(project_id))),
+                          validator)
+
+@project_bp.route('/<int:project_id>/fork', methods=['POST'])
+@login_required
+def fork_project(project_id):
+    """Copy a project with its prompts, responses and attachments"""
+    fork = project_controller.fork_project(project_id)
+    if fork:
+        return redirect(url_for('project.view_project', project_id=fork.id))
+    
+    return redirect(url_for('project.view_project', project_id=project_id))
 
 @project_bp.route('/<int:project_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -84,29 +108,39 @@ def delete_project(project_id):
 @project_bp.route('/search')
 @login_required
 def search():
-    """Search across all user's prompts"""
+    """Search across all user's prompts, responses and attachments"""
     search_term = request.args.get('q', '').strip()
-    results = []
+    types = request.args.getlist('type')
+    results = None
     
     if search_term:
-        results = prompt_controller.search_prompts(search_term)
+        results = prompt_controller.search_documents(search_term, types=types)
     
     return render_template('search_results.html', 
                          results=results, 
-                         search_term=search_term)
+                         search_term=search_term,
+                         types=types)
 
 # API endpoints for AJAX requests
 @project_bp.route('/api/<int:project_id>/stats')
 @login_required
 def api_project_stats(project_id):
     """Get project statistics as JSON"""
-    project = project_controller.get_user_project(project_id)
-    if not project:
+    validator = project_controller.get_project_validator(project_id)
+    if not validator:
         return jsonify({'error': 'Project not found'}), 404
+    cached = not_modified(validator)
+    if cached:
+        return cached
     
-    return jsonify({
+    project = project_controller.get_user_project(project_id)
+    stats = project_controller.get_project_stats(project_id)
+    return with_validator(jsonify({
         'id': project.id,
         'name': project.name,
-        'prompts_count': project.get_prompts_count(),
+        'prompts_count': stats['prompts'],
+        'responses_count': stats['responses'],
+        'attachments_count': stats['attachments'],
+        'characters': stats['prompt_characters'],
         'created_at': project.created_at.isoformat()
-    })
\ No newline at end of file
+    }), validator)
\ No newline at end of file
@@ -1,6 +1,8 @@
 # routes/prompt_response_routes.py
+import json
 from flask import Blueprint, request, jsonify
 from flask_login import login_required
+from core.http_cache import not_modified, with_validator
 from controllers.prompt_response_controller import PromptResponseController
 
 resp_bp = Blueprint('prompt_response', __name__, url_prefix='/responses')
@@ -9,16 +11,35 @@ controller = PromptResponseController()
 @resp_bp.route('/project/<int:project_id>/prompt/<int:prompt_id>', methods=['GET'])
 @login_required
 def list_responses(project_id, prompt_id):
-    resps = controller.get_prompt_responses(project_id, prompt_id)
-    return jsonify([
-        {
-            'id': r.id,
-            'role': r.role,
-            'content': r.content,
-            'metadata': r.extra_metadata,           # use extra_metadata here
-            'created_at': r.created_at.isoformat()
-        } for r in resps
-    ])
+    validator = controller.get_conversation_validator(project_id, prompt_id, request.query_string)
+    if validator:
+        cached = not_modified(validator)
+        if cached:
+            return cached
+    
+    # ?cursor= pages forward from the first message; ?latest=1 / ?before= page backwards from the newest
+    before = request.args.get('before')
+    latest = request.args.get('latest', type=int) == 1
+    page = controller.get_prompt_responses(
+        project_id, prompt_id, request.args.get('cursor'), request.args.get('per_page', type=int),
+        before=before, latest=latest)
+    backwards = bool(before) or latest
+    response = jsonify({
+        'responses': [
+            {
+                'id': r.id,
+                'role': r.role,
+                'content': r.content,
+                'content_html': r.content_html,
+                'metadata': r.extra_metadata,           # use extra_metadata here
+                'token_count': r.stats.token_count,
+                'created_at': r.created_at.isoformat()
+            } for r in page.items
+        ],
+        'next_cursor': None if backwards else page.next_cursor,
+        'before_cursor': page.next_cursor if backwards else None
+    })
+    return with_validator(response, validator) if validator else response
 
 @resp_bp.route('/project/<int:project_id>/prompt/<int:prompt_id>', methods=['POST'])
 @login_required
@@ -30,4 +51,27 @@ def create_response(project_id, prompt_id):
     resp = controller.add_response(project_id, prompt_id, role, content, extra)  # controller maps to extra_metadata
     if not resp:
         return jsonify({'error': 'Failed to save'}), 400
-    return jsonify({'id': resp.id, 'created_at': resp.created_at.isoformat()})
\ No newline at end of file
+    return jsonify({'id': resp.id, 'content_html': resp.content_html, 'created_at': resp.created_at.isoformat()})
+
+@resp_bp.route('/project/<int:project_id>/prompt/<int:prompt_id>/batch', methods=['POST'])
+@login_required
+def create_responses_batch(project_id, prompt_id):
+    """Insert many messages at once: a JSON array, {"messages": [...]}, or NDJSON lines"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        try:
+            messages = [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        except ValueError:
+            return jsonify({'error': 'Invalid NDJSON body'}), 400
+    else:
+        data = request.get_json(silent=True)
+        messages = data.get('messages') if isinstance(data, dict) else data
+
+    inserted, error, status = controller.add_responses(project_id, prompt_id, messages)
+    if error:
+        return jsonify({'error': error}), status
+    return jsonify({
+        'count': len(inserted),
+        'responses': [
+            {'id': row['id'], 'created_at': row['created_at'].isoformat()} for row in inserted
+        ]
+    }), 201
\ No newline at end of file
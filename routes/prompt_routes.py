@@ -1,7 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify, make_response
 from flask_login import login_required
 from controllers.prompt_controller import PromptController
 from controllers.project_controller import ProjectController
+from controllers.prompt_response_controller import PromptResponseController
+from config import Config
+from core.http_cache import not_modified, with_validator, page_parts
 
 # Create blueprint
 prompt_bp = Blueprint('prompt', __name__, url_prefix='/prompts')
@@ -9,6 +12,7 @@ prompt_bp = Blueprint('prompt', __name__, url_prefix='/prompts')
 # Initialize controllers
 prompt_controller = PromptController()
 project_controller = ProjectController()
+response_controller = PromptResponseController()
 
 @prompt_bp.route('/project/<int:project_id>')
 @login_required
@@ -18,10 +22,12 @@ def list_prompts(project_id):
     if not project:
         return redirect(url_for('project.dashboard'))
     
-    prompts = prompt_controller.get_project_prompts(project_id)
+    page = prompt_controller.get_project_prompts_page(
+        project_id, request.args.get('cursor'), request.args.get('per_page', type=int))
     return render_template('prompts.html', 
                          project=project, 
-                         prompts=prompts)
+                         prompts=page.items,
+                         page=page)
 
 @prompt_bp.route('/project/<int:project_id>/create', methods=['GET', 'POST'])
 @login_required
@@ -49,15 +55,25 @@ def create_prompt(project_id):
 @login_required
 def view_prompt(project_id, prompt_id):
     """View specific prompt"""
-    prompt = prompt_controller.get_user_prompt(project_id, prompt_id)
-    if not prompt:
+    validator = prompt_controller.get_prompt_validator(project_id, prompt_id, page_parts())
+    if not validator:
         return redirect(url_for('project.view_project', project_id=project_id))
+    cached = not_modified(validator, for_html=True)
+    if cached:
+        return cached
     
-    project = project_controller.get_user_project(project_id)
+    prompt = prompt_controller.get_user_prompt(project_id, prompt_id)
+    project = prompt.project  # loaded with the prompt by the ownership check
     
-    return render_template('prompt_detail.html', 
-                         project=project, 
-                         prompt=prompt)
+    # Newest messages only; older history is fetched a page at a time
+    history = response_controller.get_prompt_responses(
+        project_id, prompt_id, per_page=Config.CONVERSATION_PAGE_SIZE,
+        before=request.args.get('before'), latest=True)
+    
+    return with_validator(make_response(render_template('prompt_detail.html', 
+                                                        project=project, 
+                                                        prompt=prompt,
+                                                        history=history)), validator)
 
 @prompt_bp.route('/project/<int:project_id>/<int:prompt_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -67,7 +83,7 @@ def edit_prompt(project_id, prompt_id):
     if not prompt:
         return redirect(url_for('project.view_project', project_id=project_id))
     
-    project = project_controller.get_user_project(project_id)
+    project = prompt.project
     
     if request.method == 'POST':
         title = request.form.get('title', '').strip()
@@ -99,7 +115,8 @@ def delete_prompt(project_id, prompt_id):
 @login_required
 def duplicate_prompt(project_id, prompt_id):
     """Create a duplicate of existing prompt"""
-    duplicate = prompt_controller.duplicate_prompt(project_id, prompt_id)
+    with_history = request.form.get('with_history') in ('1', 'true', 'on')
+    duplicate = prompt_controller.duplicate_prompt(project_id, prompt_id, copy_responses=with_history)
     if duplicate:
         return redirect(url_for('prompt.view_prompt', 
                               project_id=project_id, 
@@ -114,18 +131,25 @@ def duplicate_prompt(project_id, prompt_id):
 @login_required
 def api_get_prompt(project_id, prompt_id):
     """Get prompt data as JSON"""
-    prompt = prompt_controller.get_user_prompt(project_id, prompt_id)
-    if not prompt:
+    validator = prompt_controller.get_prompt_validator(project_id, prompt_id,
+                                                       responses=False, attachments=False)
+    if not validator:
         return jsonify({'error': 'Prompt not found'}), 404
+    cached = not_modified(validator)
+    if cached:
+        return cached
     
-    return jsonify({
+    prompt = prompt_controller.get_user_prompt(project_id, prompt_id)
+    return with_validator(jsonify({
         'id': prompt.id,
         'title': prompt.title,
         'content': prompt.content,
         'project_id': prompt.project_id,
         'created_at': prompt.created_at.isoformat(),
-        'preview': prompt.get_content_preview(150)
-    })
+        'preview': prompt.get_content_preview(150),
+        'stats': prompt.stats._asdict(),
+        'updated_at': prompt.updated_at.isoformat()
+    }), validator)
 
 @prompt_bp.route('/api/project/<int:project_id>/<int:prompt_id>/update', methods=['PUT'])
 @login_required
@@ -156,6 +180,63 @@ def api_update_prompt(project_id, prompt_id):
     
     return jsonify({'error': 'Failed to update prompt'}), 400
 
+@prompt_bp.route('/api/project/<int:project_id>/<int:prompt_id>/similar')
+@login_required
+def api_similar_prompts(project_id, prompt_id):
+    """Near-duplicate prompts (MinHash/LSH), most similar first"""
+    similar = prompt_controller.find_similar(
+        project_id, prompt_id, request.args.get('threshold', type=float), request.args.get('limit', type=int))
+    if similar is None:
+        return jsonify({'error': 'Prompt not found'}), 404
+    
+    return jsonify({
+        'similar': [
+            {
+                **match._asdict(),
+                'url': url_for('prompt.view_prompt', project_id=match.project_id, prompt_id=match.prompt_id)
+            }
+            for match in similar
+        ]
+    })
+
+@prompt_bp.route('/api/project/<int:project_id>/<int:prompt_id>/related')
+@login_required
+def api_related_prompts(project_id, prompt_id):
+    """Related prompts of the same user (TF-IDF cosine), most related first"""
+    related = prompt_controller.find_related(project_id, prompt_id, request.args.get('limit', type=int))
+    if related is None:
+        return jsonify({'error': 'Prompt not found'}), 404
+    
+    return jsonify({
+        'related': [
+            {
+                **match._asdict(),
+                'url': url_for('prompt.view_prompt', project_id=match.project_id, prompt_id=match.prompt_id)
+            }
+            for match in related
+        ]
+    })
+
+@prompt_bp.route('/api/suggest')
+@login_required
+def api_suggest():
+    """Typeahead suggestions from the user's prompt and project titles"""
+    suggestions = prompt_controller.suggest(request.args.get('q', ''), request.args.get('limit', type=int))
+    return jsonify({
+        'suggestions': [
+            {
+                'type': kind,
+                'id': id,
+                'title': title,
+                'project_id': project_id,
+                'project_name': project_name,
+                'url': (url_for('project.view_project', project_id=id) if kind == 'project' else
+                        url_for('prompt.view_prompt', project_id=project_id, prompt_id=id))
+            }
+            for kind, id, title, project_id, project_name in suggestions
+        ]
+    })
+
 @prompt_bp.route('/api/search')
 @login_required
 def api_search_prompts():
@@ -165,7 +246,16 @@ def api_search_prompts():
     if not search_term:
         return jsonify({'results': []})
     
-    results = prompt_controller.search_prompts(search_term)
+    next_cursor = None
+    if request.args.get('sort') == 'recent':
+        # Newest first, paged by cursor; relevance order is capped at SEARCH_RESULT_LIMIT instead
+        page = prompt_controller.search_prompts_page(
+            search_term, request.args.get('cursor'), request.args.get('per_page', type=int),
+            prefix_last=True)
+        results, next_cursor = page.items, page.next_cursor
+    else:
+        limit = request.args.get('limit', type=int)
+        results = prompt_controller.search_prompts(search_term, limit=limit, prefix_last=True)
     
     return jsonify({
         'results': [
@@ -179,5 +269,39 @@ def api_search_prompts():
             }
             for prompt in results
         ],
-        'count': len(results)
+        'count': len(results),
+        'next_cursor': next_cursor
+    })
+
+@prompt_bp.route('/api/search/documents')
+@login_required
+def api_search_documents():
+    """Search prompts, responses and attachments; hits grouped by prompt, with per-type counts"""
+    search_term = request.args.get('q', '').strip()
+    
+    if not search_term:
+        return jsonify({'groups': [], 'facets': {}, 'truncated': False})
+    
+    results = prompt_controller.search_documents(
+        search_term, types=request.args.getlist('type'), limit=request.args.get('limit', type=int),
+        prefix_last=True)
+    if results is None:
+        return jsonify({'error': 'Search term must be at least 2 characters'}), 400
+    
+    return jsonify({
+        'groups': [
+            {
+                'prompt_id': group.prompt_id,
+                'title': group.title,
+                'project_id': group.project_id,
+                'project_name': group.project_name,
+                'url': url_for('prompt.view_prompt', project_id=group.project_id, prompt_id=group.prompt_id),
+                'score': group.score,
+                'match_count': group.match_count,
+                'hits': [hit._asdict() for hit in group.hits]
+            }
+            for group in results.groups
+        ],
+        'facets': results.facets,
+        'truncated': results.truncated
     })
\ No newline at end of file
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for
+from flask import Blueprint, Response, render_template, request, redirect, stream_with_context, url_for
 from flask_login import login_required, current_user
 from controllers.user_controller import UserController
 
@@ -15,8 +15,12 @@ def list_users():
     if not current_user.is_admin:
         return redirect(url_for('project.dashboard'))
     
-    users = user_controller.get_all_users()
-    return render_template('users.html', users=users)
+    page = user_controller.get_users_page(
+        request.args.get('cursor'), request.args.get('per_page', type=int))
+    return render_template('users.html',
+                         users=page.items,
+                         page=page,
+                         project_counts=user_controller.get_project_counts(page.items))
 
 @user_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -100,4 +104,19 @@ def delete_user(user_id):
     if user_controller.delete_user(user_id):
         return redirect(url_for('user.list_users'))
     
-    return redirect(url_for('user.view_user', user_id=user_id))
\ No newline at end of file
+    return redirect(url_for('user.view_user', user_id=user_id))
+
+@user_bp.route('/<int:user_id>/export')
+@login_required
+def export_library(user_id):
+    """Download a user's whole library as NDJSON or a tar of JSON files (?format=tar&compress=gzip)"""
+    export = user_controller.export_library(
+        user_id, request.args.get('format', 'ndjson'), request.args.get('compress'))
+    if not export:
+        return redirect(url_for('user.view_user', user_id=user_id))
+    
+    filename, mimetype, chunks = export
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no',  # let proxies pass chunks through as they are produced
+    })
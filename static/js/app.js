@@ -10,6 +10,7 @@ const PromptManager = {
         this.initTooltips();
         this.autoHideAlerts();
         this.initSearchFeatures();
+        this.initLoadMore();
     },
 
     // Bind global event listeners
@@ -65,6 +66,48 @@ const PromptManager = {
         }
     },
 
+    // Append the next page of a paginated list in place instead of navigating
+    initLoadMore() {
+        document.addEventListener('click', e => {
+            const link = e.target.closest('[data-load-more]');
+            if (link) {
+                e.preventDefault();
+                this.loadMore(link);
+            }
+        });
+    },
+
+    // Fetch the page behind a "Load more" link and merge its items into the current list
+    loadMore(link) {
+        const selector = link.dataset.loadMore;
+        const target = document.querySelector(selector);
+        const container = link.closest('[data-load-more-container]');
+        if (!target || !container) {
+            window.location.href = link.href;
+            return;
+        }
+
+        link.classList.add('disabled');
+        fetch(link.href, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(response => response.text())
+            .then(html => {
+                const doc = new DOMParser().parseFromString(html, 'text/html');
+                const items = doc.querySelector(selector);
+                const nextContainer = doc.querySelector('[data-load-more-container]');
+                if (items) {
+                    target.append(...items.children);
+                }
+                if (nextContainer) {
+                    container.replaceWith(nextContainer);
+                } else {
+                    container.remove();
+                }
+            })
+            .catch(() => {
+                window.location.href = link.href;
+            });
+    },
+
     // Handle confirmation dialogs
     handleConfirmAction(e) {
         const message = e.target.dataset.confirm || 'Are you sure?';
@@ -201,22 +244,54 @@ const PromptManager = {
 
     // Fetch search suggestions via API
     fetchSearchSuggestions(query) {
-        fetch(`/prompts/api/search?q=${encodeURIComponent(query)}`)
+        // Abort the previous keystroke's request so responses cannot arrive out of order
+        if (this.suggestController) this.suggestController.abort();
+        this.suggestController = new AbortController();
+
+        fetch(`/prompts/api/suggest?q=${encodeURIComponent(query)}`, { signal: this.suggestController.signal })
             .then(response => response.json())
             .then(data => {
-                if (data.results && data.results.length > 0) {
-                    this.showSuggestions(data.results.slice(0, 5));
+                if (data.suggestions && data.suggestions.length > 0) {
+                    this.showSuggestions(data.suggestions);
                 } else {
                     this.hideSuggestions();
                 }
             })
-            .catch(() => this.hideSuggestions());
+            .catch(error => {
+                if (error.name !== 'AbortError') this.hideSuggestions();
+            });
     },
 
     // Show search suggestions dropdown
     showSuggestions(suggestions) {
-        // Implementation for showing search suggestions
-        // This would create a dropdown with suggestions
+        const searchInput = document.querySelector('input[name="q"]');
+        this.hideSuggestions();
+
+        const dropdown = document.createElement('div');
+        dropdown.id = 'search-suggestions';
+        dropdown.className = 'dropdown-menu show';
+        suggestions.forEach(suggestion => {
+            const item = document.createElement('a');
+            item.className = 'dropdown-item';
+            item.href = suggestion.url;
+            const icon = document.createElement('i');
+            icon.className = `bi bi-${suggestion.type === 'project' ? 'folder' : 'chat-text'} me-2`;
+            item.append(icon, document.createTextNode(suggestion.title));
+            if (suggestion.type === 'prompt') {
+                const project = document.createElement('small');
+                project.className = 'text-muted ms-2';
+                project.textContent = suggestion.project_name;
+                item.appendChild(project);
+            }
+            dropdown.appendChild(item);
+        });
+
+        const group = searchInput.closest('.input-group') || searchInput.parentNode;
+        group.style.position = 'relative';
+        dropdown.style.top = '100%';
+        dropdown.style.left = '0';
+        group.appendChild(dropdown);
+        searchInput.addEventListener('blur', () => setTimeout(() => this.hideSuggestions(), 200), { once: true });
     },
 
     // Hide search suggestions
@@ -397,24 +472,119 @@ function submitResponse(projectId, promptId) {
     })
     .then(res => res.json())
     .then(data => {
+        if (data.error) return;
         document.getElementById('respContent').value = "";
-        loadConversation(projectId, promptId);
+        // Append the saved message instead of re-fetching the whole conversation
+        appendConversationItem({ role, content, content_html: data.content_html });
     });
 }
 
-function loadConversation(projectId, promptId) {
-    fetch(`/responses/project/${projectId}/prompt/${promptId}`)
+function conversationItem(resp) {
+    const div = document.createElement('div');
+    div.className = 'conversation-item mb-2 p-2 border rounded';
+    div.setAttribute('data-role', resp.role);
+    const label = document.createElement('strong');
+    label.textContent = `[${resp.role.charAt(0).toUpperCase() + resp.role.slice(1)}]`;
+    div.append(label, document.createElement('br'));
+    if (resp.content_html) {
+        const body = document.createElement('div');
+        body.innerHTML = resp.content_html;  // rendered server-side at write time
+        div.appendChild(body);
+    } else {
+        div.appendChild(document.createTextNode(resp.content));
+    }
+    return div;
+}
+
+function appendConversationItem(resp) {
+    const list = document.getElementById('conversationList');
+    const empty = list.querySelector('p.text-muted');
+    if (empty) empty.remove();
+    list.appendChild(conversationItem(resp));
+}
+
+// Prepend the page of messages before the oldest one shown, following the `before` cursor
+function loadOlderMessages(link, projectId, promptId) {
+    const url = `/responses/project/${projectId}/prompt/${promptId}` +
+        `?before=${encodeURIComponent(link.dataset.before)}`;
+
+    link.classList.add('disabled');
+    fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
         .then(res => res.json())
         .then(data => {
             const list = document.getElementById('conversationList');
-            list.innerHTML = "";
-            data.forEach(resp => {
-                const div = document.createElement('div');
-                div.className = 'conversation-item mb-2 p-2 border rounded';
-                div.setAttribute('data-role', resp.role);
-                div.innerHTML = `<strong>[${resp.role}]</strong><br>${resp.content}`;
-                list.appendChild(div);
-            });
+            const previousHeight = list.scrollHeight;
+            list.prepend(...data.responses.map(conversationItem));
+            window.scrollBy(0, list.scrollHeight - previousHeight);  // keep the current message in view
+            if (data.before_cursor) {
+                link.dataset.before = data.before_cursor;
+                link.classList.remove('disabled');
+            } else {
+                document.getElementById('olderMessages').remove();
+            }
+        })
+        .catch(() => {
+            window.location.href = link.href;
+        });
+    return false;
+}
+
+// Near-duplicates of a prompt, most similar first
+function loadSimilarPrompts(button, url) {
+    const list = document.getElementById('similarPrompts');
+    const empty = document.getElementById('similarPromptsEmpty');
+
+    button.disabled = true;
+    fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+        .then(res => res.json())
+        .then(data => {
+            list.replaceChildren(...data.similar.map(match => {
+                const item = document.createElement('a');
+                item.className = 'list-group-item list-group-item-action d-flex justify-content-between';
+                item.href = match.url;
+                const title = document.createElement('span');
+                title.textContent = `${match.title} (${match.project_name})`;
+                const score = document.createElement('span');
+                score.className = 'badge bg-secondary';
+                score.textContent = `${Math.round(match.similarity * 100)}% similar`;
+                item.append(title, score);
+                return item;
+            }));
+            empty.textContent = data.similar.length ? '' : 'No near-duplicates found.';
+        })
+        .catch(() => {
+            empty.textContent = 'Could not load similar prompts.';
+        })
+        .finally(() => {
+            button.disabled = false;
+        });
+}
+
+// Related prompts of the same user, loaded when the prompt page opens
+function loadRelatedPrompts() {
+    const list = document.getElementById('relatedPrompts');
+    if (!list) return;
+    const empty = document.getElementById('relatedPromptsEmpty');
+
+    fetch(list.dataset.url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+        .then(res => res.json())
+        .then(data => {
+            list.replaceChildren(...data.related.map(match => {
+                const item = document.createElement('a');
+                item.className = 'list-group-item list-group-item-action d-flex justify-content-between';
+                item.href = match.url;
+                const title = document.createElement('span');
+                title.textContent = `${match.title} (${match.project_name})`;
+                const score = document.createElement('span');
+                score.className = 'badge bg-light text-dark';
+                score.textContent = match.score.toFixed(2);
+                item.append(title, score);
+                return item;
+            }));
+            empty.textContent = data.related.length ? '' : 'No related prompts yet.';
+        })
+        .catch(() => {
+            empty.textContent = 'Could not load related prompts.';
         });
 }
 // End of new functions
@@ -423,4 +593,5 @@ function loadConversation(projectId, promptId) {
 document.addEventListener('DOMContentLoaded', function() {
     PromptManager.init();
     initTextareaCounters();
+    loadRelatedPrompts();
 });
\ No newline at end of file